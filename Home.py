@@ -9,14 +9,12 @@ ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__fil
 sys.path.append(ROOT_DIR)
 
 
-# Import classes AuthManager and Database manager for authentication and connection to database
-from app.advanced_services.database_manager import DatabaseManager
-from app.advanced_services.auth_manager import AuthManager  
+# Shared AuthManager (and its DatabaseManager) - built once per process, not on every rerun or session
+from app.advanced_services.resources import get_auth_manager
+from app.services.session import restore_session, start_session, end_session, client_id
 
 
-db = DatabaseManager("DATA/intelligence_platform.db")
-db.connect()
-auth = AuthManager(db)
+auth = get_auth_manager()
 
 # Initialising session states
 # Session state allows values to persist across reruns
@@ -31,6 +29,9 @@ if "show_login" not in st.session_state:
 if "show_register" not in st.session_state:
     st.session_state.show_register = False
 
+# A returning user with a valid session token is logged straight back in - no password or bcrypt check
+restore_session()
+
 
 # If the user is not yet logged in i.e when the user first enters the web page, the below appears on screen
 if not st.session_state.logged_in:
@@ -105,11 +106,10 @@ if not st.session_state.logged_in:
             password = st.text_input("Password", type="password", key="login_pass")
         
             if st.button("Login", key="login_submit"):
-                sucess, msg= auth.login_user(username, password)
+                sucess, msg, token= auth.login(username, password, client=client_id())
                 if sucess: 
-                    # Update session state after success login
-                    st.session_state.logged_in = True
-                    st.session_state.username = username
+                    # Update session state after success login and keep the session token
+                    start_session(username, token)
                     st.success(msg)
                     st.session_state.show_login = False
                     st.rerun() # Refresh the UI
@@ -195,10 +195,8 @@ if st.session_state.logged_in:
     st.sidebar.title(f"Welcome, {st.session_state.username} 👋")
     
     if st.sidebar.button("Logout"):
-        st.session_state.logged_in = False
-        st.session_state.username = ""
-        st.session_state.show_login = False
-        st.session_state.show_register = False
+        # Revokes the session token as well
+        end_session()
         st.rerun()  
 
 
@@ -0,0 +1,295 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+
+from google.genai import types
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(text: str | None) -> str:
+    '''
+    Single-spaced prompt text - prompts that differ only in indentation or line breaks share a cache entry
+    '''
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+def cache_key(model: str, system_instruction: str | None, prompt: str) -> str:
+    '''
+    Content address of one request - sha256 over (model, system instruction, prompt), all normalized
+    '''
+    payload = json.dumps([model, normalize_prompt(system_instruction), normalize_prompt(prompt)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _InFlight:
+    '''
+    One upstream request in progress - its chunks so far, shared by every caller waiting for the same key
+    '''
+    __slots__ = ("chunks", "done", "error", "cond")
+
+    def __init__(self):
+        self.chunks: list[str] = []
+        self.done = False
+        self.error: BaseException | None = None
+        self.cond = threading.Condition()
+
+
+class AIAnswer:
+    '''
+    Iterator over the text chunks of one answer
+    -> cached is True when the answer was replayed from the cache instead of asking the model
+    -> coalesced is True when it follows an identical request that was already in progress
+    '''
+
+    def __init__(self, chunks, cached: bool = False, coalesced: bool = False):
+        self._chunks = chunks
+        self.cached = cached
+        self.coalesced = coalesced
+
+    def __iter__(self):
+        return iter(self._chunks)
+
+
+class AIResponseCache:
+    '''
+    Persistent, content-addressed cache of Gemini answers for the AI analysers
+
+    -> Keyed on (model, system instruction, normalized prompt) and stored in the ai_response_cache table
+    -> Entries expire after ttl seconds; past max_entries / max_bytes the least recently used are evicted
+    -> Hits update last_used in batches, so a cache hit is a single indexed read
+    -> Identical requests made while one is in progress wait for that one upstream call and stream its chunks
+    -> The upstream call runs on its own thread, so it completes (and is cached) even if the session
+       that started it reruns or disconnects
+    '''
+
+    def __init__(self, db, ttl: float = 7 * 24 * 3600, max_entries: int = 5000, max_bytes: int = 50 * 1024 * 1024,
+                 timeout: float = 120.0, touch_batch: int = 50, touch_interval: float = 60.0):
+        self._db = db
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._timeout = timeout
+
+        self._in_flight: dict[str, _InFlight] = {}
+        self._lock = threading.Lock()
+
+        # Hits not yet written back - key -> [last_used, hits], flushed every touch_batch keys or touch_interval seconds
+        self._touched: dict[str, list] = {}
+        self._touch_batch = touch_batch
+        self._touch_interval = touch_interval
+        self._last_flush = time.time()
+
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._upstream_errors = 0
+        self._store_errors = 0
+        self._evictions = 0
+
+    def stream(self, get_client, model: str, system_instruction: str | None, prompt: str) -> AIAnswer:
+        '''
+        Answer a prompt from the cache, from an identical request in progress, or from the model
+        -> get_client is only called on a miss, so cached answers never build the Gemini client
+        -> The lock only guards the in-memory in-flight map - database reads and writes happen outside it
+        '''
+        key = cache_key(model, system_instruction, prompt)
+        text = self._lookup(key)
+        if text is not None:
+            self._hit(key)
+            return AIAnswer([text], cached=True)
+
+        with self._lock:
+            flight = self._in_flight.get(key)
+            if flight is not None:
+                self._coalesced += 1
+                return AIAnswer(self._follow(flight), coalesced=True)
+            flight = self._in_flight[key] = _InFlight()
+
+        # Registered, so identical requests now follow this one - look again in case the answer
+        # was stored between the first lookup and the registration
+        text = self._lookup(key)
+        if text is not None:
+            self._hit(key)
+            with flight.cond:
+                flight.chunks.append(text)
+            self._finish(key, flight, None)
+            return AIAnswer([text], cached=True)
+
+        with self._lock:
+            self._misses += 1
+        try:
+            client = get_client()
+        except Exception as e:
+            self._finish(key, flight, e)
+            raise
+        threading.Thread(
+            target=self._fetch, args=(key, flight, client, model, system_instruction, prompt),
+            name="ai-cache-fetch", daemon=True,
+        ).start()
+        return AIAnswer(self._follow(flight))
+
+    def _lookup(self, key: str) -> str | None:
+        row = self._db.fetch_one(
+            "SELECT response FROM ai_response_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+        )
+        return row[0] if row is not None else None
+
+    def _hit(self, key: str) -> None:
+        '''
+        Count a hit - last_used/hits are written in batches, not with an UPDATE per hit
+        '''
+        now = time.time()
+        with self._lock:
+            self._hits += 1
+            touch = self._touched.get(key)
+            if touch is None:
+                self._touched[key] = [now, 1]
+            else:
+                touch[0] = now
+                touch[1] += 1
+            due = len(self._touched) >= self._touch_batch or now - self._last_flush >= self._touch_interval
+        if due:
+            self._flush_touches()
+
+    def _flush_touches(self) -> None:
+        with self._lock:
+            touched, self._touched = self._touched, {}
+            self._last_flush = time.time()
+        if not touched:
+            return
+        try:
+            self._db.execute_many(
+                "UPDATE ai_response_cache SET hits = hits + ?, last_used = MAX(last_used, ?) WHERE key = ?",
+                [(hits, last_used, key) for key, (last_used, hits) in touched.items()],
+            )
+        except sqlite3.Error:
+            # Only the LRU order is lost - the answers were still served
+            self._count_store_error()
+
+    def _fetch(self, key, flight, client, model, system_instruction, prompt) -> None:
+        error = None
+        try:
+            response = client.models.generate_content_stream(
+                model=model,
+                config=types.GenerateContentConfig(system_instruction=system_instruction),
+                contents={"role": "user", "parts": [{"text": prompt}]},
+            )
+            for chunk in response:
+                if chunk.text:
+                    with flight.cond:
+                        flight.chunks.append(chunk.text)
+                        flight.cond.notify_all()
+        except Exception as e:
+            with self._lock:
+                self._upstream_errors += 1
+            error = e
+
+        if error is None:
+            self._store(key, model, "".join(flight.chunks))
+        self._finish(key, flight, error)
+
+    def _finish(self, key: str, flight: _InFlight, error: BaseException | None) -> None:
+        # Stored first, then removed from in-flight - a new request sees one or the other
+        with self._lock:
+            self._in_flight.pop(key, None)
+        with flight.cond:
+            flight.error = error
+            flight.done = True
+            flight.cond.notify_all()
+
+    def _follow(self, flight: _InFlight):
+        position = 0
+        while True:
+            with flight.cond:
+                while position >= len(flight.chunks) and not flight.done:
+                    if not flight.cond.wait(self._timeout):
+                        raise TimeoutError(f"no answer from the model within {self._timeout:g}s")
+                chunks = flight.chunks[position:]
+                done, error = flight.done, flight.error
+            if not chunks and done:
+                if error is not None:
+                    raise error
+                return
+            position += len(chunks)
+            yield from chunks
+
+    def _store(self, key: str, model: str, text: str) -> None:
+        if not text:
+            return
+        now = time.time()
+        try:
+            self._db.execute_query(
+                """
+                INSERT INTO ai_response_cache (key, model, response, size, created_at, last_used, expires_at, hits)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+                ON CONFLICT(key) DO UPDATE SET response = excluded.response, size = excluded.size,
+                    created_at = excluded.created_at, last_used = excluded.last_used, expires_at = excluded.expires_at
+                """,
+                (key, model, text, len(text.encode("utf-8")), now, now, now + self._ttl),
+            )
+            self._evict(now)
+        except sqlite3.Error:
+            self._count_store_error()
+
+    def _count_store_error(self) -> None:
+        with self._lock:
+            self._store_errors += 1
+
+    def _evict(self, now: float) -> None:
+        '''
+        Drop expired entries, then the least recently used ones past max_entries or max_bytes
+        '''
+        # Pending hits first, so recently replayed answers are not taken for unused ones
+        self._flush_touches()
+        expired = self._db.execute_query("DELETE FROM ai_response_cache WHERE expires_at <= ?", (now,)).rowcount
+        over = self._db.execute_query(
+            """
+            DELETE FROM ai_response_cache WHERE key IN (
+                SELECT key FROM (
+                    SELECT key,
+                           ROW_NUMBER() OVER (ORDER BY last_used DESC) AS n,
+                           SUM(size) OVER (ORDER BY last_used DESC ROWS UNBOUNDED PRECEDING) AS kept_bytes
+                    FROM ai_response_cache
+                )
+                WHERE n > ? OR kept_bytes > ?
+            )
+            """,
+            (self._max_entries, self._max_bytes),
+        ).rowcount
+        with self._lock:
+            self._evictions += max(expired, 0) + max(over, 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._touched.clear()
+        self._db.execute_query("DELETE FROM ai_response_cache")
+
+    def stats(self) -> dict:
+        entries, size = self._db.fetch_one("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ai_response_cache")
+        with self._lock:
+            return self._counters(entries, size)
+
+    def _counters(self, entries: int, size: int) -> dict:
+        # Called with the lock held
+        requests = self._hits + self._misses + self._coalesced
+        return {
+            "requests": requests,
+            "hits": self._hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "hit_rate": round(self._hits / requests, 4) if requests else 0.0,
+            "upstream_saved_rate": round((self._hits + self._coalesced) / requests, 4) if requests else 0.0,
+            "upstream_errors": self._upstream_errors,
+            "store_errors": self._store_errors,
+            "evictions": self._evictions,
+            "in_flight": len(self._in_flight),
+            "entries": entries,
+            "bytes": size,
+            "max_entries": self._max_entries,
+            "max_bytes": self._max_bytes,
+        }
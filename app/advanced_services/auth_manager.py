@@ -1,8 +1,13 @@
 from typing import Optional, Tuple
-import bcrypt
 
 # import the class DatabaseManager to allow connection to the database
 from app.advanced_services.database_manager import DatabaseManager
+# bcrypt runs on a bounded pool of worker processes, not on the Streamlit script thread
+from app.advanced_services.hashing_pool import get_hash_pool, HashingBusyError
+# Signed session tokens, so a returning user is recognised without another bcrypt check
+from app.advanced_services.session_tokens import get_session_store, Session, SessionTokenStore
+# Rejects floods of login attempts before any bcrypt work
+from app.advanced_services.login_limiter import LoginRateLimiter
 
 
 class PasswordHasher:
@@ -22,16 +27,14 @@ class PasswordHasher:
         '''
         This method is to produce hashed password from a plain-text password using bcrypt methods
         '''
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(plain.encode("utf-8"), salt)
-        return hashed.decode("utf-8")
+        return get_hash_pool().hash_password(plain)
 
     @staticmethod
     def check_password(plain: str, hashed: str) -> bool:
         '''
         Checks whether a user-entered password matches its stored hashed version and returns the required value
         '''
-        return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+        return get_hash_pool().check_password(plain, hashed)
 
 
 class AuthManager:
@@ -44,8 +47,11 @@ class AuthManager:
     Constructor that gets an instance of type DatabaseManager to manage connection
 
     '''
-    def __init__(self, db: DatabaseManager):
+    def __init__(self, db: DatabaseManager, sessions: Optional[SessionTokenStore] = None,
+                 limiter: Optional[LoginRateLimiter] = None):
         self.db = db
+        self.sessions = sessions or get_session_store()
+        self.limiter = limiter or LoginRateLimiter(db)
 
     '''
     Static method/Helper function - to validate the username using required validation techniques
@@ -120,7 +126,10 @@ class AuthManager:
             return False, f"Username '{username}' already exists."
 
         # Hash the password
-        hashed = PasswordHasher.hash_password(password)
+        try:
+            hashed = PasswordHasher.hash_password(password)
+        except HashingBusyError as e:
+            return False, str(e)
 
         # Insert user
         self.db.execute_query(
@@ -137,10 +146,36 @@ class AuthManager:
         return True, f"User '{username}' registered successfully with ID {user_id}. You can now Login ! "
 
     '''
-    Function to allow user to login to the system
+    Checks a username and password - returns (success, message, role)
+    -> client identifies the caller (e.g. IP address) for the rate limiter, it is optional
 
     '''
-    def login_user(self, username: str, password: str) -> Tuple[bool, str]:
+    def _verify(self, username: str, password: str, client: Optional[str] = None) -> Tuple[bool, str, Optional[str]]:
+        '''
+        Throttled or locked out attempts are refused here, before the database or bcrypt
+
+        '''
+        allowed, msg = self.limiter.check(username, client)
+        if not allowed:
+            return False, msg, None
+
+        # A busy hashing pool is not the user's fault - it does not count as a failed attempt
+        try:
+            success, msg, role = self._check_credentials(username, password)
+        except HashingBusyError as e:
+            return False, str(e), None
+
+        if success:
+            self.limiter.record_success(username, client)
+        else:
+            self.limiter.record_failure(username, client)
+        return success, msg, role
+
+    '''
+    Database lookup and bcrypt check for one attempt
+
+    '''
+    def _check_credentials(self, username: str, password: str) -> Tuple[bool, str, Optional[str]]:
         '''
         Look for the username entered in the database
 
@@ -151,7 +186,7 @@ class AuthManager:
         )
 
         if row is None:
-            return False, "Username not found!"
+            return False, "Username not found!", None
 
         password_hash_db, role_db = row
         '''
@@ -159,7 +194,40 @@ class AuthManager:
         
         '''
         if PasswordHasher.check_password(password, password_hash_db):
-            return True, f"Login successful for Role {role_db}!"
+            return True, f"Login successful for Role {role_db}!", role_db
         else:
-            return False, "Incorrect password."
+            return False, "Incorrect password.", None
+
+    '''
+    Function to allow user to login to the system
 
+    '''
+    def login_user(self, username: str, password: str, client: Optional[str] = None) -> Tuple[bool, str]:
+        success, msg, _ = self._verify(username, password, client)
+        return success, msg
+
+    '''
+    Login that also issues a session token - returns (success, message, token)
+    -> The token is what the UI keeps, later visits are checked with authenticate_token
+
+    '''
+    def login(self, username: str, password: str, client: Optional[str] = None) -> Tuple[bool, str, Optional[str]]:
+        success, msg, role = self._verify(username, password, client)
+        if not success:
+            return False, msg, None
+        return True, msg, self.sessions.issue(username, role, client)
+
+    '''
+    The session behind a token, or None if it is forged, expired, revoked or presented by another client
+    -> No database or bcrypt work
+
+    '''
+    def authenticate_token(self, token: str, client: Optional[str] = None) -> Optional[Session]:
+        return self.sessions.validate(token, client)
+
+    '''
+    Revoke a session token on logout
+
+    '''
+    def logout(self, token: str) -> bool:
+        return self.sessions.revoke(token)
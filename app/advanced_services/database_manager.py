@@ -1,79 +1,397 @@
+import random
 import sqlite3
+import threading
+import time
 from typing import Any, Iterable
 
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from app.data.db import ConnectionPool
+from app.data.schema import run_migrations
+from app.advanced_services.query_cache import bump_generation, table_written_by
+
 
 class DatabaseManager:
     '''
     The class Database Manager is for managing database connections and queries
-    
+
     -> Opens and closes the SQlite database connection
     -> Enable execution of CRUD operations
     -> Used instead of importing modules from other files
     -> Thereby, keeping all database management logic in a single class
+    -> Runs in WAL mode so readers do not block behind writers
+    -> Retries writes with backoff when the database is locked (SQLITE_BUSY) - writes only wait briefly
+       inside SQLite, the rest of the wait is timed here so lock_stats() shows the real blocked time
+    -> Brings the schema up to date (indexes etc.) on first connect
+    -> Invalidates cached analytical results of a table after writing to it
+    -> Uses a bounded pool of connections so one instance can be shared by every session/thread
     '''
 
     '''
-    Initialise database path
+    Initialise database path and connection settings
 
     '''
-    def __init__(self, db_path: str):
+    def __init__(
+        self,
+        db_path: str,
+        journal_mode: str = "WAL",
+        synchronous: str = "NORMAL",
+        cache_size: int = -16000,
+        mmap_size: int = 64 * 1024 * 1024,
+        busy_timeout_ms: int = 5000,
+        write_busy_timeout_ms: int = 20,
+        max_retries: int = 20,
+        retry_backoff: float = 0.01,
+        max_backoff: float = 0.5,
+        max_connections: int = 5,
+    ):
         self._db_path = db_path
-        self._connection: sqlite3.Connection | None = None
- 
+        self._pool: ConnectionPool | None = None
+        self._max_connections = max_connections
+        # Serialises connect/close/reconnect - the pool is only ever swapped in one assignment
+        self._pool_lock = threading.Lock()
+
+        self._journal_mode = journal_mode
+        self._synchronous = synchronous
+        self._cache_size = cache_size
+        self._mmap_size = mmap_size
+        self._busy_timeout_ms = busy_timeout_ms
+        self._write_busy_timeout_ms = write_busy_timeout_ms
+        self._max_retries = max_retries
+        self._retry_backoff = retry_backoff
+        self._max_backoff = max_backoff
+
+        # Lock contention counters - updated by every session's thread, so guarded by a lock
+        self._stats_lock = threading.Lock()
+        self._writes = 0
+        self._write_time = 0.0
+        self._lock_waits = 0
+        self._lock_wait_time = 0.0
+        self._failed_writes = 0
+
+
+    '''
+    Path of the database file - also used to key cached query results
+
+    '''
+    @property
+    def db_path(self) -> str:
+        return self._db_path
 
     '''
-    Connect to the SQlite database
+    Open the connection pool and apply any pending schema migrations
+    -> Other threads only see the new pool once the migrations have finished
 
     '''
     def connect(self) -> None:
-        if self._connection is None:
-            self._connection = sqlite3.connect(self._db_path)        
-    
+        self._connected_pool()
+
+    def _connected_pool(self) -> ConnectionPool:
+        pool = self._pool
+        if pool is not None:
+            return pool
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = self._open_pool()
+            return self._pool
+
+    def _open_pool(self) -> ConnectionPool:
+        pool = ConnectionPool(self._db_path, max_connections=self._max_connections, pragmas=self._pragmas())
+        try:
+            with pool.connection() as conn:
+                run_migrations(conn)
+        except BaseException:
+            pool.close_all()
+            raise
+        return pool
+
+    '''
+    Journal mode and cache settings applied to every new pooled connection
+
+    '''
+    def _pragmas(self) -> dict:
+        return {
+            "journal_mode": self._journal_mode,
+            "synchronous": self._synchronous,
+            "cache_size": int(self._cache_size),
+            "mmap_size": int(self._mmap_size),
+            "busy_timeout": int(self._busy_timeout_ms),
+        }
+
+    '''
+    Check out a pooled connection for the current thread, connecting first if needed
+
+    '''
+    def _checkout(self):
+        return self._connected_pool().connection()
+
     '''
-    Close the connection safely
+    Close the pooled connections safely
+    -> Threads still inside a query finish on the old pool, whose connections are closed as they come back
 
     '''
     def close(self) -> None:
-        if self._connection is not None:
-            self._connection.close()
-            self._connection = None
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close_all()
+
+    '''
+    Health check - True if a pooled connection can still run a query
+
+    '''
+    def ping(self) -> bool:
+        return self._ping(self._pool)
+
+    @staticmethod
+    def _ping(pool: ConnectionPool | None) -> bool:
+        if pool is None:
+            return False
+        try:
+            with pool.connection() as conn:
+                conn.execute("SELECT 1").fetchone()
+            return True
+        except (sqlite3.Error, TimeoutError):
+            return False
+
+    '''
+    Open a new pool and swap it in for the current one, which is then closed
+    '''
+    def reconnect(self) -> None:
+        with self._pool_lock:
+            self._replace_pool(self._pool)
+
+    def _replace_pool(self, old: ConnectionPool | None) -> None:
+        # Called with _pool_lock held - migrations run before the new pool is published
+        self._pool = self._open_pool()
+        if old is not None:
+            old.close_all()
+
+    '''
+    Reconnect if the health check fails - returns the manager so it can be chained
+    -> When several threads see the same broken pool, only the first one replaces it
+    '''
+    def ensure_connected(self) -> "DatabaseManager":
+        pool = self._pool
+        if not self._ping(pool):
+            with self._pool_lock:
+                if self._pool is pool:
+                    self._replace_pool(pool)
+        return self
+
+    '''
+    Checks whether an OperationalError is a lock/busy error that is worth retrying
+
+    '''
+    @staticmethod
+    def _is_busy_error(error: sqlite3.OperationalError) -> bool:
+        message = str(error).lower()
+        # FTS5 reads its config table the first time a connection touches it - a lock there
+        # surfaces as "vtable constructor failed"
+        return "locked" in message or "busy" in message or "vtable constructor failed" in message
+
+
+    '''
+    Run one write - work(conn, nested) - retrying it with backoff while another writer holds the lock
+    -> Outside a caller's transaction the connection waits at most write_busy_timeout_ms inside SQLite,
+       so a busy database comes back here quickly; the failed attempt and the backoff are timed and
+       counted as a lock wait
+    -> Inside a caller's transaction (nested) the statement joins it - no retry, the caller commits
+
+    '''
+    def _write(self, work):
+        attempt = 0
+        while True:
+            nested = False
+            started = time.perf_counter()
+            try:
+                # The pool rolls the transaction back if the statement fails
+                pool = self._connected_pool()
+                with pool.connection() as conn:
+                    nested = pool.depth() > 1
+                    if nested:
+                        return work(conn, nested)
+                    conn.execute(f"PRAGMA busy_timeout = {int(self._write_busy_timeout_ms)}")
+                    try:
+                        result = work(conn, nested)
+                    finally:
+                        conn.execute(f"PRAGMA busy_timeout = {int(self._busy_timeout_ms)}")
+                self._record_write(time.perf_counter() - started)
+                return result
+            except sqlite3.OperationalError as e:
+                if nested or not self._is_busy_error(e) or attempt >= self._max_retries:
+                    self._record_failed_write()
+                    raise
+                delay = self._backoff(attempt)
+                time.sleep(delay)
+                self._record_lock_wait(time.perf_counter() - started)
+                attempt += 1
+
+    '''
+    Backoff delay before retry number attempt - exponential, capped at max_backoff, with jitter so
+    waiting writers do not retry in lockstep
+
+    '''
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self._max_backoff, self._retry_backoff * (2 ** min(attempt, 30)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _record_write(self, elapsed: float) -> None:
+        with self._stats_lock:
+            self._writes += 1
+            self._write_time += elapsed
+
+    def _record_lock_wait(self, blocked: float) -> None:
+        with self._stats_lock:
+            self._lock_waits += 1
+            self._lock_wait_time += blocked
+
+    def _record_failed_write(self) -> None:
+        with self._stats_lock:
+            self._failed_writes += 1
 
 
     '''
     Help execute INSERT, DELETE OR UPDATE operations
+    -> Retried with backoff if another writer holds the lock
+    -> Bumps the cache generation of the table that was written
 
     '''
     def execute_query(self, sql: str, params: Iterable[Any] = ()):
-    
-    
-        if self._connection is None:
-            self.connect()
-
-        cur = self._connection.cursor()
-        cur.execute(sql, tuple(params))
-        self._connection.commit()
+        params = tuple(params)
+
+        def work(conn, nested):
+            cur = conn.cursor()
+            cur.execute(sql, params)
+            if not nested:
+                conn.commit()
+            return cur
+
+        cur = self._write(work)
+        table = table_written_by(sql)
+        if table is not None:
+            bump_generation(table)
         return cur
- 
+
+
+    '''
+    Help execute the same INSERT/UPDATE for many rows in one transaction
+    -> Rows are sent with executemany in chunks, progress(done, total) is called after each chunk
+    -> The whole batch is retried with backoff if another writer holds the lock
+    -> Returns the number of rows written
+
+    '''
+    def execute_many(self, sql: str, rows, chunk_size: int = 5000, progress=None) -> int:
+        rows = rows if isinstance(rows, list) else list(rows)
+        total = len(rows)
+
+        def work(conn, nested):
+            cur = conn.cursor()
+            if not nested:
+                # IMMEDIATE takes the write lock up front so the batch cannot fail half way on a lock
+                conn.commit()
+                cur.execute("BEGIN IMMEDIATE")
+            written = 0
+            for start in range(0, total, chunk_size):
+                cur.executemany(sql, rows[start:start + chunk_size])
+                written += cur.rowcount
+                if progress is not None:
+                    progress(min(start + chunk_size, total), total)
+            if not nested:
+                conn.commit()
+            return written
+
+        written = self._write(work)
+        table = table_written_by(sql)
+        if table is not None:
+            bump_generation(table)
+        return written
+
 
     '''
     Returns only one row of data after execution of a SQL query
 
     '''
     def fetch_one(self, sql: str, params: Iterable[Any] = ()):
-        if self._connection is None:
-            self.connect()
-
-        cur = self._connection.cursor()
-        cur.execute(sql, tuple(params))
-        return cur.fetchone()
+        with self._checkout() as conn:
+            cur = conn.cursor()
+            cur.execute(sql, tuple(params))
+            return cur.fetchone()
 
     '''
     Returns all matching rows of data after execution of SQL query
     '''
     def fetch_all(self, sql: str, params: Iterable[Any] = ()):
-        if self._connection is None:
-            self.connect()
+        with self._checkout() as conn:
+            cur = conn.cursor()
+            cur.execute(sql, tuple(params))
+            return cur.fetchall()
+
+    '''
+    Returns the result of a SELECT as a typed DataFrame, built column by column from the cursor
+    -> dtypes maps column name -> dtype e.g. {"severity": "category", "incident_id": "int64"}
+    -> parse_dates lists timestamp columns, parsed once per column
+    -> Rows are read in chunks so only one chunk of Python tuples is alive at a time
+    '''
+    def fetch_frame(self, sql: str, params: Iterable[Any] = (), dtypes: dict | None = None,
+                    parse_dates: Iterable[str] = (), chunk_size: int = 50_000) -> pd.DataFrame:
+        dtypes = dtypes or {}
+        parse_dates = set(parse_dates)
 
-        cur = self._connection.cursor()
-        cur.execute(sql, tuple(params))
-        return cur.fetchall()
+        with self._checkout() as conn:
+            cur = conn.cursor()
+            cur.execute(sql, tuple(params))
+            names = [c[0] for c in cur.description]
+            parts: dict[str, list] = {name: [] for name in names}
+
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                # Transpose the chunk into columns and convert each column in one go
+                for name, values in zip(names, zip(*rows)):
+                    dtype = dtypes.get(name)
+                    if dtype == "category":
+                        parts[name].append(pd.Categorical(values))
+                    elif name in parse_dates:
+                        parts[name].append(pd.to_datetime(pd.Series(values, dtype=object), errors="coerce", format="mixed"))
+                    elif dtype is not None:
+                        parts[name].append(pd.Series(values, dtype=dtype))
+                    else:
+                        parts[name].append(pd.Series(values))
+
+        columns = {}
+        for name in names:
+            chunks = parts[name]
+            if not chunks:
+                empty_dtype = "datetime64[ns]" if name in parse_dates else dtypes.get(name, object)
+                columns[name] = pd.Series([], dtype=empty_dtype)
+            elif dtypes.get(name) == "category":
+                columns[name] = pd.Series(union_categoricals(chunks) if len(chunks) > 1 else chunks[0])
+            else:
+                columns[name] = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+        return pd.DataFrame(columns)
+
+    '''
+    Returns the write and lock contention counters collected by execute_query / execute_many
+    -> lock_waits counts attempts that found the database locked, lock_wait_time_s is the time they
+       spent blocked plus the backoff before the next attempt
+    '''
+    def lock_stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "writes": self._writes,
+                "write_time_s": round(self._write_time, 6),
+                "avg_write_ms": round(self._write_time / self._writes * 1000, 3) if self._writes else 0.0,
+                "lock_waits": self._lock_waits,
+                "lock_wait_time_s": round(self._lock_wait_time, 6),
+                "failed_writes": self._failed_writes,
+            }
+
+    '''
+    Returns the connection pool counters (checkouts, waits, open/idle connections)
+    '''
+    def pool_stats(self) -> dict:
+        pool = self._pool
+        return pool.stats() if pool is not None else {}
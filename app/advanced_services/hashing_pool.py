@@ -0,0 +1,159 @@
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+
+# bcrypt cost factor for new hashes - every +1 doubles the work (12 is bcrypt's default)
+DEFAULT_ROUNDS = 12
+
+
+class HashingBusyError(RuntimeError):
+    '''
+    Raised when too many hash/verify requests are already waiting for a worker
+    '''
+
+
+# Worker functions run in the child processes - module level so they can be pickled
+def _hash(plain: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(plain, bcrypt.gensalt(rounds))
+
+def _check(plain: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(plain, hashed)
+
+
+class PasswordHashPool:
+    '''
+    Runs bcrypt hashing and verification on a bounded pool of worker processes
+
+    -> Keeps the CPU-heavy bcrypt work off the Streamlit script threads and off the GIL
+    -> At most max_workers hashes run at once, at most max_pending requests wait for a worker
+    -> Requests beyond max_pending fail fast with HashingBusyError instead of piling up
+    -> The pool is started lazily, on the first request
+    '''
+
+    def __init__(self, max_workers: int | None = None, max_pending: int = 64,
+                 rounds: int = DEFAULT_ROUNDS, timeout: float = 30.0):
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._max_pending = max_pending
+        self._rounds = rounds
+        self._timeout = timeout
+
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+
+        # Queue depth and throughput counters
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._failed = 0
+        self._busy_time = 0.0
+
+    @property
+    def rounds(self) -> int:
+        return self._rounds
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork - forking a process that runs Streamlit's threads is not safe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashingBusyError("Too many login/registration requests in progress, please try again.")
+
+        started = time.perf_counter()
+        with self._lock:
+            self._submitted += 1
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        try:
+            result = self._get_executor().submit(func, *args).result(timeout=self._timeout)
+            with self._lock:
+                self._completed += 1
+            return result
+        except BrokenProcessPool:
+            # A worker died - drop the pool so the next request starts a fresh one
+            with self._lock:
+                self._failed += 1
+                self._executor = None
+            raise
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._busy_time += time.perf_counter() - started
+            self._slots.release()
+
+    def hash_password(self, plain: str) -> str:
+        '''
+        bcrypt hash of a plain-text password, computed in a worker process
+        '''
+        return self._run(_hash, plain.encode("utf-8"), self._rounds).decode("utf-8")
+
+    def check_password(self, plain: str, hashed: str) -> bool:
+        '''
+        Whether a plain-text password matches a stored bcrypt hash, checked in a worker process
+        '''
+        return self._run(_check, plain.encode("utf-8"), hashed.encode("utf-8"))
+
+    def stats(self) -> dict:
+        with self._lock:
+            finished = self._completed + self._failed
+            return {
+                "workers": self._max_workers,
+                "rounds": self._rounds,
+                "in_flight": self._in_flight,
+                "queued": max(0, self._in_flight - self._max_workers),
+                "peak_in_flight": self._peak_in_flight,
+                "max_pending": self._max_pending,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "failed": self._failed,
+                "avg_latency_ms": round(self._busy_time / finished * 1000, 2) if finished else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# Process-wide pool shared by every session
+_hash_pool = PasswordHashPool()
+_hash_pool_lock = threading.Lock()
+
+def get_hash_pool() -> PasswordHashPool:
+    return _hash_pool
+
+def configure_hash_pool(**settings) -> PasswordHashPool:
+    '''
+    Replace the shared pool e.g. configure_hash_pool(max_workers=4, max_pending=32, rounds=12)
+    '''
+    global _hash_pool
+    with _hash_pool_lock:
+        old, _hash_pool = _hash_pool, PasswordHashPool(**settings)
+    old.shutdown()
+    return _hash_pool
+
+atexit.register(lambda: _hash_pool.shutdown())
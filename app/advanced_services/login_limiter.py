@@ -0,0 +1,218 @@
+import threading
+import time
+from collections import deque
+
+
+class _Throttle:
+    '''
+    Failure history and lockout state of one (client, username) pair
+    '''
+    __slots__ = ("failures", "lockouts", "locked_until")
+
+    def __init__(self, lockouts: int = 0, locked_until: float = 0.0):
+        self.failures: deque = deque()
+        self.lockouts = lockouts
+        self.locked_until = locked_until
+
+
+class LoginRateLimiter:
+    '''
+    Decides whether a login attempt may go on to the (expensive) bcrypt check
+
+    -> Lockouts are keyed by (client, username) only - guessing one account locks that account for that
+       client, never for other clients and never other users behind the same NAT or proxy
+    -> Sliding window per pair: max_failures failed attempts within window seconds locks the pair out
+    -> Lockouts grow exponentially (base_lockout, 2x, 4x ... up to max_lockout) and reset on a successful login
+    -> Token bucket per client (IP address), sized for a shared IP: bucket_capacity attempts in a burst,
+       refilled at refill_per_second; past that attempts are delayed (up to max_delay seconds) rather
+       than refused - only a flood that would need a longer delay is refused
+    -> Without a client id there is no lockout and the bucket is per username - it only ever delays,
+       so nobody can block a chosen user's logins
+    -> Rejections cost a dict lookup under a lock - no database query and no hashing
+    -> With a db, lockouts are saved in the login_throttle table and reloaded on start
+    '''
+
+    def __init__(self, db=None, window: float = 300.0, max_failures: int = 5,
+                 bucket_capacity: int = 60, refill_per_second: float = 1.0, max_delay: float = 5.0,
+                 base_lockout: float = 30.0, max_lockout: float = 3600.0, max_keys: int = 100_000):
+        self._db = db
+        self._window = window
+        self._max_failures = max_failures
+        self._bucket_capacity = bucket_capacity
+        self._refill_per_second = refill_per_second
+        self._max_delay = max_delay
+        self._base_lockout = base_lockout
+        self._max_lockout = max_lockout
+        self._max_keys = max_keys
+
+        self._throttles: dict[str, _Throttle] = {}
+        self._buckets: dict[str, list] = {}   # key -> [tokens, last refill time]
+        self._lock = threading.Lock()
+
+        # Rejected versus verified attempts
+        self._rejected_locked = 0
+        self._rejected_rate = 0
+        self._delayed = 0
+        self._verified_ok = 0
+        self._verified_failed = 0
+        self._lockouts = 0
+
+        if db is not None:
+            self._load()
+
+    @staticmethod
+    def _keys(username: str, client: str | None) -> list[str]:
+        # Lockout keys - none when the client is unknown, a username alone would let anyone lock the account
+        if not client:
+            return []
+        return [f"login:{client}|{username.lower()}"]
+
+    @staticmethod
+    def _bucket_key(username: str, client: str | None) -> str:
+        return f"client:{client}" if client else f"user:{username.lower()}"
+
+    def _load(self) -> None:
+        '''
+        Reload saved lockouts - rows whose lock ran out long ago are ignored
+        '''
+        now = time.time()
+        rows = self._db.fetch_all(
+            "SELECT key, lockouts, locked_until FROM login_throttle WHERE locked_until > ?",
+            (now - self._max_lockout,),
+        )
+        for key, lockouts, locked_until in rows:
+            # Older rows keyed by username or client alone no longer lock anything out
+            if key.startswith("login:"):
+                self._throttles[key] = _Throttle(lockouts, locked_until)
+
+    def _save(self, key: str, throttle: _Throttle) -> None:
+        if self._db is not None:
+            self._db.execute_query(
+                """
+                INSERT INTO login_throttle (key, lockouts, locked_until) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET lockouts = excluded.lockouts, locked_until = excluded.locked_until
+                """,
+                (key, throttle.lockouts, throttle.locked_until),
+            )
+
+    def _forget(self, key: str) -> None:
+        if self._db is not None:
+            self._db.execute_query("DELETE FROM login_throttle WHERE key = ?", (key,))
+
+    def _take_token(self, key: str, now: float, refuse: bool) -> float | None:
+        '''
+        Seconds the attempt has to wait for its token (0.0 if one is free), None if it is refused
+        -> Waiting attempts borrow their token, so attempts queued together are spaced out
+        -> Past max_delay a refusing bucket refuses, a non-refusing one caps the wait at max_delay
+        '''
+        # Called with the lock held
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self._bucket_capacity), now]
+        tokens = min(self._bucket_capacity, bucket[0] + (now - bucket[1]) * self._refill_per_second)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0.0
+        wait = (1 - tokens) / self._refill_per_second
+        if wait > self._max_delay:
+            bucket[0] = tokens
+            return None if refuse else self._max_delay
+        bucket[0] = tokens - 1
+        return wait
+
+    def _prune(self, now: float) -> None:
+        # Called with the lock held - drop keys that are neither locked nor carrying recent failures
+        if len(self._throttles) > self._max_keys:
+            for key in [k for k, t in self._throttles.items()
+                        if t.locked_until <= now and (not t.failures or t.failures[-1] <= now - self._window)]:
+                del self._throttles[key]
+        if len(self._buckets) > self._max_keys:
+            full_after = self._bucket_capacity / self._refill_per_second
+            for key in [k for k, (_, last) in self._buckets.items() if now - last >= full_after]:
+                del self._buckets[key]
+
+    def check(self, username: str, client: str | None = None) -> tuple[bool, str]:
+        '''
+        (True, "") if the attempt may be verified, otherwise (False, message for the user)
+        -> A throttled attempt sleeps here (at most max_delay seconds) before it is let through
+        '''
+        now = time.time()
+        keys = self._keys(username, client)
+        with self._lock:
+            locked_until = max((self._throttles[k].locked_until for k in keys if k in self._throttles), default=0.0)
+            if locked_until > now:
+                self._rejected_locked += 1
+                return False, f"Too many failed attempts. Try again in {int(locked_until - now) + 1} seconds."
+
+            # Only a known client's flood is refused - a username-only bucket must not block a user's logins
+            delay = self._take_token(self._bucket_key(username, client), now, refuse=bool(client))
+            if delay is None:
+                self._rejected_rate += 1
+                return False, "Too many login attempts. Please slow down and try again shortly."
+            if delay:
+                self._delayed += 1
+        if delay:
+            time.sleep(delay)
+        return True, ""
+
+    def record_failure(self, username: str, client: str | None = None) -> None:
+        '''
+        A verified attempt failed - may start a lockout for the (client, username) pair
+        '''
+        now = time.time()
+        locked = []
+        with self._lock:
+            self._verified_failed += 1
+            for key in self._keys(username, client):
+                throttle = self._throttles.get(key)
+                if throttle is None:
+                    throttle = self._throttles[key] = _Throttle()
+                throttle.failures.append(now)
+                while throttle.failures and throttle.failures[0] <= now - self._window:
+                    throttle.failures.popleft()
+                if len(throttle.failures) < self._max_failures:
+                    continue
+
+                # Quiet for longer than max_lockout since the last lock - start again from base_lockout
+                if now - throttle.locked_until > self._max_lockout:
+                    throttle.lockouts = 0
+                throttle.lockouts += 1
+                throttle.locked_until = now + min(self._max_lockout, self._base_lockout * 2 ** (throttle.lockouts - 1))
+                throttle.failures.clear()
+                self._lockouts += 1
+                locked.append((key, throttle))
+            self._prune(now)
+
+        for key, throttle in locked:
+            self._save(key, throttle)
+
+    def record_success(self, username: str, client: str | None = None) -> None:
+        '''
+        A verified attempt succeeded - clears the failures and lockout level of this (client, username) pair
+        -> Other pairs of the same client keep their history, one good account must not unlock guessing at others
+        '''
+        keys = self._keys(username, client)
+        with self._lock:
+            self._verified_ok += 1
+            throttle = self._throttles.pop(keys[0], None) if keys else None
+        if throttle is not None and throttle.lockouts:
+            self._forget(keys[0])
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.time()
+            rejected = self._rejected_locked + self._rejected_rate
+            verified = self._verified_ok + self._verified_failed
+            return {
+                "rejected": rejected,
+                "rejected_locked": self._rejected_locked,
+                "rejected_rate": self._rejected_rate,
+                "delayed": self._delayed,
+                "verified": verified,
+                "verified_ok": self._verified_ok,
+                "verified_failed": self._verified_failed,
+                "lockouts": self._lockouts,
+                "locked_keys": sum(1 for t in self._throttles.values() if t.locked_until > now),
+                "rejected_share": round(rejected / (rejected + verified), 4) if rejected + verified else 0.0,
+            }
@@ -0,0 +1,159 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+
+TOTAL = "(total)"
+
+
+@dataclass
+class SectionTiming:
+    '''
+    One timed section of a page run - start is the offset from the start of the run
+    '''
+    name: str
+    start_s: float
+    duration_s: float
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    '''
+    Nearest-rank percentile of an already sorted list
+    '''
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+class PageProfile:
+    '''
+    Times the named sections of one run of a page script
+
+    -> start(name) ends the current section and begins the next, so a script can be cut into sections
+       without re-indenting it; section(name) times a with-block and may sit inside a started section
+    -> finish() closes the run, adds it to the rolling statistics and returns the timings in start order
+    '''
+
+    enabled = True
+
+    def __init__(self, page: str, store: "PageProfiler"):
+        self.page = page
+        self._store = store
+        self._started = time.perf_counter()
+        self._current: tuple[str, float] | None = None
+        self._timings: list[SectionTiming] = []
+        self._finished = False
+
+    def _add(self, name: str, started: float) -> None:
+        now = time.perf_counter()
+        self._timings.append(SectionTiming(name, started - self._started, now - started))
+
+    def start(self, name: str) -> None:
+        self.stop()
+        self._current = (name, time.perf_counter())
+
+    def stop(self) -> None:
+        if self._current is not None:
+            name, started = self._current
+            self._current = None
+            self._add(name, started)
+
+    @contextmanager
+    def section(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, started)
+
+    def finish(self) -> list[SectionTiming]:
+        if not self._finished:
+            self.stop()
+            self._finished = True
+            self._timings.sort(key=lambda timing: timing.start_s)
+            self._timings.append(SectionTiming(TOTAL, 0.0, time.perf_counter() - self._started))
+            self._store.record(self.page, self._timings)
+        return self._timings
+
+
+class DisabledProfile:
+    '''
+    Stand-in used when profiling is off - every call is a no-op
+    '''
+
+    enabled = False
+
+    def start(self, name: str) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    @contextmanager
+    def section(self, name: str):
+        yield
+
+    def finish(self) -> list[SectionTiming]:
+        return []
+
+
+class PageProfiler:
+    '''
+    Rolling per-section timings of every profiled page, shared by all sessions
+
+    -> Keeps the last `window` durations of each (page, section) and reports p50/p95/p99 over them
+    -> Memory is bounded by window x number of distinct sections
+    '''
+
+    def __init__(self, window: int = 200):
+        self._window = window
+        self._durations: dict[tuple[str, str], deque] = {}
+        self._lock = threading.Lock()
+
+    def begin(self, page: str) -> PageProfile:
+        return PageProfile(page, self)
+
+    def record(self, page: str, timings: list[SectionTiming]) -> None:
+        with self._lock:
+            for timing in timings:
+                durations = self._durations.get((page, timing.name))
+                if durations is None:
+                    durations = self._durations[(page, timing.name)] = deque(maxlen=self._window)
+                durations.append(timing.duration_s)
+
+    def percentiles(self, page: str | None = None) -> list[dict]:
+        '''
+        One row per section (ms) - for one page or every page
+        '''
+        with self._lock:
+            items = [(key, list(durations)) for key, durations in self._durations.items()
+                     if page is None or key[0] == page]
+        rows = []
+        for (section_page, name), durations in items:
+            last = durations[-1]
+            durations.sort()
+            rows.append({
+                "page": section_page,
+                "section": name,
+                "runs": len(durations),
+                "last_ms": round(last * 1000, 1),
+                "p50_ms": round(percentile(durations, 0.50) * 1000, 1),
+                "p95_ms": round(percentile(durations, 0.95) * 1000, 1),
+                "p99_ms": round(percentile(durations, 0.99) * 1000, 1),
+                "max_ms": round(durations[-1] * 1000, 1),
+            })
+        return sorted(rows, key=lambda row: (row["page"], row["section"] != TOTAL, -row["p50_ms"]))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._durations.clear()
+
+
+# Process-wide profiler shared by every session
+_page_profiler = PageProfiler()
+
+def get_page_profiler() -> PageProfiler:
+    return _page_profiler
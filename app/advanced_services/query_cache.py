@@ -0,0 +1,202 @@
+import re
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass, replace
+from functools import wraps
+
+import pandas as pd
+
+
+# Finds the table a write statement targets e.g. INSERT INTO cyber_incidents / UPDATE it_tickets
+_WRITE_TABLE = re.compile(
+    r"^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+[\"'`\[]?(\w+)",
+    re.IGNORECASE,
+)
+
+def table_written_by(sql: str) -> str | None:
+    '''
+    Returns the table an INSERT/UPDATE/DELETE statement writes to, or None for reads
+    '''
+    match = _WRITE_TABLE.match(sql)
+    return match.group(1).lower() if match else None
+
+
+def estimate_size(value) -> int:
+    '''
+    Rough size in bytes of a cached result - DataFrames, dataclasses of DataFrames or plain values
+    '''
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if is_dataclass(value):
+        return sys.getsizeof(value) + sum(estimate_size(getattr(value, f.name)) for f in fields(value))
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _freeze(value):
+    # Hashable form of a query argument - lists/sets/dicts (e.g. the trend values) become tuples
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+def _copy_result(value):
+    '''
+    Private copy of a cached result for one caller - an in-place change (sort, new column) must not
+    reach the cached value that every other session is served
+    '''
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    if is_dataclass(value) and not isinstance(value, type):
+        return replace(value, **{f.name: _copy_result(getattr(value, f.name)) for f in fields(value) if f.init})
+    if isinstance(value, list):
+        return [_copy_result(v) for v in value]
+    return value
+
+
+class QueryCache:
+    '''
+    LRU cache for analytical query results
+
+    -> Keys include a generation counter for every table the query reads
+    -> A write to a table bumps its generation, so older results are never served again
+    -> Bounded both by number of entries and by estimated memory
+    -> Generations live in this process only: writes made by another process (main.py, the CLI in
+       auth.py, another server worker) do not invalidate it - results can be stale there until
+       the entry is evicted or the process restarts
+    '''
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()   # key -> (value, size, tables)
+        self._generations: dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def generation(self, table: str) -> int:
+        with self._lock:
+            return self._generations.get(table, 0)
+
+    def bump(self, table: str) -> None:
+        '''
+        Mark a table as changed and drop the results that were built from it
+        '''
+        table = table.lower()
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            stale = [key for key, (_, _, tables) in self._entries.items() if table in tables]
+            for key in stale:
+                _, size, _ = self._entries.pop(key)
+                self._bytes -= size
+                self._invalidations += 1
+
+    def get(self, key):
+        '''
+        Returns (True, value) on a hit and (False, None) on a miss
+        '''
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return True, entry[0]
+
+    def put(self, key, value, tables) -> None:
+        size = estimate_size(value)
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size, frozenset(tables))
+            self._bytes += size
+            # Evict least recently used entries until both limits hold
+            while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self._max_entries,
+                "max_bytes": self._max_bytes,
+            }
+
+
+# Process-wide cache shared by every session
+_query_cache = QueryCache()
+
+def get_query_cache() -> QueryCache:
+    return _query_cache
+
+def bump_generation(table: str) -> None:
+    '''
+    Called after a write so cached results for the table are no longer served
+    '''
+    _query_cache.bump(table)
+
+
+def cached_query(*tables: str):
+    '''
+    Decorator for analytical query functions whose first argument is the database
+
+    -> tables lists every table the query reads from
+    -> Databases without a db_path (e.g. test doubles) bypass the cache
+    -> Every caller gets its own copy of the result (DataFrames copied), so callers may modify it
+    -> List/dict arguments are turned into tuples for the key
+    -> Only writes made in this process invalidate results (see QueryCache)
+    '''
+    tables = tuple(t.lower() for t in tables)
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(db, *args, **kwargs):
+            db_path = getattr(db, "db_path", None)
+            if db_path is None:
+                return func(db, *args, **kwargs)
+
+            key = (
+                func.__module__,
+                func.__qualname__,
+                db_path,
+                _freeze(args),
+                _freeze(kwargs),
+                tuple(_query_cache.generation(t) for t in tables),
+            )
+            hit, value = _query_cache.get(key)
+            if hit:
+                return _copy_result(value)
+            value = func(db, *args, **kwargs)
+            _query_cache.put(key, value, tables)
+            return _copy_result(value)
+        return wrapper
+    return decorator
@@ -0,0 +1,331 @@
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from collections import Counter, deque
+from datetime import datetime
+
+
+# Upper bounds (ms) of the latency histogram buckets - the last bucket takes everything slower
+LATENCY_BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+# Slow-query logs are only written here - callers pick a file name, never a path
+SLOW_LOG_DIR = os.path.join("DATA", "logs")
+_LOG_NAME = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9_.-]*")
+
+# Frames in these files are plumbing, the call site is the first frame outside them
+_PLUMBING = ("query_stats.py", "database_manager.py", os.path.join("app", "data", "db.py"),
+             "contextlib.py", "weakref.py", os.path.join("pandas", ""), "threading.py")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    '''
+    One line, single-spaced statement text - statements that differ only in layout are counted together
+    '''
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def _call_site() -> str:
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not any(part in filename for part in _PLUMBING):
+            return f"{os.path.relpath(filename) if filename.startswith(os.getcwd()) else filename}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "?"
+
+
+class _StatementStats:
+    __slots__ = ("calls", "total_s", "max_s", "rows", "histogram", "call_sites")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.rows = 0
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.call_sites = Counter()
+
+    def percentile_ms(self, fraction: float) -> float:
+        '''
+        Upper bound of the histogram bucket holding the given fraction of calls
+        '''
+        target, seen = fraction * self.calls, 0
+        for bound, n in zip(LATENCY_BUCKETS_MS, self.histogram):
+            seen += n
+            if seen >= target:
+                return bound
+        return round(self.max_s * 1000, 3)
+
+
+class QueryRecorder:
+    '''
+    Instrumentation hook that records every statement run on an instrumented connection
+
+    -> Per statement: calls, total/max time, latency histogram, rows returned or changed, call sites
+    -> Statements slower than slow_ms go to the slow-query log with their EXPLAIN QUERY PLAN
+    -> The slow-query log is kept in memory (last max_slow entries) and appended to log_path as JSON lines
+    '''
+
+    def __init__(self, slow_ms: float = 100.0, log_path: str | None = None, max_slow: int = 200,
+                 max_statements: int = 2000):
+        self.slow_ms = slow_ms
+        self.log_path = log_path
+        self._max_statements = max_statements
+        self._statements: dict[str, _StatementStats] = {}
+        self._slow = deque(maxlen=max_slow)
+        self._lock = threading.Lock()
+        self._started = time.time()
+
+    def record(self, conn, sql: str, params, elapsed: float, rows: int, many: bool = False) -> None:
+        key = normalize_sql(sql)
+        site = _call_site()
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                if len(self._statements) >= self._max_statements:
+                    return
+                stats = self._statements[key] = _StatementStats()
+            stats.calls += 1
+            stats.total_s += elapsed
+            stats.max_s = max(stats.max_s, elapsed)
+            stats.rows += max(rows, 0)
+            stats.histogram[bisect_left(LATENCY_BUCKETS_MS, elapsed * 1000)] += 1
+            stats.call_sites[site] += 1
+
+        if elapsed * 1000 >= self.slow_ms:
+            self._log_slow(conn, key, sql, params, elapsed, rows, site, many)
+
+    def _log_slow(self, conn, key, sql, params, elapsed, rows, site, many) -> None:
+        plan = None
+        if not many:
+            try:
+                # A plain cursor, so the EXPLAIN itself is not recorded
+                plan = [row[-1] for row in sqlite3.Cursor(conn).execute("EXPLAIN QUERY PLAN " + sql, params)]
+            except sqlite3.Error:
+                plan = None
+        entry = {
+            "at": datetime.now().isoformat(timespec="seconds"),
+            "ms": round(elapsed * 1000, 3),
+            "rows": rows,
+            "sql": key,
+            "params": None if many else repr(params)[:200],
+            "call_site": site,
+            "plan": plan,
+        }
+        with self._lock:
+            self._slow.append(entry)
+            if self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+
+    def top(self, n: int = 20, by: str = "total_ms") -> list[dict]:
+        '''
+        The n statements with the highest total_ms (or calls, avg_ms, max_ms, rows)
+        '''
+        with self._lock:
+            rows = [{
+                "sql": sql,
+                "calls": s.calls,
+                "total_ms": round(s.total_s * 1000, 3),
+                "avg_ms": round(s.total_s / s.calls * 1000, 3),
+                "p50_ms": s.percentile_ms(0.5),
+                "p95_ms": s.percentile_ms(0.95),
+                "max_ms": round(s.max_s * 1000, 3),
+                "rows": s.rows,
+                "call_sites": dict(s.call_sites.most_common(3)),
+            } for sql, s in self._statements.items() if s.calls]
+        return sorted(rows, key=lambda row: row[by], reverse=True)[:n]
+
+    def histogram(self, sql: str) -> dict:
+        '''
+        Latency histogram of one statement - bucket upper bound (ms) -> calls
+        '''
+        with self._lock:
+            stats = self._statements.get(normalize_sql(sql))
+            counts = list(stats.histogram) if stats else [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        labels = [f"<= {bound:g}" for bound in LATENCY_BUCKETS_MS] + [f"> {LATENCY_BUCKETS_MS[-1]:g}"]
+        return dict(zip(labels, counts))
+
+    def slow_queries(self) -> list[dict]:
+        with self._lock:
+            return list(reversed(self._slow))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "statements": len(self._statements),
+                "calls": sum(s.calls for s in self._statements.values()),
+                "total_ms": round(sum(s.total_s for s in self._statements.values()) * 1000, 3),
+                "slow_logged": len(self._slow),
+                "slow_ms": self.slow_ms,
+                "recording_s": round(time.time() - self._started, 1),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._statements.clear()
+            self._slow.clear()
+            self._started = time.time()
+
+
+# The active hook - None means instrumentation is off and the cursors go straight to sqlite3
+_hook: QueryRecorder | None = None
+
+def get_query_hook() -> QueryRecorder | None:
+    return _hook
+
+def set_query_hook(hook) -> None:
+    '''
+    Install any object with record(conn, sql, params, elapsed, rows, many) - None turns instrumentation off
+    '''
+    global _hook
+    _hook = hook
+
+# The recorder used by enable_query_stats - kept when recording is switched off, so its numbers can still be read
+_recorder: QueryRecorder | None = None
+
+def get_query_recorder() -> QueryRecorder | None:
+    return _recorder
+
+def slow_log_path(log_name: str) -> str:
+    '''
+    Path of a slow-query log in SLOW_LOG_DIR - ValueError unless log_name is a plain file name
+    '''
+    if not _LOG_NAME.fullmatch(log_name or ""):
+        raise ValueError(f"Invalid log file name '{log_name}' - use letters, digits, '_', '-' and '.' only")
+    os.makedirs(SLOW_LOG_DIR, exist_ok=True)
+    return os.path.join(SLOW_LOG_DIR, log_name)
+
+def enable_query_stats(slow_ms: float = 100.0, log_name: str | None = None) -> QueryRecorder:
+    '''
+    Start recording - continues the previous recorder (with the new settings) if there is one
+    -> log_name is a file name inside SLOW_LOG_DIR, not a path
+    '''
+    global _recorder
+    log_path = slow_log_path(log_name) if log_name else None
+    if _recorder is None:
+        _recorder = QueryRecorder()
+    _recorder.slow_ms = slow_ms
+    _recorder.log_path = log_path
+    set_query_hook(_recorder)
+    return _recorder
+
+def disable_query_stats() -> None:
+    set_query_hook(None)
+
+
+def _finish_dropped(conn, pending: list) -> None:
+    # Records a fetched statement once - pending[0] (the SQL) is cleared when it has been recorded
+    sql, parameters, elapsed, rows = pending
+    pending[0] = None
+    if sql is not None and _hook is not None:
+        _hook.record(conn, sql, parameters, elapsed, rows)
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    '''
+    sqlite3 cursor that reports each statement to the active hook
+    -> A statement's time runs from execute() until its rows have been fetched, so SELECTs include the fetch
+    -> With no hook installed each call costs one extra attribute check
+    '''
+
+    _pending = None   # [sql, params, elapsed, rows] of the statement whose rows are being fetched
+
+    def execute(self, sql, parameters=()):
+        if _hook is None:
+            return super().execute(sql, parameters)
+        self._finish()
+        started = time.perf_counter()
+        super().execute(sql, parameters)
+        elapsed = time.perf_counter() - started
+        if self.description is None:
+            # No result rows (INSERT/UPDATE/DELETE/DDL) - the statement is done
+            _hook.record(self.connection, sql, parameters, elapsed, self.rowcount)
+        else:
+            self._pending = pending = [sql, parameters, elapsed, 0]
+            # e.g. fetch_one reads a single row and drops the cursor - the statement ends with the cursor
+            weakref.finalize(self, _finish_dropped, self.connection, pending)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        if _hook is None:
+            return super().executemany(sql, seq_of_parameters)
+        self._finish()
+        started = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        _hook.record(self.connection, sql, (), time.perf_counter() - started, self.rowcount, many=True)
+        return self
+
+    def _fetched(self, started: float, rows: int, done: bool) -> None:
+        pending = self._pending
+        pending[2] += time.perf_counter() - started
+        pending[3] += rows
+        if done:
+            self._finish()
+
+    def _finish(self) -> None:
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            _finish_dropped(self.connection, pending)
+
+    def fetchone(self):
+        if self._pending is None:
+            return super().fetchone()
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(started, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        if self._pending is None:
+            return super().fetchmany(self.arraysize if size is None else size)
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(started, len(rows), not rows)
+        return rows
+
+    def fetchall(self):
+        if self._pending is None:
+            return super().fetchall()
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows), True)
+        return rows
+
+    def close(self):
+        self._finish()
+        super().close()
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    '''
+    sqlite3 connection whose cursors (and execute shortcuts) are InstrumentedCursors
+    -> Used by ConnectionPool, so DatabaseManager and the app/data helpers are both covered
+    '''
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    # With no hook the C shortcuts are used as they are, their plain cursors are not instrumented
+    def execute(self, sql, parameters=()):
+        if _hook is None:
+            return super().execute(sql, parameters)
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        if _hook is None:
+            return super().executemany(sql, seq_of_parameters)
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# QUERY_STATS=1 turns recording on at start-up, SLOW_QUERY_MS / SLOW_QUERY_LOG (a file name in SLOW_LOG_DIR) set the slow-query log
+if os.environ.get("QUERY_STATS") == "1":
+    enable_query_stats(float(os.environ.get("SLOW_QUERY_MS", "100")), os.environ.get("SLOW_QUERY_LOG"))
@@ -0,0 +1,73 @@
+import streamlit as st
+from google import genai
+
+from app.advanced_services.ai_cache import AIResponseCache
+from app.advanced_services.auth_manager import AuthManager
+from app.advanced_services.database_manager import DatabaseManager
+
+'''
+    Process-wide resources shared by every Streamlit session
+    -> st.cache_resource builds each resource once per process instead of on every rerun/session
+    -> The database owns one bounded connection pool, so many analysts share a handful of connections
+    -> The database is health-checked on each access and reconnected if the check fails
+    -> The AI client is only created the first time a page actually calls the model
+    -> AI analyser answers go through one shared response cache stored in the database
+
+'''
+
+DB_FILE = "DATA/intelligence_platform.db"
+
+
+@st.cache_resource(show_spinner=False)
+def _database(db_path: str) -> DatabaseManager:
+    db = DatabaseManager(db_path)
+    db.connect()
+    return db
+
+
+def get_database(db_path: str = DB_FILE) -> DatabaseManager:
+    '''
+    Shared DatabaseManager - reconnects its pool if the health check fails
+    '''
+    return _database(db_path).ensure_connected()
+
+
+@st.cache_resource(show_spinner=False)
+def _auth_manager(db_path: str) -> AuthManager:
+    return AuthManager(_database(db_path))
+
+
+def get_auth_manager(db_path: str = DB_FILE) -> AuthManager:
+    '''
+    Shared AuthManager, backed by the shared DatabaseManager
+    '''
+    get_database(db_path)
+    return _auth_manager(db_path)
+
+
+@st.cache_resource(show_spinner=False)
+def get_ai_client() -> genai.Client:
+    '''
+    Shared Gemini client, created lazily on first use
+    '''
+    return genai.Client(api_key=st.secrets["GEMINI_API_KEY"])
+
+
+@st.cache_resource(show_spinner=False)
+def _ai_cache(db_path: str) -> AIResponseCache:
+    return AIResponseCache(_database(db_path))
+
+
+def get_ai_cache(db_path: str = DB_FILE) -> AIResponseCache:
+    '''
+    Shared AI response cache, backed by the shared DatabaseManager
+    '''
+    get_database(db_path)
+    return _ai_cache(db_path)
+
+
+def reset_ai_client() -> None:
+    '''
+    Drop the cached Gemini client so the next get_ai_client() builds a new one (e.g. after a connection error)
+    '''
+    get_ai_client.clear()
@@ -0,0 +1,189 @@
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+# Default lifetime of a session token - 8 hours, one working day
+DEFAULT_TTL = 8 * 60 * 60
+
+# Lifetime of a one-time code that lets the browser swap it for the session cookie
+HANDOFF_TTL = 60
+
+
+@dataclass(frozen=True)
+class Session:
+    '''
+    A logged-in user as recorded in the token store
+    '''
+    username: str
+    role: str
+    expires_at: float
+    client: str | None = None
+
+
+class SessionTokenStore:
+    '''
+    Server-side store of signed, expiring session tokens
+
+    -> A token is "<id>.<HMAC-SHA256 of id>" - a forged or mangled token fails the signature
+       check before the store is even looked at
+    -> Validating a token is one HMAC plus one dict lookup - no database query, no bcrypt
+    -> Tokens expire ttl seconds after they are issued and are revoked on logout
+    -> A token issued to a known client (IP address) is only accepted from that client
+    -> Entries are kept in issue order, so expired ones are always at the front and are
+       evicted from there; at most max_tokens live sessions are kept (oldest dropped first)
+    -> handoff()/redeem() swap a token for a single-use code, so the browser can fetch its cookie
+       without the token ever appearing in the page or the URL
+    '''
+
+    def __init__(self, secret: bytes | None = None, ttl: float = DEFAULT_TTL, max_tokens: int = 10_000):
+        self._secret = secret or secrets.token_bytes(32)
+        self._ttl = ttl
+        self._max_tokens = max_tokens
+        self._sessions: OrderedDict[str, Session] = OrderedDict()
+        self._handoffs: OrderedDict[str, tuple[str, float]] = OrderedDict()   # code -> (token, expires_at)
+        self._lock = threading.Lock()
+
+        self._issued = 0
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._revoked = 0
+        self._validations = 0
+        self._validate_time = 0.0
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl
+
+    def _sign(self, token_id: str) -> str:
+        return hmac.new(self._secret, token_id.encode("ascii"), hashlib.sha256).hexdigest()
+
+    def _split(self, token: str) -> str | None:
+        '''
+        The token id if the signature is valid, otherwise None
+        '''
+        token_id, _, signature = (token or "").partition(".")
+        if not token_id or not signature:
+            return None
+        try:
+            expected = self._sign(token_id)
+        except UnicodeEncodeError:
+            return None
+        return token_id if hmac.compare_digest(signature, expected) else None
+
+    def _evict_expired(self, now: float) -> None:
+        # Called with the lock held - every entry was issued with the same ttl, so stop at the first live one
+        while self._sessions:
+            token_id, session = next(iter(self._sessions.items()))
+            if session.expires_at > now:
+                break
+            del self._sessions[token_id]
+            self._expired += 1
+
+    def issue(self, username: str, role: str, client: str | None = None) -> str:
+        '''
+        New signed token for a user who has just proven their password, bound to client when it is known
+        '''
+        token_id = secrets.token_urlsafe(24)
+        now = time.time()
+        with self._lock:
+            self._evict_expired(now)
+            while len(self._sessions) >= self._max_tokens:
+                self._sessions.popitem(last=False)
+            self._sessions[token_id] = Session(username, role, now + self._ttl, client)
+            self._issued += 1
+        return f"{token_id}.{self._sign(token_id)}"
+
+    def validate(self, token: str, client: str | None = None) -> Session | None:
+        '''
+        The session a token belongs to, or None if it is forged, expired, revoked or used from another client
+        '''
+        started = time.perf_counter()
+        token_id = self._split(token)
+        with self._lock:
+            session = self._sessions.get(token_id) if token_id else None
+            if session is not None and session.expires_at <= time.time():
+                del self._sessions[token_id]
+                self._expired += 1
+                session = None
+            if session is not None and session.client is not None and session.client != client:
+                # Presented from somewhere other than the client it was issued to - not revoked, just refused
+                session = None
+            if session is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            self._validations += 1
+            self._validate_time += time.perf_counter() - started
+        return session
+
+    def handoff(self, token: str) -> str:
+        '''
+        Single-use code for a token, valid for HANDOFF_TTL seconds
+        '''
+        code = secrets.token_urlsafe(24)
+        now = time.time()
+        with self._lock:
+            while self._handoffs and next(iter(self._handoffs.values()))[1] <= now:
+                self._handoffs.popitem(last=False)
+            while len(self._handoffs) >= self._max_tokens:
+                self._handoffs.popitem(last=False)
+            self._handoffs[code] = (token, now + HANDOFF_TTL)
+        return code
+
+    def redeem(self, code: str) -> str | None:
+        '''
+        The token behind a handoff code - None if the code is unknown, used or expired
+        '''
+        with self._lock:
+            token, expires_at = self._handoffs.pop(code or "", (None, 0.0))
+        return token if expires_at > time.time() else None
+
+    def revoke(self, token: str) -> bool:
+        '''
+        Invalidate a token e.g. on logout - returns True if it was live
+        '''
+        token_id = self._split(token)
+        with self._lock:
+            if token_id is None or self._sessions.pop(token_id, None) is None:
+                return False
+            self._revoked += 1
+            return True
+
+    def revoke_user(self, username: str) -> int:
+        '''
+        Invalidate every token of a user e.g. after a password change - returns how many were live
+        '''
+        with self._lock:
+            stale = [token_id for token_id, session in self._sessions.items() if session.username == username]
+            for token_id in stale:
+                del self._sessions[token_id]
+            self._revoked += len(stale)
+            return len(stale)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._evict_expired(time.time())
+            return {
+                "live": len(self._sessions),
+                "issued": self._issued,
+                "hits": self._hits,
+                "misses": self._misses,
+                "expired": self._expired,
+                "revoked": self._revoked,
+                "avg_validate_us": round(self._validate_time / self._validations * 1e6, 2) if self._validations else 0.0,
+            }
+
+
+# Process-wide store shared by every session
+# SESSION_SECRET keeps tokens signed with the same key across workers; otherwise a random key per process
+_session_store = SessionTokenStore(secret=os.environ.get("SESSION_SECRET", "").encode("utf-8") or None)
+
+def get_session_store() -> SessionTokenStore:
+    return _session_store
@@ -1,19 +1,19 @@
-from app.data.db import connect_database
+from app.data.db import get_connection
+from app.advanced_services.query_cache import bump_generation
 import pandas as pd
 
 
 def insert_dataset( name, rows, columns, uploaded_by=None):
     """Insert a new dataset."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO datasets_metadata
-        (name, rows, columns, uploaded_by, upload_date)
-        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-    """, ( name, rows, columns, uploaded_by))
-    conn.commit()
-    last_id = cursor.lastrowid
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO datasets_metadata
+            (name, rows, columns, uploaded_by, upload_date)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, ( name, rows, columns, uploaded_by))
+        last_id = cursor.lastrowid
+    bump_generation("datasets_metadata")
     return last_id
 
 
@@ -22,34 +22,29 @@ def get_datasets_by_id(dataset_id):
     Get all datasets row using their ID in the query process
 
     '''
-    conn = connect_database()
-    
-    df = pd.read_sql_query(
-        "SELECT * FROM datasets_metadata WHERE dataset_id = ?",
-        conn,
-        params=(dataset_id,)  
-    )
-    
-    conn.close()
+    with get_connection() as conn:
+        df = pd.read_sql_query(
+            "SELECT * FROM datasets_metadata WHERE dataset_id = ?",
+            conn,
+            params=(dataset_id,)  
+        )
     return df
 
 def get_all_datasets():
     """Retrieve all dataset metadata as a pandas DataFrame."""
-    conn = connect_database()
-    df = pd.read_sql_query("SELECT * FROM datasets_metadata", conn)
-    conn.close()
+    with get_connection() as conn:
+        df = pd.read_sql_query("SELECT * FROM datasets_metadata", conn)
     return df
 
 def update_dataset_name(dataset_id, new_name):
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE datasets_metadata SET name = ? WHERE dataset_id = ?",
-        (new_name, dataset_id)
-    )
-    conn.commit()
-    updated = cursor.rowcount > 0
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE datasets_metadata SET name = ? WHERE dataset_id = ?",
+            (new_name, dataset_id)
+        )
+        updated = cursor.rowcount > 0
+    bump_generation("datasets_metadata")
     return updated
 
 
@@ -58,10 +53,9 @@ def delete_dataset(dataset_id):
     Delete a dataset using its ID in the query
     
     '''
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM datasets_metadata WHERE dataset_id = ?", (dataset_id,))
-    conn.commit()
-    deleted = cursor.rowcount > 0
-    conn.close()
-    return deleted
\ No newline at end of file
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM datasets_metadata WHERE dataset_id = ?", (dataset_id,))
+        deleted = cursor.rowcount > 0
+    bump_generation("datasets_metadata")
+    return deleted
@@ -1,10 +1,187 @@
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
+from app.advanced_services.query_stats import InstrumentedConnection
+
 DB_PATH = Path("DATA") / "intelligence_platform.db"
 
 DB_PATH.parent.mkdir(exist_ok=True)
 
+# PRAGMAs applied once when the pool opens a new connection
+DEFAULT_PRAGMAS = {
+    "busy_timeout": 5000,
+    "cache_size": -8000,
+    "temp_store": "MEMORY",
+}
+
 def connect_database(db_path=DB_PATH):
     """Connect to SQLite database."""
-    return sqlite3.connect(str(db_path))
\ No newline at end of file
+    return sqlite3.connect(str(db_path))
+
+
+class ConnectionPool:
+    '''
+    Bounded pool of SQLite connections shared by the CRUD helpers
+
+    -> Connections are opened lazily, up to max_connections
+    -> A thread keeps the same connection for nested checkouts
+    -> Idle connections are reused instead of being closed
+    -> PRAGMAs are applied once, when a connection is created
+    '''
+
+    def __init__(self, db_path=DB_PATH, max_connections: int = 5, pragmas: dict | None = None, timeout: float = 30.0):
+        self._db_path = str(db_path)
+        self._max_connections = max_connections
+        self._pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self._timeout = timeout
+
+        self._idle: list[sqlite3.Connection] = []
+        self._open_count = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._created = 0
+
+    def _create_connection(self) -> sqlite3.Connection:
+        # check_same_thread is off because a connection may serve different threads over its lifetime
+        # InstrumentedConnection reports statements to the query stats hook when one is installed
+        conn = sqlite3.connect(self._db_path, check_same_thread=False, factory=InstrumentedConnection)
+        for name, value in self._pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        with self._cond:
+            self._checkouts += 1
+            if not self._idle and self._open_count >= self._max_connections:
+                # Pool exhausted - wait for another thread to give a connection back
+                self._waits += 1
+                started = time.perf_counter()
+                if not self._cond.wait_for(
+                    lambda: self._idle or self._open_count < self._max_connections,
+                    timeout=self._timeout,
+                ):
+                    raise TimeoutError(f"No database connection available after {self._timeout}s")
+                self._wait_time += time.perf_counter() - started
+
+            if self._idle:
+                return self._idle.pop()
+            self._open_count += 1
+
+        try:
+            conn = self._create_connection()
+        except Exception:
+            with self._cond:
+                self._open_count -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created += 1
+        return conn
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        with self._cond:
+            if self._closed:
+                # Checked out while close_all ran - close it instead of pooling it again
+                conn.close()
+                self._open_count -= 1
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    def depth(self) -> int:
+        '''
+        How deeply the current thread's checkout is nested - 0 outside any connection() block
+        '''
+        return getattr(self._local, "depth", 0)
+
+    @contextmanager
+    def connection(self):
+        '''
+        Check out a connection for the current thread
+        Commits when the outermost block succeeds and rolls back when it fails
+        '''
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            # Nested checkout in the same thread - hand back the same connection
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._release(conn)
+
+    def stats(self) -> dict:
+        '''
+        Return pool counters: checkouts, waits, open/idle connections
+        '''
+        with self._cond:
+            return {
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "wait_time_s": round(self._wait_time, 6),
+                "created": self._created,
+                "open": self._open_count,
+                "idle": len(self._idle),
+                "in_use": self._open_count - len(self._idle),
+                "max_connections": self._max_connections,
+            }
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close_all(self) -> None:
+        '''
+        Close the idle connections; connections in use are closed when returned
+        -> A closed pool still hands out connections but no longer keeps them - open a new pool instead
+        '''
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._idle.pop().close()
+                self._open_count -= 1
+            self._cond.notify_all()
+
+
+_pools: dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_path=DB_PATH) -> ConnectionPool:
+    """Return the process-wide pool for a database file, creating it on first use."""
+    key = str(Path(db_path).resolve())
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.closed:
+            pool = ConnectionPool(db_path)
+            _pools[key] = pool
+        return pool
+
+def get_connection(db_path=DB_PATH):
+    """Check out a pooled connection: `with get_connection() as conn: ...`"""
+    return get_pool(db_path).connection()
+
+def pool_stats(db_path=DB_PATH) -> dict:
+    """Return the counters of the pool for a database file."""
+    return get_pool(db_path).stats()
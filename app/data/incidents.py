@@ -1,60 +1,67 @@
-from app.data.db import connect_database
+from app.data.db import get_connection
+from app.data.search import search_fts
+from app.advanced_services.query_cache import bump_generation
 import pandas as pd
 
 
 def insert_incident(severity, category, status, description, reported_by=None, timestamp=None):
     """Insert a new cyber incident. Returns ID of inserted row."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO cyber_incidents
-        (timestamp, severity, category, status, description, reported_by)
-        VALUES ( COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?, ?, ?)
-    """, (timestamp, severity, category, status, description, reported_by))
-    conn.commit()
-    last_id = cursor.lastrowid
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO cyber_incidents
+            (timestamp, severity, category, status, description, reported_by)
+            VALUES ( COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?, ?, ?)
+        """, (timestamp, severity, category, status, description, reported_by))
+        last_id = cursor.lastrowid
+    bump_generation("cyber_incidents")
     return last_id
 
 
 def get_incident_by_id(incident_id):
-    conn = connect_database()
-
-    df = pd.read_sql_query(
-        "SELECT * FROM cyber_incidents WHERE incident_id = ?",
-        conn,
-        params=(incident_id,)  
-    )
-    
-    conn.close()
+    with get_connection() as conn:
+        df = pd.read_sql_query(
+            "SELECT * FROM cyber_incidents WHERE incident_id = ?",
+            conn,
+            params=(incident_id,)  
+        )
     return df
 
 
 def get_all_incidents():
     """Retrieve all cyber incidents as a pandas DataFrame."""
-    conn = connect_database()
-    df = pd.read_sql_query("SELECT * FROM cyber_incidents", conn)
-    conn.close()
+    with get_connection() as conn:
+        df = pd.read_sql_query("SELECT * FROM cyber_incidents", conn)
     return df
 
 
-def update_incident_status(incident_id, new_status):
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE cyber_incidents SET status = ? WHERE incident_id = ?",
-        (new_status, incident_id)
+def search_incidents(text, limit=20, offset=0, order="rank"):
+    """
+    Full-text search of incident descriptions and categories, best matches first.
+    Returns a DataFrame with the incident, a highlighted snippet and the bm25 score.
+    """
+    return search_fts(
+        "incidents_fts", "cyber_incidents", "incident_id",
+        ["category", "severity", "status", "timestamp"],
+        text, limit, offset, order,
     )
-    conn.commit()
-    updated = cursor.rowcount > 0
-    conn.close()
+
+
+def update_incident_status(incident_id, new_status):
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE cyber_incidents SET status = ? WHERE incident_id = ?",
+            (new_status, incident_id)
+        )
+        updated = cursor.rowcount > 0
+    bump_generation("cyber_incidents")
     return updated
 
 def delete_incident(incident_id):
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM cyber_incidents WHERE incident_id = ?", (incident_id,))
-    conn.commit()
-    deleted = cursor.rowcount > 0
-    conn.close()
-    return deleted
\ No newline at end of file
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM cyber_incidents WHERE incident_id = ?", (incident_id,))
+        deleted = cursor.rowcount > 0
+    bump_generation("cyber_incidents")
+    return deleted
@@ -0,0 +1,75 @@
+import re
+
+import pandas as pd
+
+from app.data.db import get_connection
+
+# Words of the search box text - everything else (quotes, operators, brackets) is dropped
+_WORDS = re.compile(r"\w+", re.UNICODE)
+
+
+def to_fts_query(text):
+    """
+    Turn free text from a search box into a safe FTS5 query.
+    Every word must match; the last word also matches as a prefix (search-as-you-type).
+    Returns None when the text has no words.
+    """
+    words = _WORDS.findall(text or "")
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    if len(words[-1]) >= 3:
+        terms[-1] += "*"
+    return " AND ".join(terms)
+
+
+def search_fts(fts_table, base_table, id_column, columns, text, limit=20, offset=0, order="rank"):
+    """
+    Ranked full-text search of base_table through its FTS5 index.
+    order="rank" sorts every match by bm25 relevance - bm25 scores all matches, so a word found in
+    ~350k of 1M incidents takes ~0.7 s per page and a typical term (~40k matches) ~0.1 s;
+    order="newest" sorts by id descending without scoring and stays fast for any term.
+    Returns the requested columns plus a highlighted snippet of the description and the bm25 score.
+    """
+    query = to_fts_query(text)
+    result_columns = [id_column, *columns, "snippet", "score"]
+    if query is None:
+        return pd.DataFrame(columns=result_columns)
+
+    if order == "rank":
+        hits_sql = f"""
+            SELECT rowid AS id, bm25({fts_table}) AS score
+            FROM {fts_table} WHERE {fts_table} MATCH ?
+            ORDER BY score LIMIT ? OFFSET ?
+        """
+        hits_params = (query, int(limit), int(offset))
+    else:
+        hits_sql = f"""
+            SELECT rowid AS id, NULL AS score
+            FROM {fts_table} WHERE {fts_table} MATCH ?
+            ORDER BY rowid DESC LIMIT ? OFFSET ?
+        """
+        hits_params = (query, int(limit), int(offset))
+
+    with get_connection() as conn:
+        hits = conn.execute(hits_sql, hits_params).fetchall()
+        if not hits:
+            return pd.DataFrame(columns=result_columns)
+
+        # Snippets and row details for this page of hits only
+        # The rowid range lets FTS5 evaluate the MATCH once; +rowid keeps the IN list out of the
+        # virtual table, which would otherwise re-run the (possibly prefix) query for every id
+        ids = [hit[0] for hit in hits]
+        placeholders = ", ".join("?" for _ in ids)
+        snippets = dict(conn.execute(f"""
+            SELECT rowid, snippet({fts_table}, 0, '**', '**', ' … ', 12)
+            FROM {fts_table}
+            WHERE {fts_table} MATCH ? AND rowid BETWEEN ? AND ? AND +rowid IN ({placeholders})
+        """, (query, min(ids), max(ids), *ids)))
+        details = {row[0]: row for row in conn.execute(f"""
+            SELECT {", ".join([id_column, *columns])}
+            FROM {base_table} WHERE {id_column} IN ({placeholders})
+        """, ids)}
+
+    rows = [(*details[hit_id], snippets.get(hit_id), score) for hit_id, score in hits if hit_id in details]
+    return pd.DataFrame(rows, columns=result_columns)
@@ -1,60 +1,68 @@
-from app.data.db import connect_database
+from app.data.db import get_connection
+from app.data.search import search_fts
+from app.advanced_services.query_cache import bump_generation
 import pandas as pd
 
 def insert_ticket(priority, description, status, assigned_to=None, resolution_time_hours=None, created_at = None):
     """Insert a new IT ticket."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO it_tickets
-        (priority, description, status, assigned_to, created_at, resolution_time_hours)
-        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, ?)
-    """, (priority, description, status, assigned_to, resolution_time_hours))
-    conn.commit()
-    last_id = cursor.lastrowid
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO it_tickets
+            (priority, description, status, assigned_to, created_at, resolution_time_hours)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, ?)
+        """, (priority, description, status, assigned_to, resolution_time_hours))
+        last_id = cursor.lastrowid
+    bump_generation("it_tickets")
     return last_id
 
 
 
 def get_ticket_by_id(ticket_id):
-    conn = connect_database()
-
-    df = pd.read_sql_query(
-        "SELECT * FROM it_tickets WHERE ticket_id = ?",
-        conn,
-        params=(ticket_id,)
-    )
-    conn.close()
+    with get_connection() as conn:
+        df = pd.read_sql_query(
+            "SELECT * FROM it_tickets WHERE ticket_id = ?",
+            conn,
+            params=(ticket_id,)
+        )
     return df
 
 def get_all_tickets():
     """Retrieve all IT tickets as a pandas DataFrame."""
-    conn = connect_database()
-    df = pd.read_sql_query("SELECT * FROM it_tickets", conn)
-    conn.close()
+    with get_connection() as conn:
+        df = pd.read_sql_query("SELECT * FROM it_tickets", conn)
     return df
 
+def search_tickets(text, limit=20, offset=0, order="rank"):
+    """
+    Full-text search of ticket descriptions and assignees, best matches first.
+    Returns a DataFrame with the ticket, a highlighted snippet and the bm25 score.
+    """
+    return search_fts(
+        "tickets_fts", "it_tickets", "ticket_id",
+        ["priority", "status", "assigned_to", "created_at"],
+        text, limit, offset, order,
+    )
+
+
 def update_ticket_status(ticket_id, new_status):
     """Update only the ticket status."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("""
-        UPDATE it_tickets
-        SET status = ?
-        WHERE ticket_id = ?
-    """, (new_status, ticket_id))
-    conn.commit()
-    updated = cursor.rowcount > 0
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE it_tickets
+            SET status = ?
+            WHERE ticket_id = ?
+        """, (new_status, ticket_id))
+        updated = cursor.rowcount > 0
+    bump_generation("it_tickets")
     return updated
 
 
 def delete_ticket(ticket_id):
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM it_tickets WHERE ticket_id = ?", (ticket_id,))
-    conn.commit()
-    deleted = cursor.rowcount > 0
-    conn.close()
-    return deleted
\ No newline at end of file
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM it_tickets WHERE ticket_id = ?", (ticket_id,))
+        deleted = cursor.rowcount > 0
+    bump_generation("it_tickets")
+    return deleted
@@ -1,7 +1,11 @@
 import pandas as pd
+from dataclasses import dataclass
 from app.advanced_services.database_manager import DatabaseManager
+from app.advanced_services.query_cache import cached_query
 
 # Analytical queries for cyber incidents.
+# Counts are read from the incident_counts rollup, which triggers keep in step with cyber_incidents
+@cached_query("cyber_incidents")
 def get_incidents_by_type_count(db: DatabaseManager):
 
     '''
@@ -9,8 +13,8 @@ def get_incidents_by_type_count(db: DatabaseManager):
 
     '''
     query = """
-    SELECT category, COUNT(*) as count
-    FROM cyber_incidents
+    SELECT category, SUM(n) as count
+    FROM incident_counts
     GROUP BY category
     ORDER BY count DESC
     """
@@ -18,6 +22,7 @@ def get_incidents_by_type_count(db: DatabaseManager):
     df = pd.DataFrame(rows, columns=["category", "count"]) # create pandas dataframe to be returned which will be used for anlayitics 
     return df
 
+@cached_query("cyber_incidents")
 def get_high_severity_by_status(db: DatabaseManager):
     '''
     Retrieves the count of HIGH severity cyber incidents grouped by status.
@@ -25,8 +30,8 @@ def get_high_severity_by_status(db: DatabaseManager):
     '''
 
     query = """
-    SELECT status, COUNT(*) as count
-    FROM cyber_incidents
+    SELECT status, SUM(n) as count
+    FROM incident_counts
     WHERE severity = 'High'
     GROUP BY status
     ORDER BY count DESC
@@ -35,6 +40,7 @@ def get_high_severity_by_status(db: DatabaseManager):
     df = pd.DataFrame(rows, columns=["status", "count"])
     return df
 
+@cached_query("cyber_incidents")
 def get_high_severity_incidents(db: DatabaseManager):
 
     '''
@@ -52,6 +58,7 @@ def get_high_severity_incidents(db: DatabaseManager):
     df = pd.DataFrame(rows, columns=["incident_id","category","severity","status","description","timestamp","reported_by"])
     return df
 
+@cached_query("cyber_incidents")
 def get_incident_types_with_many_cases(db: DatabaseManager, min_count=5):
 
     '''
@@ -60,10 +67,10 @@ def get_incident_types_with_many_cases(db: DatabaseManager, min_count=5):
     '''
 
     query = """
-    SELECT category, COUNT(*) as count
-    FROM cyber_incidents
+    SELECT category, SUM(n) as count
+    FROM incident_counts
     GROUP BY category
-    HAVING COUNT(*) > ?
+    HAVING SUM(n) > ?
     ORDER BY count DESC
     """
     rows = db.fetch_all(query, (min_count,))
@@ -72,6 +79,7 @@ def get_incident_types_with_many_cases(db: DatabaseManager, min_count=5):
 
 
 # Analytical queries for datasets.
+@cached_query("datasets_metadata")
 def get_datasets_by_uploader(db: DatabaseManager):
 
     '''
@@ -88,6 +96,7 @@ def get_datasets_by_uploader(db: DatabaseManager):
     df_datasets= pd.DataFrame(rows, columns=["uploaded_by", "dataset_count"])
     return df_datasets
 
+@cached_query("datasets_metadata")
 def get_large_datasets(db: DatabaseManager, min_rows: int):
 
     '''
@@ -108,18 +117,20 @@ def get_large_datasets(db: DatabaseManager, min_rows: int):
     return df_datasets
 
 
+@cached_query("datasets_metadata")
 def get_dataset_upload_trends_monthly(db: DatabaseManager):
 
     '''
-    Retrieves monthly dataset upload trends.
+    Retrieves monthly dataset upload trends (from the monthly buckets of the time_buckets rollup).
 
     '''
 
     query = """
-    SELECT strftime('%Y-%m', upload_date) AS month, COUNT(*) AS upload_count
-    FROM datasets_metadata
-    GROUP BY month
-    ORDER BY month ASC
+    SELECT strftime('%Y-%m', bucket) AS month, SUM(n) AS upload_count
+    FROM time_buckets
+    WHERE source = 'datasets_metadata' AND dim = 'uploaded_by' AND grain = 'month'
+    GROUP BY bucket
+    ORDER BY bucket ASC
     """
     rows = db.fetch_all(query)
     df_datasets= pd.DataFrame(rows, columns=["month", "upload_count"])
@@ -127,7 +138,9 @@ def get_dataset_upload_trends_monthly(db: DatabaseManager):
 
 
 # Analytical queries for IT tickets.
+# Counts and resolution averages are read from the ticket_stats rollup, kept current by triggers
 
+@cached_query("it_tickets")
 def get_tickets_by_priority(db: DatabaseManager):
 
     '''
@@ -136,8 +149,8 @@ def get_tickets_by_priority(db: DatabaseManager):
     '''
 
     query = """
-    SELECT priority, COUNT(*) as count
-    FROM it_tickets
+    SELECT priority, SUM(n) as count
+    FROM ticket_stats
     GROUP BY priority
     ORDER BY count DESC
     """
@@ -145,6 +158,7 @@ def get_tickets_by_priority(db: DatabaseManager):
     df_tickets= pd.DataFrame(rows, columns=["priority", "count"])
     return df_tickets
 
+@cached_query("it_tickets")
 def get_high_priority_tickets(db: DatabaseManager):
 
     '''
@@ -165,6 +179,7 @@ def get_high_priority_tickets(db: DatabaseManager):
     ])
     return df_tickets
 
+@cached_query("it_tickets")
 def get_high_priority_tickets_by_status(db: DatabaseManager):
 
     '''
@@ -172,8 +187,8 @@ def get_high_priority_tickets_by_status(db: DatabaseManager):
 
     '''
     query = """
-    SELECT status, COUNT(*) as count
-    FROM it_tickets
+    SELECT status, SUM(n) as count
+    FROM ticket_stats
     WHERE priority = 'High'
     GROUP BY status
     ORDER BY count DESC
@@ -182,6 +197,7 @@ def get_high_priority_tickets_by_status(db: DatabaseManager):
     df_tickets= pd.DataFrame(rows, columns=["status", "count"])
     return df_tickets
 
+@cached_query("it_tickets")
 def get_slow_resolution_tickets_by_status(db: DatabaseManager, min_resolution_time=24):
 
     '''
@@ -190,16 +206,17 @@ def get_slow_resolution_tickets_by_status(db: DatabaseManager, min_resolution_ti
 
     '''
     query = """
-    SELECT status, AVG(resolution_time_hours) as avg_resolution
-    FROM it_tickets
+    SELECT status, SUM(sum_resolution_hours) / SUM(resolved_n) as avg_resolution
+    FROM ticket_stats
     GROUP BY status
-    HAVING AVG(resolution_time_hours) > ?
+    HAVING SUM(resolved_n) > 0 AND SUM(sum_resolution_hours) / SUM(resolved_n) > ?
     ORDER BY avg_resolution DESC
     """
     rows = db.fetch_all(query, (min_resolution_time,))
     df_tickets= pd.DataFrame(rows, columns=["status", "avg_resolution"])
     return df_tickets
 
+@cached_query("it_tickets")
 def get_avg_resolution_by_staff(db: DatabaseManager):
 
     '''
@@ -208,9 +225,9 @@ def get_avg_resolution_by_staff(db: DatabaseManager):
     '''
 
     query = """
-        SELECT assigned_to, AVG(resolution_time_hours) AS avg_resolution_time
-        FROM it_tickets
-        WHERE resolution_time_hours IS NOT NULL
+        SELECT assigned_to, SUM(sum_resolution_hours) / SUM(resolved_n) AS avg_resolution_time
+        FROM ticket_stats
+        WHERE resolved_n > 0
         GROUP BY assigned_to
         ORDER BY avg_resolution_time DESC
     """
@@ -218,6 +235,7 @@ def get_avg_resolution_by_staff(db: DatabaseManager):
     df_tickets= pd.DataFrame(rows, columns=["assigned_to", "avg_resolution_time"])
     return df_tickets
 
+@cached_query("it_tickets")
 def get_slow_resolution_tickets_only(db: DatabaseManager, min_resolution_time=24):
 
     '''
@@ -237,4 +255,277 @@ def get_slow_resolution_tickets_only(db: DatabaseManager, min_resolution_time=24
         "ticket_id", "title", "priority", "status",
         "assigned_to", "resolution_time_hours", "timestamp"
     ]) 
-    return df_tickets
\ No newline at end of file
+    return df_tickets
+
+
+# Single-pass summaries for the dashboards.
+# Each one reads the page's grouped counts once (from a rollup table where one exists)
+# and derives all KPIs and group-bys from that small grouped result in pandas.
+
+def _count_by(cube: pd.DataFrame, column: str, value_column: str = "count") -> pd.DataFrame:
+    # Roll the grouped result up to a single dimension, largest first
+    df = cube.groupby(column, as_index=False)[value_column].sum()
+    return df.sort_values(value_column, ascending=False, kind="stable").reset_index(drop=True)
+
+
+@dataclass
+class IncidentSummary:
+    total: int
+    high_severity: int
+    phishing: int
+    phishing_categories: tuple              # categories counted as phishing - pass to get_incident_trend
+    by_status: pd.DataFrame                 # status, count
+    by_category: pd.DataFrame               # category, count
+    categories_with_many_cases: pd.DataFrame  # category, count (count > min_count)
+    high_severity_by_status: pd.DataFrame   # status, count
+
+@cached_query("cyber_incidents")
+def get_incident_dashboard_summary(db: DatabaseManager, min_count=5) -> IncidentSummary:
+
+    '''
+    Computes every KPI and group-by of the Cybersecurity page from the incident_counts rollup
+
+    '''
+    query = """
+    SELECT category, severity, status, n as count
+    FROM incident_counts
+    """
+    rows = db.fetch_all(query)
+    cube = pd.DataFrame(rows, columns=["category", "severity", "status", "count"])
+
+    high = cube[cube["severity"] == "High"]
+    by_category = _count_by(cube, "category")
+    # Any category mentioning phishing, in any case - the phishing trend counts the same categories
+    phishing = cube[cube["category"].str.contains("phishing", case=False, na=False, regex=False)]
+
+    return IncidentSummary(
+        total=int(cube["count"].sum()),
+        high_severity=int(high["count"].sum()),
+        phishing=int(phishing["count"].sum()),
+        phishing_categories=tuple(sorted(phishing["category"].unique())),
+        by_status=_count_by(cube, "status"),
+        by_category=by_category,
+        categories_with_many_cases=by_category[by_category["count"] > min_count].reset_index(drop=True),
+        high_severity_by_status=_count_by(high, "status"),
+    )
+
+
+@dataclass
+class TicketSummary:
+    total: int
+    high_priority: int
+    slow_tickets: int                        # tickets with resolution time > min_resolution_time
+    by_priority: pd.DataFrame                # priority, count
+    high_priority_by_status: pd.DataFrame    # status, count
+    avg_resolution_by_staff: pd.DataFrame    # assigned_to, avg_resolution_time
+    slow_resolution_by_status: pd.DataFrame  # status, avg_resolution (avg > min_resolution_time)
+
+@cached_query("it_tickets")
+def get_ticket_dashboard_summary(db: DatabaseManager, min_resolution_time=24) -> TicketSummary:
+
+    '''
+    Computes every KPI and group-by of the IT Operations page from the ticket_stats rollup
+    -> Averages are rebuilt from sums and non-null counts so they match AVG()
+    -> The slow ticket count is a range count on the resolution time index
+
+    '''
+    query = """
+    SELECT assigned_to, priority, status, n as count, resolved_n as resolved_count, sum_resolution_hours as resolution_sum
+    FROM ticket_stats
+    """
+    rows = db.fetch_all(query)
+    cube = pd.DataFrame(rows, columns=[
+        "assigned_to", "priority", "status", "count", "resolved_count", "resolution_sum"
+    ])
+
+    slow_row = db.fetch_one(
+        "SELECT COUNT(*) FROM it_tickets WHERE resolution_time_hours > ?", (min_resolution_time,)
+    )
+    slow_tickets = slow_row[0] if slow_row else 0
+
+    high = cube[cube["priority"] == "High"]
+
+    by_staff = cube.groupby("assigned_to", as_index=False)[["resolution_sum", "resolved_count"]].sum()
+    by_staff = by_staff[by_staff["resolved_count"] > 0]
+    by_staff["avg_resolution_time"] = by_staff["resolution_sum"] / by_staff["resolved_count"]
+    by_staff = by_staff.sort_values("avg_resolution_time", ascending=False, kind="stable")
+
+    by_status = cube.groupby("status", as_index=False)[["resolution_sum", "resolved_count"]].sum()
+    by_status = by_status[by_status["resolved_count"] > 0]
+    by_status["avg_resolution"] = by_status["resolution_sum"] / by_status["resolved_count"]
+    by_status = by_status[by_status["avg_resolution"] > min_resolution_time]
+    by_status = by_status.sort_values("avg_resolution", ascending=False, kind="stable")
+
+    return TicketSummary(
+        total=int(cube["count"].sum()),
+        high_priority=int(high["count"].sum()),
+        slow_tickets=int(slow_tickets),
+        by_priority=_count_by(cube, "priority"),
+        high_priority_by_status=_count_by(high, "status"),
+        avg_resolution_by_staff=by_staff[["assigned_to", "avg_resolution_time"]].reset_index(drop=True),
+        slow_resolution_by_status=by_status[["status", "avg_resolution"]].reset_index(drop=True),
+    )
+
+
+@dataclass
+class DatasetSummary:
+    total: int
+    large_datasets: int                # datasets with more than min_rows rows
+    by_uploader: pd.DataFrame          # uploaded_by, dataset_count
+    upload_trends_monthly: pd.DataFrame  # month, upload_count
+
+@cached_query("datasets_metadata")
+def get_dataset_dashboard_summary(db: DatabaseManager, min_rows=1000) -> DatasetSummary:
+
+    '''
+    Computes the Data Science page KPIs and group-bys in one pass over datasets_metadata
+    The monthly trend comes from the time_buckets rollup
+
+    '''
+    query = """
+    SELECT uploaded_by,
+           COUNT(*) as count,
+           SUM(CASE WHEN rows > ? THEN 1 ELSE 0 END) as large_count
+    FROM datasets_metadata
+    GROUP BY uploaded_by
+    """
+    rows = db.fetch_all(query, (min_rows,))
+    cube = pd.DataFrame(rows, columns=["uploaded_by", "count", "large_count"])
+
+    by_uploader = _count_by(cube, "uploaded_by").rename(columns={"count": "dataset_count"})
+
+    return DatasetSummary(
+        total=int(cube["count"].sum()),
+        large_datasets=int(cube["large_count"].sum()),
+        by_uploader=by_uploader,
+        upload_trends_monthly=get_dataset_upload_trends_monthly(db),
+    )
+
+
+# Full-table frame for the Data Science page (datasets_metadata is small - 1% of the incident rows).
+# Built column-wise straight from the cursor (no model objects), with categorical
+# dtypes for the low-cardinality columns and timestamps parsed once here instead of on every page.
+
+def _fill_missing_dates(df: pd.DataFrame, column: str) -> pd.DataFrame:
+    # Missing or unparseable dates count as now, as the pages always did
+    df[column] = df[column].fillna(pd.Timestamp.now())
+    return df
+
+@cached_query("datasets_metadata")
+def load_datasets_frame(db: DatabaseManager) -> pd.DataFrame:
+    '''
+    Every dataset as a typed DataFrame for the Data Science page
+
+    '''
+    query = """
+    SELECT dataset_id, name, rows, columns, uploaded_by, upload_date
+    FROM datasets_metadata
+    """
+    df = db.fetch_frame(
+        query,
+        dtypes={"dataset_id": "int64", "rows": "Int64", "columns": "Int64", "uploaded_by": "category"},
+        parse_dates=["upload_date"],
+    )
+    return _fill_missing_dates(df, "upload_date")
+
+
+# Trend charts.
+# Counts come from the time_buckets rollup (hour/day/week/month buckets kept current by triggers),
+# so a trend costs O(buckets) instead of O(rows). The coarsest stored grain that fits the requested
+# interval and range is used, then rolled up to the interval in pandas.
+
+# interval -> stored grains that divide it exactly, coarsest first
+_TREND_GRAINS = {
+    "hour": ["hour"],
+    "day": ["day", "hour"],
+    "week": ["week", "day", "hour"],
+    "month": ["month", "day", "hour"],
+    "quarter": ["month", "day", "hour"],
+    "year": ["month", "day", "hour"],
+}
+
+# interval -> pandas frequency with the same bucket starts (weeks start on Monday)
+_TREND_FREQ = {"hour": "h", "day": "D", "week": "W-MON", "month": "MS", "quarter": "QS", "year": "YS"}
+
+def _floor_to(ts: pd.Series, interval: str) -> pd.Series:
+    # Start of the bucket each timestamp falls into
+    if interval == "hour":
+        return ts.dt.floor("h")
+    days = ts.dt.normalize()
+    if interval == "day":
+        return days
+    if interval == "week":
+        return days - pd.to_timedelta(days.dt.weekday, unit="D")
+    return days.dt.to_period({"month": "M", "quarter": "Q", "year": "Y"}[interval]).dt.start_time
+
+def _pick_grain(interval: str, start, end) -> str:
+    # Coarsest stored grain whose buckets both divide the interval and line up with the range ends
+    if interval not in _TREND_GRAINS:
+        raise ValueError(f"Unknown trend interval '{interval}'")
+    bounds = pd.Series([pd.Timestamp(t) for t in (start, end) if t is not None], dtype="datetime64[ns]")
+    for grain in _TREND_GRAINS[interval]:
+        if bounds.empty or (_floor_to(bounds, grain) == bounds).all():
+            return grain
+    raise ValueError(f"Trend range must start and end on a whole hour, got {start} - {end}")
+
+def _trend(db: DatabaseManager, source: str, dim: str, values=None, interval="week", start=None, end=None) -> pd.DataFrame:
+    grain = _pick_grain(interval, start, end)
+    fmt = "%Y-%m-%d %H:00:00" if grain == "hour" else "%Y-%m-%d"
+
+    clauses, params = ["source = ?", "dim = ?", "grain = ?"], [source, dim, grain]
+    if start is not None:
+        clauses.append("bucket >= ?")
+        params.append(pd.Timestamp(start).strftime(fmt))
+    if end is not None:
+        clauses.append("bucket < ?")
+        params.append(pd.Timestamp(end).strftime(fmt))
+    if values is not None:
+        # An empty tuple matches nothing, None matches every value
+        clauses.append(f"value IN ({', '.join('?' for _ in values)})" if values else "0")
+        params.extend(values)
+
+    query = f"""
+    SELECT bucket, SUM(n) AS count
+    FROM time_buckets
+    WHERE {' AND '.join(clauses)}
+    GROUP BY bucket
+    ORDER BY bucket
+    """
+    df = pd.DataFrame(db.fetch_all(query, params), columns=["bucket", "count"])
+    df["bucket"] = pd.to_datetime(df["bucket"])
+    if df.empty:
+        return df
+
+    # Roll finer buckets up to the interval and fill the buckets with no rows with 0
+    df["bucket"] = _floor_to(df["bucket"], interval)
+    counts = df.groupby("bucket")["count"].sum()
+    first = _floor_to(pd.Series([pd.Timestamp(start)]), interval)[0] if start is not None else counts.index.min()
+    last = counts.index.max() if end is None else _floor_to(pd.Series([pd.Timestamp(end) - pd.Timedelta(microseconds=1)]), interval)[0]
+    full = pd.date_range(first, last, freq=_TREND_FREQ[interval])
+    return counts.reindex(full, fill_value=0).rename_axis("bucket").reset_index(name="count")
+
+@cached_query("cyber_incidents")
+def get_incident_trend(db: DatabaseManager, dim="category", values=None, interval="week", start=None, end=None):
+    '''
+    Incident counts per interval (hour/day/week/month/quarter/year) in [start, end)
+    -> dim is "category" or "severity", values an optional tuple of values to count e.g. ("Phishing",)
+       (None counts every value, an empty tuple none)
+
+    '''
+    return _trend(db, "cyber_incidents", dim, values, interval, start, end)
+
+@cached_query("it_tickets")
+def get_ticket_trend(db: DatabaseManager, values=None, interval="week", start=None, end=None):
+    '''
+    Ticket counts per interval, optionally only for a tuple of priorities
+
+    '''
+    return _trend(db, "it_tickets", "priority", values, interval, start, end)
+
+@cached_query("datasets_metadata")
+def get_dataset_upload_trend(db: DatabaseManager, values=None, interval="month", start=None, end=None):
+    '''
+    Dataset uploads per interval, optionally only for a tuple of uploaders
+
+    '''
+    return _trend(db, "datasets_metadata", "uploaded_by", values, interval, start, end)
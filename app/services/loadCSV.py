@@ -1,6 +1,41 @@
 import pandas as pd
 import sys
 import sqlite3
+import threading
+import time
+import psutil
+from app.advanced_services.query_cache import bump_generation
+
+# Used to sample resident memory while streaming
+process = psutil.Process()
+
+
+class _PeakRSSSampler:
+    '''
+    Highest resident memory of the process while running, sampled every interval seconds on a background thread
+    -> Catches the peaks inside read_csv / executemany that a reading between chunks would miss
+    '''
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = process.memory_info().rss
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, process.memory_info().rss)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, process.memory_info().rss)
+
+
 def load_csv_to_table(conn, csv_path, table_name: str) -> int:
     """
     Load a CSV file into a database table using pandas.
@@ -23,6 +58,7 @@ def load_csv_to_table(conn, csv_path, table_name: str) -> int:
         )
         
         row_count = len(df)
+        bump_generation(table_name)
         
         print(f"Success: Loaded {row_count} rows into table '{table_name}'.")
         return row_count
@@ -42,4 +78,63 @@ def load_csv_to_table(conn, csv_path, table_name: str) -> int:
     except Exception as e:
         print(f"An unexpected error occurred: {e}", file=sys.stderr)
         
-    return 0
\ No newline at end of file
+    return 0
+
+
+def stream_csv_to_table(conn, csv_path, table_name: str, chunk_size: int = 50_000) -> int:
+    """
+    Load a CSV file into a database table in fixed-size chunks.
+
+    -> Only one chunk is held in memory at a time, so memory stays bounded for any file size
+    -> Each chunk is inserted with executemany, all inside one explicit transaction
+    -> Reports rows/sec and peak memory (process RSS, sampled every 10 ms on a background thread) when finished
+
+    """
+    row_count = 0
+    started = time.perf_counter()
+
+    print(f"Streaming data from {csv_path} into table '{table_name}' ({chunk_size:,} rows per chunk)...")
+
+    try:
+        conn.commit()
+        cursor = conn.cursor()
+        cursor.execute("BEGIN")
+        insert_sql = None
+
+        with _PeakRSSSampler() as rss:
+            for chunk in pd.read_csv(csv_path, header=0, chunksize=chunk_size):
+                if insert_sql is None:
+                    # Build the INSERT from the CSV header, as df.to_sql did
+                    column_list = ", ".join(f'"{c}"' for c in chunk.columns)
+                    placeholders = ", ".join("?" for _ in chunk.columns)
+                    insert_sql = f'INSERT INTO "{table_name}" ({column_list}) VALUES ({placeholders})'
+
+                # Convert to plain Python values and NaN to NULL so sqlite3 can bind them
+                values = chunk.astype(object).where(chunk.notna(), None)
+                cursor.executemany(insert_sql, values.itertuples(index=False, name=None))
+                row_count += len(chunk)
+
+        conn.commit()
+        bump_generation(table_name)
+
+        elapsed = time.perf_counter() - started
+        rate = row_count / elapsed if elapsed > 0 else float(row_count)
+        print(f"Success: Loaded {row_count} rows into table '{table_name}' "
+              f"({rate:,.0f} rows/sec, peak memory {rss.peak / 1024 / 1024:,.1f} MB).")
+        return row_count
+
+    # Any error rolls back the whole load so the table is never left half-filled
+
+    except FileNotFoundError:
+        print(f"Error: CSV file not found at path: {csv_path}", file=sys.stderr)
+    except pd.errors.EmptyDataError:
+        print(f"Error: The CSV file {csv_path} is empty.", file=sys.stderr)
+    except pd.errors.ParserError as e:
+        print(f"Error: Could not parse CSV file. Details: {e}", file=sys.stderr)
+    except sqlite3.Error as e:
+        print(f"Database error during insertion: {e}", file=sys.stderr)
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}", file=sys.stderr)
+
+    conn.rollback()
+    return 0
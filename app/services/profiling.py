@@ -0,0 +1,75 @@
+import os
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from app.advanced_services.page_profiler import DisabledProfile, TOTAL, get_page_profiler
+
+'''
+    Opt-in render profiling for the dashboard pages
+    -> Turned on for a browser session with ?profile=1 in the URL (?profile=0 turns it off again),
+       or for every session with PAGE_PROFILE=1
+    -> page_profile() at the top of a page, profile.start("...") before each section, render_profile()
+       at the bottom - the sidebar then shows this run as a waterfall and the rolling p50/p95/p99 per section
+    -> When profiling is off the calls are no-ops
+
+'''
+
+PROFILE_PARAM = "profile"
+_DISABLED = DisabledProfile()
+
+
+def profiling_enabled() -> bool:
+    if os.environ.get("PAGE_PROFILE") == "1":
+        return True
+    # Page switches drop the query string - remember the choice for the rest of the session
+    flag = st.query_params.get(PROFILE_PARAM)
+    if flag is not None:
+        st.session_state.profile_pages = flag == "1"
+    return st.session_state.get("profile_pages", False)
+
+
+def page_profile(page: str):
+    '''
+    Start profiling this run of a page - a no-op profile if profiling is off
+    '''
+    if not profiling_enabled():
+        return _DISABLED
+    return get_page_profiler().begin(page)
+
+
+def render_profile(profile) -> None:
+    '''
+    Close the run and show its waterfall and the section percentiles in the sidebar
+    '''
+    if not profile.enabled:
+        return
+    timings = profile.finish()
+    sections = [timing for timing in timings if timing.name != TOTAL]
+    total_ms = timings[-1].duration_s * 1000
+
+    with st.sidebar:
+        st.markdown(f"### ⏱️ Render profile ({total_ms:,.0f} ms)")
+        fig = go.Figure(go.Bar(
+            y=[timing.name for timing in sections],
+            x=[timing.duration_s * 1000 for timing in sections],
+            base=[timing.start_s * 1000 for timing in sections],
+            orientation="h",
+            text=[f"{timing.duration_s * 1000:,.0f} ms" for timing in sections],
+            textposition="auto",
+            hovertemplate="<b>%{y}</b><br>starts %{base:,.1f} ms<br>takes %{x:,.1f} ms<extra></extra>",
+        ))
+        fig.update_layout(
+            height=max(200, 28 * len(sections) + 60),
+            margin=dict(l=10, r=10, t=10, b=10),
+            xaxis=dict(title="ms since start of run"),
+            yaxis=dict(autorange="reversed"),
+        )
+        st.plotly_chart(fig, width="stretch")
+
+        st.caption("Rolling percentiles across sessions (ms)")
+        rows = get_page_profiler().percentiles(profile.page)
+        st.dataframe(
+            [{key: row[key] for key in ("section", "runs", "p50_ms", "p95_ms", "p99_ms")} for row in rows],
+            hide_index=True,
+        )
@@ -0,0 +1,160 @@
+from datetime import timedelta
+
+import pandas as pd
+import streamlit as st
+
+'''
+    Paginated record picker shared by the dashboard pages
+    -> Filters are applied in SQL, and only one page of rows is loaded and labelled per rerun
+    -> Pages are fetched with keyset pagination on the model's id column (see Model.load_page)
+    -> The ids where each visited page starts are kept in session_state, so Previous is just a pop
+    -> search_box pages through ranked full-text search results the same way
+
+'''
+
+PAGE_SIZE = 25
+
+SEVERITIES = ["Low", "Medium", "High", "Critical"]
+INCIDENT_STATUSES = ["Open", "Closed", "In Progress", "Resolved"]
+TICKET_STATUSES = ["Open", "Closed", "In Progress", "Resolved", "Waiting for User"]
+
+
+def _date_filter(label: str, key: str):
+    '''
+    ("RANGE", (start, day after end)) for a picked date range, None if no full range is picked
+    -> Half-open on bare dates, so '2024-01-05' and '2024-01-05 09:30:00' both fall on the 5th
+       and the timestamp index can still be used
+    '''
+    picked = st.date_input(label, value=(), key=key)
+    if not isinstance(picked, (tuple, list)) or len(picked) != 2:
+        return None
+    start, end = picked
+    return ("RANGE", (start.isoformat(), (end + timedelta(days=1)).isoformat()))
+
+
+def incident_filters(key: str) -> dict:
+    '''
+    Filter widgets for incidents - returns filters for SecurityIncident.load_page
+    '''
+    filters = {}
+    with st.expander("Filter incidents"):
+        severity = st.multiselect("Severity", SEVERITIES, key=f"{key}_severity")
+        status = st.multiselect("Status", INCIDENT_STATUSES, key=f"{key}_status")
+        reported = _date_filter("Reported between", key=f"{key}_dates")
+    if severity:
+        filters["severity"] = severity
+    if status:
+        filters["status"] = status
+    if reported:
+        filters["timestamp"] = reported
+    return filters
+
+
+def ticket_filters(key: str) -> dict:
+    '''
+    Filter widgets for tickets - returns filters for IT_Ticket.load_page
+    '''
+    filters = {}
+    with st.expander("Filter tickets"):
+        priority = st.multiselect("Priority", SEVERITIES, key=f"{key}_priority")
+        status = st.multiselect("Status", TICKET_STATUSES, key=f"{key}_status")
+        assignee = st.text_input("Assigned to", key=f"{key}_assignee").strip()
+        created = _date_filter("Created between", key=f"{key}_dates")
+    if priority:
+        filters["priority"] = priority
+    if status:
+        filters["status"] = status
+    if assignee:
+        filters["assigned_to"] = assignee
+    if created:
+        filters["created_at"] = created
+    return filters
+
+
+def _labels(page: pd.DataFrame, id_column: str, label_columns) -> pd.Series:
+    # "<id>: a - b - c" built column-wise for the rows on this page only
+    labels = page[id_column].astype(str) + ": "
+    for i, column in enumerate(label_columns):
+        labels = labels + ("" if i == 0 else " - ") + page[column].astype(str)
+    return labels
+
+
+def record_picker(key: str, db, model, filters: dict, label_columns, label: str = "Select record",
+                  page_size: int = PAGE_SIZE):
+    '''
+    Selectbox over one page of model rows with Previous/Next buttons and a jump-to-id box
+    -> model is a class with COLUMNS (id column first) and load_page(db, filters, after_id, limit, as_frame)
+    -> Returns the selected row as a pandas Series, or None if nothing matches
+    '''
+    id_column = model.COLUMNS[0]
+    start_id = st.number_input(f"Start from {id_column}", min_value=0, value=0, step=1, key=f"{key}_start")
+
+    # Back to the first page whenever the filters or the start id change
+    signature = repr((sorted(filters.items()), start_id))
+    if st.session_state.get(f"{key}_signature") != signature:
+        st.session_state[f"{key}_signature"] = signature
+        st.session_state[f"{key}_pages"] = [start_id - 1 if start_id else None]
+    pages = st.session_state[f"{key}_pages"]
+
+    page, next_after_id = model.load_page(db, filters, after_id=pages[-1], limit=page_size, as_frame=True)
+    if page.empty:
+        st.info("No records match the filters")
+        return None
+
+    labels = _labels(page, id_column, label_columns).tolist()
+    selected = st.selectbox(label, range(len(page)), format_func=lambda i: labels[i], key=f"{key}_select_{pages[-1]}")
+
+    prev_col, info_col, next_col = st.columns([1, 3, 1])
+    with prev_col:
+        if st.button("◀ Previous", key=f"{key}_prev", disabled=len(pages) == 1):
+            pages.pop()
+            st.rerun()
+    with info_col:
+        st.caption(f"Page {len(pages)} - {id_column} {page[id_column].iloc[0]} to {page[id_column].iloc[-1]}")
+    with next_col:
+        if st.button("Next ▶", key=f"{key}_next", disabled=next_after_id is None):
+            pages.append(next_after_id)
+            st.rerun()
+
+    return page.iloc[selected]
+
+
+def search_box(key: str, search, label: str = "Search descriptions", page_size: int = PAGE_SIZE):
+    '''
+    Full-text search box with ranked, paginated results
+    -> search is e.g. app.data.incidents.search_incidents(text, limit, offset, order)
+    -> One extra row is requested to know whether there is a next page
+    '''
+    text = st.text_input(label, key=f"{key}_text", placeholder="e.g. phishing email finance")
+    order = st.radio("Order", ["rank", "newest"], horizontal=True, key=f"{key}_order",
+                     format_func=lambda o: "Best match" if o == "rank" else "Newest first")
+    if not text.strip():
+        return
+
+    # Back to the first page whenever the search changes
+    signature = (text, order)
+    if st.session_state.get(f"{key}_signature") != signature:
+        st.session_state[f"{key}_signature"] = signature
+        st.session_state[f"{key}_offset"] = 0
+    offset = st.session_state[f"{key}_offset"]
+
+    results = search(text, limit=page_size + 1, offset=offset, order=order)
+    has_more = len(results) > page_size
+    results = results.head(page_size)
+    if results.empty:
+        st.info("No matches")
+        return
+
+    st.dataframe(results.drop(columns=["score"]), hide_index=True, width="stretch")
+
+    prev_col, info_col, next_col = st.columns([1, 3, 1])
+    with prev_col:
+        if st.button("◀ Previous", key=f"{key}_prev", disabled=offset == 0):
+            st.session_state[f"{key}_offset"] = max(0, offset - page_size)
+            st.rerun()
+    with info_col:
+        st.caption(f"Results {offset + 1} to {offset + len(results)}")
+    with next_col:
+        if st.button("Next ▶", key=f"{key}_next", disabled=not has_more):
+            st.session_state[f"{key}_offset"] = offset + page_size
+            st.rerun()
@@ -0,0 +1,95 @@
+import streamlit as st
+
+from app.advanced_services.resources import get_auth_manager
+from app.services.session_cookie import session_cookie, set_session_cookie, clear_session_cookie
+
+'''
+    Login state shared by Home.py and the pages
+    -> A successful login keeps the signed session token in session_state and in an HttpOnly, Secure,
+       SameSite=Strict cookie - never in the URL, so it cannot leak through browser history, shared
+       links or referrers
+    -> A refresh, a new tab or a reconnect starts a new Streamlit session - the cookie logs it straight
+       back in with one in-memory lookup instead of another users query and bcrypt check
+    -> The token is bound to the client it was issued to and is refused from anywhere else
+    -> Logout revokes the token and clears the cookie
+
+'''
+
+
+def client_id() -> str | None:
+    '''
+    IP address of the browser for the login rate limiter and the session token - None if Streamlit cannot tell
+    '''
+    context = getattr(st, "context", None)
+    return getattr(context, "ip_address", None) if context is not None else None
+
+
+def start_session(username: str, token: str) -> None:
+    '''
+    Mark the current Streamlit session as logged in with a freshly issued token
+    -> The cookie is written on the next run, since the login form reruns the script straight away
+    '''
+    session = get_auth_manager().authenticate_token(token, client_id())
+    st.session_state.logged_in = True
+    st.session_state.username = username
+    st.session_state.role = session.role if session else ""
+    st.session_state.session_token = token
+    st.session_state.cookie_update = "set"
+
+
+def _sync_cookie() -> None:
+    # Carry out a cookie change queued by start_session / end_session
+    update = st.session_state.pop("cookie_update", None)
+    if update == "set" and st.session_state.get("session_token"):
+        set_session_cookie(st.session_state.session_token)
+    elif update == "clear":
+        clear_session_cookie()
+
+
+def restore_session() -> bool:
+    '''
+    Logged in with a token that is still valid for this client - returns st.session_state.logged_in
+    -> The token comes from session_state, or from the session cookie in a new browser session
+    '''
+    _sync_cookie()
+    token = st.session_state.get("session_token")
+    if not token:
+        # A cookie that was already refused in this session is not tried again
+        cookie = session_cookie()
+        if cookie and cookie != st.session_state.get("refused_cookie"):
+            token = cookie
+    if not token:
+        return st.session_state.get("logged_in", False)
+
+    session = get_auth_manager().authenticate_token(token, client_id())
+    if session is None:
+        # Expired, revoked or presented by another client - drop it and fall back to the login form
+        st.session_state.session_token = token
+        end_session(revoke=False)
+        _sync_cookie()
+        return False
+
+    st.session_state.logged_in = True
+    st.session_state.username = session.username
+    st.session_state.role = session.role
+    st.session_state.session_token = token
+    return True
+
+
+def end_session(revoke: bool = True) -> None:
+    '''
+    Log the current Streamlit session out, revoke its token and clear the cookie
+    '''
+    token = st.session_state.get("session_token")
+    if revoke and token:
+        get_auth_manager().logout(token)
+    if token:
+        # Still sent by this session's websocket until it reconnects - never accept it again here
+        st.session_state.refused_cookie = token
+        st.session_state.cookie_update = "clear"
+    st.session_state.logged_in = False
+    st.session_state.username = ""
+    st.session_state.role = ""
+    st.session_state.session_token = None
+    st.session_state.show_login = False
+    st.session_state.show_register = False
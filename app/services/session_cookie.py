@@ -0,0 +1,104 @@
+import gc
+import json
+
+import streamlit as st
+import streamlit.components.v1 as components
+import tornado.web
+
+from app.advanced_services.session_tokens import get_session_store
+
+'''
+    Session cookie for the login token
+    -> Streamlit has no API for setting cookies, so a small route is added to its Tornado server:
+       the page hands the browser a single-use code, the browser POSTs it to COOKIE_ROUTE and the
+       response sets the token as an HttpOnly, Secure, SameSite=Strict cookie
+    -> The token itself never appears in the page, the URL or anything a script can read
+    -> Returning visitors (refresh, new tab, reconnect) send the cookie with the websocket
+       handshake and are read back through st.context.cookies
+
+'''
+
+COOKIE_NAME = "cw2_session"
+COOKIE_ROUTE = "/_session/cookie"
+
+
+def _client(request) -> str | None:
+    # Same value as st.context.ip_address, so the token's client binding still matches
+    remote_ip = request.remote_ip
+    return None if remote_ip in {"::1", "127.0.0.1"} else remote_ip
+
+
+class SessionCookieHandler(tornado.web.RequestHandler):
+    '''
+    POST swaps a handoff code for the session cookie, DELETE clears the cookie
+    '''
+
+    def check_xsrf_cookie(self) -> None:
+        # The single-use handoff code is what authorises a POST - a forged request cannot know it
+        pass
+
+    def post(self) -> None:
+        store = get_session_store()
+        token = store.redeem(self.request.body.decode("ascii", "replace").strip())
+        if token is None or store.validate(token, _client(self.request)) is None:
+            self.set_status(403)
+            return
+        self.set_cookie(COOKIE_NAME, token, path="/", expires_days=None, max_age=int(store.ttl),
+                        httponly=True, secure=True, samesite="Strict")
+        self.set_status(204)
+
+    def delete(self) -> None:
+        self.clear_cookie(COOKIE_NAME, path="/", httponly=True, secure=True, samesite="Strict")
+        self.set_status(204)
+
+
+@st.cache_resource(show_spinner=False)
+def install_cookie_route() -> bool:
+    '''
+    Add COOKIE_ROUTE to the running Streamlit server once per process - False if no server was found
+    '''
+    base = st.get_option("server.baseUrlPath").strip("/")
+    path = (f"/{base}" if base else "") + COOKIE_ROUTE
+    # Streamlit keeps no reference to its tornado Application, so look it up
+    # (type() rather than isinstance(), which would trip Streamlit's deprecation proxies)
+    apps = [obj for obj in gc.get_objects() if issubclass(type(obj), tornado.web.Application)]
+    for app in apps:
+        # add_handlers puts the route ahead of Streamlit's catch-all static file handler
+        app.add_handlers(r".*", [(path, SessionCookieHandler)])
+    return bool(apps)
+
+
+def _cookie_request(method: str, body: str = "") -> None:
+    # Zero-height component frame - it is same-origin, so the fetch carries and receives the cookie
+    base = st.get_option("server.baseUrlPath").strip("/")
+    path = (f"/{base}" if base else "") + COOKIE_ROUTE
+    components.html(
+        f"<script>fetch({json.dumps(path)}, {{method: {json.dumps(method)}, body: {json.dumps(body) if body else 'null'}, "
+        f"credentials: 'same-origin'}});</script>",
+        height=0,
+    )
+
+
+def set_session_cookie(token: str) -> None:
+    '''
+    Have the browser store the token as the session cookie
+    '''
+    if install_cookie_route():
+        _cookie_request("POST", get_session_store().handoff(token))
+
+
+def clear_session_cookie() -> None:
+    '''
+    Have the browser drop the session cookie
+    '''
+    if install_cookie_route():
+        _cookie_request("DELETE")
+
+
+def session_cookie() -> str | None:
+    '''
+    The token the browser sent with this session's websocket handshake, if any
+    '''
+    context = getattr(st, "context", None)
+    cookies = getattr(context, "cookies", None) if context is not None else None
+    return cookies.get(COOKIE_NAME) if cookies is not None else None
@@ -1,29 +1,27 @@
-from app.data.db import connect_database
+from app.data.db import get_connection
+import re
 import sqlite3
-import bcrypt
+import time
+from itertools import islice
 from pathlib import Path
 
 import pandas as pd
 
 from app.data.users import insert_user, get_user_by_username
+from app.advanced_services.hashing_pool import get_hash_pool, HashingBusyError
+from app.advanced_services.query_cache import bump_generation
 
 print("=" * 60)
 print("User Authentication Service")
 print("=" * 60)
 
- # function to produce hashed password
+ # function to produce hashed password (bcrypt runs on the shared worker process pool)
 def hash_password(plain_text_password) :
-    password_bytes= plain_text_password.encode("utf-8")
-    salt= bcrypt.gensalt()
-    hashed_password= bcrypt.hashpw(password_bytes, salt)
-    hashed_password_str= hashed_password.decode("utf-8")
-    return hashed_password_str
+    return get_hash_pool().hash_password(plain_text_password)
 
  # function to verify if the hashed password is correct 
 def verify_password(plain_text_password, hashed_password) :
-    password_bytes= plain_text_password.encode("utf-8")
-    hashed_password_bytes= hashed_password.encode("utf-8")
-    return bcrypt.checkpw(password_bytes, hashed_password_bytes)
+    return get_hash_pool().check_password(plain_text_password, hashed_password)
 
 # function to check if username already in database table
 def user_exists(userName):
@@ -51,7 +49,10 @@ def register_user(user_name, password,role) :
     if user_exists(user_name) == True:
      return False, f"Username {user_name} already exists ! "
     
-    hashed_password = hash_password(password) 
+    try:
+        hashed_password = hash_password(password)
+    except HashingBusyError as e:
+        return False, str(e)
     
  
     
@@ -66,19 +67,15 @@ def register_user(user_name, password,role) :
  # function to login existing user
 def login_user(userName1, password1):
 
-    conn = connect_database()
-    if not conn:
-        return False , "Database connection error."
+    with get_connection() as conn:
+        cursor = conn.cursor()
         
-    cursor = conn.cursor()
-    
-    # Retrieve the stored hash and role for the given username
-    cursor.execute(
-        "SELECT password_hash, role FROM users WHERE username = ?",
-        (userName1,)
-    )
-    user_data = cursor.fetchone()
-    conn.close()
+        # Retrieve the stored hash and role for the given username
+        cursor.execute(
+            "SELECT password_hash, role FROM users WHERE username = ?",
+            (userName1,)
+        )
+        user_data = cursor.fetchone()
 
     if user_data is None:
         return False, "Username not found!"
@@ -86,7 +83,12 @@ def login_user(userName1, password1):
     stored_hash, role = user_data
     
     # Verify the password against the retrieved hash
-    if verify_password(password1, stored_hash):
+    try:
+        matches = verify_password(password1, stored_hash)
+    except HashingBusyError as e:
+        return False, str(e)
+
+    if matches:
         return True, f"Login successful for Role {role}!"
     else:
         return False, "Incorrect password."
@@ -119,38 +121,98 @@ def validate_password(password) -> tuple[bool,str] :
 print("=" * 60)
 print("User Migration Script")
 print("=" * 60)
-def migrate_users_from_file(conn, filepath= Path("DATA")/ "users.txt"):
-
+# A bcrypt hash as written by bcrypt.hashpw e.g. $2b$12$ + 22 salt characters + 31 hash characters
+BCRYPT_HASH = re.compile(r"^\$2[abxy]\$\d{2}\$[./A-Za-z0-9]{53}$")
+ROLES = {"user", "admin", "analyst"}
+
+# One well-formed users.txt line: username,password_hash[,role] - checked with a single regex match
+_USER_LINE = re.compile(r"^[ \t]*([^\s,]+),(\$2[abxy]\$\d{2}\$[./A-Za-z0-9]{53})(?:,(user|admin|analyst)?)?\s*$")
+
+def _line_error(line):
+    """
+    What is wrong with a users.txt line that did not match _USER_LINE, None for a blank line
+    """
+    parts = [p.strip() for p in line.strip().split(',')]
+    if parts == ['']:
+        return None
+    if len(parts) < 2:
+        return "expected username,password_hash[,role]"
+    valid, message = validate_userName(parts[0])
+    if not valid:
+        return f"{message} ({parts[0]!r})"
+    if not BCRYPT_HASH.match(parts[1]):
+        return f"password hash of {parts[0]!r} is not a bcrypt hash"
+    if len(parts) > 2 and parts[2] not in ROLES:
+        return f"unknown role {parts[2]!r} for {parts[0]!r}"
+    return f"invalid username {parts[0]!r}"
+
+def migrate_users_from_file(conn, filepath= Path("DATA")/ "users.txt", batch_size: int = 10_000) -> dict:
+    """
+    Bulk-import legacy users from users.txt (username,password_hash[,role] per line).
+
+    -> The file is streamed and parsed batch_size lines at a time, so memory stays bounded
+    -> Usernames are checked like registration (validate_userName) and hashes against the bcrypt format,
+       bad lines are counted and reported, not imported
+    -> Every imported user gets the 'user' role - a role column in the file is ignored, so editing the
+       file cannot create admins
+    -> Each batch is inserted with executemany, all inside one transaction on the given connection
+    -> Users that already exist are skipped (INSERT OR IGNORE)
+    -> Returns {"migrated": n, "skipped": n, "errors": n}
+
+    """
+    counts = {"migrated": 0, "skipped": 0, "errors": 0}
+    filepath = Path(filepath)
     if not filepath.exists():
         print(f"⚠️  File not found: {filepath}")
         print("   No users to migrate.")
-        return
-    conn = connect_database()
-    cursor = conn.cursor()
-    migrated_count = 0
-    
-    with open(filepath, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Parse line: username,password_hash
-            parts = line.split(',')
-            if len(parts) >= 2:
-                username = parts[0]
-                password_hash = parts[1]
-                
-                # Insert user (ignore if already exists)
-                try:
-                    cursor.execute(
-                        "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-                        (username, password_hash, 'user')
-                    )
-                    if cursor.rowcount > 0:
-                        migrated_count += 1
-                except sqlite3.Error as e:
-                    print(f"Error migrating user {username}: {e}")
-    
-    conn.commit()
-    print(f"✅ Migrated {migrated_count} users from {filepath.name}")
\ No newline at end of file
+        return counts
+
+    started = time.perf_counter()
+    insert_sql = "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, 'user')"
+    try:
+        conn.commit()
+        cursor = conn.cursor()
+        cursor.execute("BEGIN")
+
+        with open(filepath, 'r', encoding='utf-8') as f:
+            line_number = 0
+            while True:
+                lines = list(islice(f, batch_size))
+                if not lines:
+                    break
+                # One C-level regex pass over the batch, then the registration username rules
+                matches = [m if m is not None and validate_userName(m.group(1))[0] else None
+                           for m in map(_USER_LINE.match, lines)]
+                batch = [m.group(1, 2) for m in matches if m is not None]
+
+                if len(batch) < len(lines):
+                    for offset, (line, match) in enumerate(zip(lines, matches)):
+                        error = _line_error(line) if match is None else None
+                        if error is None:
+                            continue
+                        counts["errors"] += 1
+                        # Only the first few bad lines are printed - a broken file can have millions
+                        if counts["errors"] <= 10:
+                            print(f"Skipping line {line_number + offset + 1} of {filepath.name}: {error}")
+                line_number += len(lines)
+
+                cursor.executemany(insert_sql, batch)
+                counts["migrated"] += cursor.rowcount
+                counts["skipped"] += len(batch) - cursor.rowcount
+
+        conn.commit()
+    except sqlite3.Error as e:
+        # Nothing is imported if the transaction fails part way
+        conn.rollback()
+        print(f"Error migrating users from {filepath.name}: {e}")
+        return {"migrated": 0, "skipped": 0, "errors": counts["errors"] + 1}
+    except Exception:
+        # e.g. a decode error in the file - never leave the shared connection inside an open transaction
+        conn.rollback()
+        raise
+
+    bump_generation("users")
+    elapsed = time.perf_counter() - started
+    print(f"✅ Migrated {counts['migrated']} users from {filepath.name} "
+          f"({counts['skipped']} already existed, {counts['errors']} invalid lines, {elapsed:.2f}s)")
+    return counts
@@ -1,9 +1,150 @@
 import bcrypt
+import hashlib
+import mmap
 import os
+import struct
 
 
 USER_DATA_FILE = "users.txt"
 
+# On-disk hash index of users.txt: username -> byte offset of its line
+# -> Header: magic, number of slots, number of users, size and mtime of users.txt when indexed
+# -> Slots: (64-bit hash of the username, offset + 1), open addressing with linear probing, 0 = empty
+# -> A lookup reads one or two slots and one line of users.txt - O(1) however many users there are
+# -> If users.txt was changed by anything other than register_user the index is rebuilt on the next lookup
+INDEX_MAGIC = b"USRIDX1\0"
+INDEX_HEADER = struct.Struct("<8sQQQQ")
+INDEX_SLOT = struct.Struct("<QQ")
+INDEX_MIN_SLOTS = 1024
+
+# function to get the index file path (follows USER_DATA_FILE)
+def user_index_file():
+    return USER_DATA_FILE + ".idx"
+
+# function to hash a username - stable across runs, unlike hash()
+def _username_key(username):
+    return int.from_bytes(hashlib.blake2b(username, digest_size=8).digest(), "little")
+
+# function to get the (size, mtime) signature of users.txt, None if the file does not exist
+def _data_signature():
+    try:
+        st = os.stat(USER_DATA_FILE)
+    except FileNotFoundError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+# function to read the username at a byte offset of users.txt
+def _username_at(data, offset):
+    data.seek(offset)
+    return data.readline().split(b",", 1)[0].strip()
+
+# function to (re)build the index from users.txt in one pass - the first line of a username wins
+def build_user_index():
+    signature = _data_signature()
+    if signature is None:
+        return
+
+    with open(USER_DATA_FILE, "rb") as f:
+        lines = sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b"")) + 1
+    slots = INDEX_MIN_SLOTS
+    while slots < lines * 2:
+        slots *= 2
+    mask = slots - 1
+    table = bytearray(slots * INDEX_SLOT.size)
+    count = 0
+
+    with open(USER_DATA_FILE, "rb") as f, open(USER_DATA_FILE, "rb") as check:
+        offset = 0
+        for line in f:
+            username = line.split(b",", 1)[0].strip()
+            if username:
+                key = _username_key(username)
+                slot = key & mask
+                while True:
+                    stored_key, stored_offset = INDEX_SLOT.unpack_from(table, slot * INDEX_SLOT.size)
+                    if stored_offset == 0:
+                        INDEX_SLOT.pack_into(table, slot * INDEX_SLOT.size, key, offset + 1)
+                        count += 1
+                        break
+                    if stored_key == key and _username_at(check, stored_offset - 1) == username:
+                        break
+                    slot = (slot + 1) & mask
+            offset += len(line)
+
+    # Written to a temporary file and swapped in, so a reader never sees half an index
+    tmp = user_index_file() + ".tmp"
+    with open(tmp, "wb") as out:
+        out.write(INDEX_HEADER.pack(INDEX_MAGIC, slots, count, *signature))
+        out.write(table)
+    os.replace(tmp, user_index_file())
+
+# function to read the index header, None if there is no usable index
+def _read_index_header(f):
+    header = f.read(INDEX_HEADER.size)
+    if len(header) < INDEX_HEADER.size:
+        return None
+    magic, slots, count, size, mtime_ns = INDEX_HEADER.unpack(header)
+    if magic != INDEX_MAGIC:
+        return None
+    return slots, count, (size, mtime_ns)
+
+# function to make sure the index matches users.txt, rebuilding it if the file was modified
+def _ensure_user_index():
+    signature = _data_signature()
+    try:
+        with open(user_index_file(), "rb") as f:
+            header = _read_index_header(f)
+    except FileNotFoundError:
+        header = None
+    if header is None or header[2] != signature:
+        build_user_index()
+
+# function to find a user's line through the index - returns (username, hash, role) or None
+def find_user(userName):
+    if _data_signature() is None:
+        return None
+    _ensure_user_index()
+    username = userName.encode("utf-8")
+    key = _username_key(username)
+
+    with open(user_index_file(), "rb") as f, open(USER_DATA_FILE, "rb") as data:
+        slots, _, _ = _read_index_header(f)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as index:
+            slot = key & (slots - 1)
+            while True:
+                stored_key, stored_offset = INDEX_SLOT.unpack_from(index, INDEX_HEADER.size + slot * INDEX_SLOT.size)
+                if stored_offset == 0:
+                    return None
+                if stored_key == key:
+                    data.seek(stored_offset - 1)
+                    parts = data.readline().decode("utf-8").strip().split(",", 2)
+                    if parts[0].strip() == userName:
+                        return tuple(parts) if len(parts) == 3 else (parts[0], parts[1], "user")
+                slot = (slot + 1) & (slots - 1)
+
+# function to add one appended line to the index - falls back to a rebuild if the index was out of date
+def _index_appended_user(userName, offset, signature_before):
+    try:
+        with open(user_index_file(), "r+b") as f:
+            header = _read_index_header(f)
+            if header is not None and header[2] == signature_before and (header[1] + 1) * 2 <= header[0]:
+                slots, count, _ = header
+                key = _username_key(userName.encode("utf-8"))
+                slot = key & (slots - 1)
+                while True:
+                    f.seek(INDEX_HEADER.size + slot * INDEX_SLOT.size)
+                    if INDEX_SLOT.unpack(f.read(INDEX_SLOT.size))[1] == 0:
+                        break
+                    slot = (slot + 1) & (slots - 1)
+                f.seek(INDEX_HEADER.size + slot * INDEX_SLOT.size)
+                f.write(INDEX_SLOT.pack(key, offset + 1))
+                f.seek(0)
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, slots, count + 1, *_data_signature()))
+                return
+    except FileNotFoundError:
+        pass
+    build_user_index()
+
  # function to produce hashed password
 def hash_password(plain_text_password) :
     password_bytes= plain_text_password.encode("utf-8")
@@ -33,16 +174,11 @@ print(f"\nVerification with correct password: {is_valid}")
 is_invalid = verify_password("WrongPassword", hashed)
 print(f"Verification with incorrect password: {is_invalid}")
 '''
-# function to check if file exists or if username already in file
+# function to check if file exists or if username already in file (index lookup, not a file scan)
 def user_exists(userName):
    if not os.path.exists(USER_DATA_FILE):
        return "Path does not exist"
-   with open(USER_DATA_FILE,"r") as f :
-       for line in f.readlines() :
-           stored_username, _ , _ = line.strip().split(",", 2)
-           if stored_username == userName:
-               return True
-       return False    
+   return find_user(userName) is not None
        
  # function for user registration
 def register_user(user_name, password,role) :
@@ -51,8 +187,12 @@ def register_user(user_name, password,role) :
         return 
     
     hashed_password = hash_password(password) 
+    signature_before = _data_signature()
+    offset = signature_before[0] if signature_before else 0
     with open(USER_DATA_FILE, "a") as f: 
         f.write(f"{user_name},{hashed_password},{role}\n") 
+    # Keep the index in step with the appended line
+    _index_appended_user(user_name, offset, signature_before)
     print(f"User '{user_name}' registered.")
 # function for failed to login
  
@@ -62,19 +202,19 @@ def login_user(userName1, password1):
    print("No users registered yet!")
    return False
 
-  with open(USER_DATA_FILE, "r") as f:
-    for line in f:
-     stored_username, stored_hash, role = line.strip().split(",", 2)
-     if stored_username == userName1:
-        if verify_password(password1, stored_hash):
-         print(f"Login successful for Role {role}!")
-         return True
-        else:
-         print("Incorrect password.")
-         return False
+  user = find_user(userName1)
+  if user is None:
      print("Username not found!")
      return False
 
+  _, stored_hash, role = user
+  if verify_password(password1, stored_hash):
+     print(f"Login successful for Role {role}!")
+     return True
+  else:
+     print("Incorrect password.")
+     return False
+
 def validate_userName(user_name2) -> tuple[bool,str]: 
     if len(user_name2) < 3:
         return False, "Username must be at least 3 characters long."
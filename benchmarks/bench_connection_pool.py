@@ -0,0 +1,57 @@
+'''
+Benchmark: cost of 10k get_incident_by_id calls with a new connection per call
+versus the pooled connection layer in app/data/db.py
+
+Run from the project root:  python -m benchmarks.bench_connection_pool
+'''
+import time
+
+import pandas as pd
+
+from app.data.db import DB_PATH, connect_database, pool_stats
+from app.data.incidents import get_incident_by_id
+
+CALLS = 10_000
+
+
+def get_incident_by_id_per_call(incident_id):
+    # The previous implementation - open, query, close on every call
+    conn = connect_database()
+    df = pd.read_sql_query(
+        "SELECT * FROM cyber_incidents WHERE incident_id = ?",
+        conn,
+        params=(incident_id,)
+    )
+    conn.close()
+    return df
+
+
+def run(fn, ids) -> float:
+    started = time.perf_counter()
+    for i in range(CALLS):
+        fn(ids[i % len(ids)])
+    return time.perf_counter() - started
+
+
+def main():
+    conn = connect_database()
+    ids = [row[0] for row in conn.execute("SELECT incident_id FROM cyber_incidents")]
+    conn.close()
+    if not ids:
+        print(f"No incidents found in {DB_PATH} - load the CSV data first (main.py)")
+        return
+
+    per_call = run(get_incident_by_id_per_call, ids)
+    pooled = run(get_incident_by_id, ids)
+
+    print("=" * 60)
+    print(f"{CALLS:,} x get_incident_by_id")
+    print("=" * 60)
+    print(f"  connect per call : {per_call:8.3f}s  ({per_call / CALLS * 1e6:8.1f} us/call)")
+    print(f"  pooled           : {pooled:8.3f}s  ({pooled / CALLS * 1e6:8.1f} us/call)")
+    print(f"  speed-up         : {per_call / pooled:8.2f}x")
+    print(f"  pool stats       : {pool_stats()}")
+
+
+if __name__ == "__main__":
+    main()
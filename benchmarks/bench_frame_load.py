@@ -0,0 +1,89 @@
+'''
+Load benchmark: building the Cybersecurity page DataFrame for 1M incidents
+-> object round-trip : fetch_all -> SecurityIncident objects -> to_frame -> parse timestamps
+-> columnar          : DatabaseManager.fetch_frame with categorical dtypes and timestamps parsed once
+
+Run from the project root:  python -m benchmarks.bench_frame_load
+'''
+import gc
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from app.advanced_services.database_manager import DatabaseManager
+from app.data.schema import create_all_tables
+from models.security_incident import SecurityIncident
+
+COUNT = 1_000_000
+
+
+def build_database(path):
+    categories = ["Phishing", "Malware", "DDoS", "Unauthorized Access", "Misconfiguration"]
+    severities = ["Low", "Medium", "High", "Critical"]
+    statuses = ["Open", "Closed", "In Progress", "Resolved"]
+    conn = sqlite3.connect(path)
+    create_all_tables(conn)
+    conn.executemany(
+        "INSERT INTO cyber_incidents (incident_id, category, severity, status, description, reported_by, timestamp) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            (i, categories[i % 5], severities[i % 4], statuses[i % 4], f"Incident {i} description", None,
+             f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d} 10:00:00.000000")
+            for i in range(COUNT)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def object_round_trip(db):
+    incidents = SecurityIncident.load_where(db)
+    df = SecurityIncident.to_frame(incidents)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", format="mixed")
+    return df
+
+
+def columnar(db):
+    return db.fetch_frame(
+        "SELECT incident_id, category, severity, status, description, reported_by, timestamp FROM cyber_incidents",
+        dtypes={"incident_id": "int64", "category": "category", "severity": "category", "status": "category"},
+        parse_dates=["timestamp"],
+    )
+
+
+def measure(func, db):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    df = func(db)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    frame_bytes = int(df.memory_usage(deep=True).sum())
+    del df
+    return elapsed, peak, frame_bytes
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        build_database(path)
+        db = DatabaseManager(path)
+        db.connect()
+
+        results = {name: measure(func, db) for name, func in (("object round-trip", object_round_trip), ("columnar", columnar))}
+        db.close()
+
+    print("=" * 72)
+    print(f"Cybersecurity DataFrame for {COUNT:,} incidents")
+    print("=" * 72)
+    for name, (elapsed, peak, frame_bytes) in results.items():
+        print(f"  {name:<18}: {elapsed:6.2f}s, peak {peak / 1024 / 1024:8.1f} MB, frame {frame_bytes / 1024 / 1024:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+'''
+Legacy CLI user store (auth.py): user lookups in a users.txt with 1M accounts
+-> scan  : reading users.txt line by line until the username is found (the previous user_exists/login_user)
+-> index : auth.find_user through the on-disk hash index (users.txt.idx)
+
+Run from the project root:  python -m benchmarks.bench_legacy_user_lookup
+'''
+import os
+import random
+import tempfile
+import time
+
+import auth
+
+COUNT = 1_000_000
+LOOKUPS = 20
+HASH = "$2b$12$YmP//dYgil06u0hGrD41Ze7.KNcjeSNdE87X1DNqRoung5qY22bO6"
+
+
+def scan(username):
+    with open(auth.USER_DATA_FILE, "r") as f:
+        for line in f:
+            if line.split(",", 1)[0] == username:
+                return True
+    return False
+
+
+def timed(lookup, usernames):
+    started = time.perf_counter()
+    for username in usernames:
+        lookup(username)
+    return (time.perf_counter() - started) / len(usernames) * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        auth.USER_DATA_FILE = os.path.join(tmp, "users.txt")
+        with open(auth.USER_DATA_FILE, "w") as f:
+            for i in range(COUNT):
+                f.write(f"legacy_user_{i},{HASH},user\n")
+
+        started = time.perf_counter()
+        auth.build_user_index()
+        build_s = time.perf_counter() - started
+
+        rng = random.Random(7)
+        usernames = [f"legacy_user_{rng.randrange(COUNT)}" for _ in range(LOOKUPS)] + ["missing_user"]
+
+        print("=" * 60)
+        print(f"{COUNT:,} users, {len(usernames)} lookups (one of them a missing user)")
+        print("=" * 60)
+        print(f"  index build     : {build_s:.2f}s ({os.path.getsize(auth.user_index_file()) / 1024 / 1024:.0f} MB)")
+        print(f"  scan per lookup : {timed(scan, usernames):.2f} ms")
+        print(f"  index per lookup: {timed(auth.find_user, usernames):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
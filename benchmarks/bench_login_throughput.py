@@ -0,0 +1,95 @@
+'''
+Login throughput at 1, 8 and 32 concurrent users
+-> inline       : bcrypt.checkpw on the calling thread (the previous AuthManager.login_user)
+-> process pool : AuthManager.login_user with bcrypt on the shared PasswordHashPool
+
+Each concurrency level runs LOGINS logins spread over that many threads (one thread per user,
+like Streamlit script threads). Run from the project root:  python -m benchmarks.bench_login_throughput
+'''
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from app.advanced_services.auth_manager import AuthManager
+from app.advanced_services.database_manager import DatabaseManager
+from app.advanced_services.hashing_pool import configure_hash_pool
+from app.data.schema import create_all_tables
+
+ROUNDS = 12
+LOGINS = 64
+CONCURRENCY = [1, 8, 32]
+PASSWORD = "Benchmark#Pass1"
+
+
+def inline_login(db, username, password):
+    row = db.fetch_one("SELECT password_hash, role FROM users WHERE username = ?", (username,))
+    return row is not None and bcrypt.checkpw(password.encode("utf-8"), row[0].encode("utf-8"))
+
+
+def run(login, users, concurrency):
+    latencies = []
+
+    def one(i):
+        started = time.perf_counter()
+        ok = login(users[i % len(users)], PASSWORD)
+        latencies.append(time.perf_counter() - started)
+        return ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one, range(LOGINS)))
+    elapsed = time.perf_counter() - started
+    assert all(results), "a benchmark login failed"
+
+    latencies.sort()
+    return {
+        "logins_per_s": LOGINS / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def main():
+    pool = configure_hash_pool(max_pending=max(CONCURRENCY) * 2, rounds=ROUNDS)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        conn = sqlite3.connect(path)
+        create_all_tables(conn)
+        conn.close()
+        db = DatabaseManager(path)
+        db.connect()
+
+        users = [f"bench_user_{i}" for i in range(max(CONCURRENCY))]
+        hashed = pool.hash_password(PASSWORD)
+        db.execute_many("INSERT INTO users (username, password_hash, role) VALUES (?, ?, 'user')",
+                        [(user, hashed) for user in users])
+        auth = AuthManager(db)
+
+        modes = {
+            "inline": lambda user, password: inline_login(db, user, password),
+            "process pool": lambda user, password: auth.login_user(user, password)[0],
+        }
+
+        print("=" * 72)
+        print(f"{LOGINS} logins per level, bcrypt rounds={ROUNDS}, {pool.stats()['workers']} worker process(es), "
+              f"{os.cpu_count()} CPU(s)")
+        print("=" * 72)
+        print(f"  {'mode':<13}{'users':>6}{'logins/s':>11}{'p50 ms':>10}{'p95 ms':>10}")
+        for name, login in modes.items():
+            for concurrency in CONCURRENCY:
+                result = run(login, users, concurrency)
+                print(f"  {name:<13}{concurrency:>6}{result['logins_per_s']:>11.1f}"
+                      f"{result['p50_ms']:>10.0f}{result['p95_ms']:>10.0f}")
+        print(f"  pool stats: {pool.stats()}")
+        db.close()
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
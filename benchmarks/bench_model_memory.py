@@ -0,0 +1,123 @@
+'''
+Memory benchmark: bytes per model object with __slots__ versus the previous
+dict-based layout, for 1M SecurityIncident, IT_Ticket and Dataset objects held
+in memory at once
+
+Run from the project root:  python -m benchmarks.bench_model_memory
+'''
+import gc
+import time
+import tracemalloc
+
+from models.security_incident import SecurityIncident
+from models.tickets_class import IT_Ticket
+from models.dataset_class import Dataset
+
+COUNT = 1_000_000
+
+
+# The previous layouts - same private attributes, stored in a per-instance __dict__
+class DictSecurityIncident:
+    def __init__(self, incident_id, incident_type, severity, status, description, reported_by=None, timestamp=None):
+        self.__id = incident_id
+        self.__incident_type = incident_type
+        self.__severity = severity
+        self.__status = status
+        self.__description = description
+        self.__reported_by = reported_by
+        self.__timestamp = timestamp
+
+
+class DictITTicket:
+    def __init__(self, ticket_id, priority, description, status, assigned_to=None, resolution_time_hours=None, created_at=None):
+        self.__id = ticket_id
+        self.__priority = priority
+        self.__description = description
+        self.__status = status
+        self.__assigned_to = assigned_to
+        self.__resolution_time_hours = resolution_time_hours
+        self.__created_at = created_at
+
+
+class DictDataset:
+    def __init__(self, dataset_id, name, rows, columns, uploaded_by=None, upload_date=None):
+        self.__id = dataset_id
+        self.__name = name
+        self.__rows = rows
+        self.__columns = columns
+        self.__uploaded_by = uploaded_by
+        self.__upload_date = upload_date
+
+
+def incident_rows():
+    # Rows shaped like SELECT incident_id, category, severity, status, description, reported_by, timestamp
+    categories = ["Phishing", "Malware", "DDoS", "Unauthorized Access", "Misconfiguration"]
+    severities = ["Low", "Medium", "High", "Critical"]
+    statuses = ["Open", "Closed", "In Progress", "Resolved"]
+    return [
+        (i, categories[i % 5], severities[i % 4], statuses[i % 4], f"Incident {i} description", None,
+         f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d} 10:00:00.000000")
+        for i in range(COUNT)
+    ]
+
+
+def ticket_rows():
+    # Rows shaped like SELECT ticket_id, priority, description, status, assigned_to, resolution_time_hours, created_at
+    priorities = ["Low", "Medium", "High", "Critical"]
+    statuses = ["Open", "In Progress", "Resolved", "Waiting for User"]
+    staff = ["IT_Support_A", "IT_Support_B", "IT_Support_C"]
+    return [
+        (i, priorities[i % 4], f"Ticket {i} description", statuses[i % 4], staff[i % 3], i % 72,
+         f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d} 10:00:00.000000")
+        for i in range(COUNT)
+    ]
+
+
+def dataset_rows():
+    # Rows shaped like SELECT dataset_id, name, rows, columns, uploaded_by, upload_date
+    uploaders = ["data_scientist", "admin", "analyst"]
+    return [
+        (i, f"dataset_{i}", i * 10, i % 40 + 1, uploaders[i % 3], f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}")
+        for i in range(COUNT)
+    ]
+
+
+MODELS = [
+    ("SecurityIncident", DictSecurityIncident, SecurityIncident, incident_rows),
+    ("IT_Ticket", DictITTicket, IT_Ticket, ticket_rows),
+    ("Dataset", DictDataset, Dataset, dataset_rows),
+]
+
+
+def measure(cls, rows):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    objects = [cls(*row) for row in rows]
+    elapsed = time.perf_counter() - started
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del objects
+    # Row data is shared, so the difference is the objects themselves plus the list
+    return used / COUNT, elapsed
+
+
+def main():
+    for name, dict_cls, slot_cls, make_rows in MODELS:
+        rows = make_rows()
+        dict_bytes, dict_time = measure(dict_cls, rows)
+        slot_bytes, slot_time = measure(slot_cls, rows)
+        del rows
+
+        print("=" * 60)
+        print(f"{COUNT:,} {name} objects")
+        print("=" * 60)
+        print(f"  dict-based (before) : {dict_bytes:7.1f} bytes/object, built in {dict_time:.2f}s")
+        print(f"  __slots__  (after)  : {slot_bytes:7.1f} bytes/object, built in {slot_time:.2f}s")
+        print(f"  saving              : {(1 - slot_bytes / dict_bytes) * 100:6.1f}% "
+              f"({(dict_bytes - slot_bytes) * COUNT / 1024 / 1024:,.0f} MB for {COUNT:,} objects)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+'''
+Legacy user import: migrate_users_from_file on a generated users.txt with 1M users
+-> 1% of the lines are malformed and 1% repeat an earlier username, so all three counts are exercised
+-> Every line carries the same well-formed bcrypt hash - only the format is checked on import
+
+Run from the project root:  python -m benchmarks.bench_user_migration
+'''
+import os
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+import psutil
+
+from app.data.schema import create_all_tables
+from app.services.user_service import migrate_users_from_file
+
+COUNT = 1_000_000
+HASH = "$2b$12$YmP//dYgil06u0hGrD41Ze7.KNcjeSNdE87X1DNqRoung5qY22bO6"
+ROLES = ["user", "analyst", "admin"]
+
+
+def write_users_file(path):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(COUNT):
+            if i % 100 == 1:
+                f.write(f"broken_user_{i},not-a-bcrypt-hash\n")
+            elif i % 100 == 2:
+                f.write(f"legacy_user_{i - 2},{HASH},user\n")
+            else:
+                f.write(f"legacy_user_{i},{HASH},{ROLES[i % 3]}\n")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        users_file = Path(tmp) / "users.txt"
+        write_users_file(users_file)
+        conn = sqlite3.connect(os.path.join(tmp, "bench.db"))
+        create_all_tables(conn)
+
+        print("=" * 60)
+        print(f"Importing {COUNT:,} lines ({users_file.stat().st_size / 1024 / 1024:,.0f} MB)")
+        print("=" * 60)
+        rss_before = psutil.Process().memory_info().rss
+        started = time.perf_counter()
+        counts = migrate_users_from_file(conn, users_file)
+        elapsed = time.perf_counter() - started
+        rss_after = psutil.Process().memory_info().rss
+
+        print(f"  counts        : {counts}")
+        print(f"  time          : {elapsed:.2f}s ({COUNT / elapsed:,.0f} lines/s)")
+        print(f"  memory growth : {(rss_after - rss_before) / 1024 / 1024:,.1f} MB")
+        print(f"  users in table: {conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]:,}")
+
+        # A second run finds every user already there
+        print(f"  re-run counts : {migrate_users_from_file(conn, users_file)}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
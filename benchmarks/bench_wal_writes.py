@@ -0,0 +1,119 @@
+'''
+Multi-process write stress test for DatabaseManager
+
+Several writer processes insert incidents while reader processes keep running
+the dashboard GROUP BY query. Run once with the old rollback-journal settings
+and once with WAL, and compare writes per second, lock waits and the time writers
+spent blocked on the lock.
+
+Run from the project root:  python -m benchmarks.bench_wal_writes
+'''
+import multiprocessing as mp
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from app.advanced_services.database_manager import DatabaseManager
+
+SOURCE_DB = Path("DATA") / "intelligence_platform.db"
+WRITERS = 4
+READERS = 4
+WRITES_PER_PROCESS = 500
+
+MODES = {
+    "rollback journal (old)": {"journal_mode": "DELETE", "synchronous": "FULL"},
+    "WAL": {"journal_mode": "WAL", "synchronous": "NORMAL"},
+}
+
+
+def writer(db_path, settings, results):
+    db = DatabaseManager(db_path, max_retries=100, **settings)
+    db.connect()
+    errors = 0
+    for i in range(WRITES_PER_PROCESS):
+        try:
+            db.execute_query(
+                "INSERT INTO cyber_incidents (timestamp, severity, category, status, description, reported_by) "
+                "VALUES (CURRENT_TIMESTAMP, 'Low', 'Stress', 'Open', ?, 'bench')",
+                (f"stress write {i}",)
+            )
+        except Exception:
+            errors += 1
+    results.put(("writer", db.lock_stats(), errors))
+    db.close()
+
+
+def reader(db_path, settings, stop, results):
+    db = DatabaseManager(db_path, **settings)
+    db.connect()
+    reads = errors = 0
+    while not stop.is_set():
+        try:
+            db.fetch_all("SELECT category, COUNT(*) FROM cyber_incidents GROUP BY category")
+            reads += 1
+        except Exception:
+            errors += 1
+    results.put(("reader", reads, errors))
+    db.close()
+
+
+def run_mode(name, settings):
+    workdir = tempfile.mkdtemp()
+    db_path = str(Path(workdir) / "stress.db")
+    shutil.copy(SOURCE_DB, db_path)
+
+    # Set the journal mode on the file before the workers start
+    setup = DatabaseManager(db_path, **settings)
+    setup.connect()
+    setup.close()
+
+    results = mp.Queue()
+    stop = mp.Event()
+    readers = [mp.Process(target=reader, args=(db_path, settings, stop, results)) for _ in range(READERS)]
+    writers = [mp.Process(target=writer, args=(db_path, settings, results)) for _ in range(WRITERS)]
+
+    for p in readers:
+        p.start()
+    started = time.perf_counter()
+    for p in writers:
+        p.start()
+    for p in writers:
+        p.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for p in readers:
+        p.join()
+
+    lock_waits = write_errors = reads = read_errors = 0
+    blocked = write_time = 0.0
+    for _ in range(WRITERS + READERS):
+        kind, value, errors = results.get()
+        if kind == "writer":
+            lock_waits += value["lock_waits"]
+            blocked += value["lock_wait_time_s"]
+            write_time += value["write_time_s"]
+            write_errors += errors
+        else:
+            reads += value
+            read_errors += errors
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    writes = WRITERS * WRITES_PER_PROCESS - write_errors
+    print(f"\n{name}")
+    print(f"  writes/sec   : {writes / elapsed:10.1f}  ({writes} writes in {elapsed:.2f}s)")
+    print(f"  reads/sec    : {reads / elapsed:10.1f}  (read errors: {read_errors})")
+    print(f"  lock waits   : {lock_waits}  ({blocked:.2f}s blocked across writers, failed writes: {write_errors})")
+    print(f"  write latency: {write_time / writes * 1000 if writes else 0:10.2f} ms per successful attempt")
+
+
+def main():
+    print("=" * 60)
+    print(f"Write stress test: {WRITERS} writers x {WRITES_PER_PROCESS} inserts, {READERS} readers")
+    print("=" * 60)
+    for name, settings in MODES.items():
+        run_mode(name, settings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+'''
+Seeded synthetic data for the platform tables at production scale (10k / 1M / 10M rows)
+
+-> cyber_incidents and it_tickets get the full row count, datasets_metadata and users 1% of it
+-> Categories, severities, statuses and priorities follow skewed (realistic) weights, not uniform ones
+-> Timestamps cover two years, lean towards recent months and office hours
+-> Descriptions are built from per-category phrases so full-text search has real words to match
+-> The same seed always produces the same rows, for CSV files and for the database alike
+
+Run from the project root e.g.
+    python -m benchmarks.generate_data --scale 1m --out bench_data            (database only)
+    python -m benchmarks.generate_data --scale 10k --out bench_data --csv      (database and CSV files)
+'''
+import argparse
+import csv
+import random
+import sqlite3
+import time
+from datetime import date, timedelta
+from itertools import accumulate
+from pathlib import Path
+
+from app.data.schema import create_all_tables, run_migrations
+
+SCALES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+BATCH_SIZE = 50_000
+
+# Two years of data, ending on the last day below
+LAST_DAY = date(2025, 12, 31)
+DAYS = 730
+
+INCIDENT_CATEGORIES = ["Phishing", "Malware", "Unauthorized Access", "Misconfiguration", "DDoS"]
+INCIDENT_CATEGORY_WEIGHTS = [35, 25, 15, 15, 10]
+SEVERITIES = ["Low", "Medium", "High", "Critical"]
+SEVERITY_WEIGHTS = [40, 35, 18, 7]
+INCIDENT_STATUSES = ["Closed", "Resolved", "In Progress", "Open"]
+INCIDENT_STATUS_WEIGHTS = [40, 30, 15, 15]
+
+TICKET_PRIORITIES = ["Low", "Medium", "High", "Critical"]
+TICKET_PRIORITY_WEIGHTS = [30, 40, 22, 8]
+TICKET_STATUSES = ["Resolved", "Closed", "In Progress", "Open", "Waiting for User"]
+TICKET_STATUS_WEIGHTS = [40, 20, 15, 15, 10]
+SUPPORT_STAFF = [f"IT_Support_{c}" for c in "ABCDEFGHIJKLMNOP"]
+# A few people carry most of the tickets
+SUPPORT_STAFF_WEIGHTS = [1 / (rank + 1) for rank in range(len(SUPPORT_STAFF))]
+
+ROLES = ["user", "analyst", "admin"]
+ROLE_WEIGHTS = [70, 25, 5]
+FIRST_NAMES = ["alex", "sam", "jordan", "taylor", "morgan", "casey", "riley", "jamie", "avery", "quinn",
+               "ayush", "abhi", "priya", "omar", "lena", "chen", "maria", "noah", "fatima", "ivan"]
+LAST_NAMES = ["smith", "patel", "khan", "garcia", "nguyen", "brown", "wilson", "silva", "kumar", "ali"]
+
+DATASET_TOPICS = ["Customer_Churn", "Financial_Fraud", "Network_Traffic", "Sales_Forecast", "Sensor_Readings",
+                  "Support_Tickets", "Web_Logs", "Threat_Intel", "HR_Attrition", "Inventory"]
+
+INCIDENT_PHRASES = {
+    "Phishing": ["phishing email impersonating the {dept} team", "credential harvesting link sent to {dept} staff",
+                 "spoofed invoice email with malicious attachment", "reported suspicious email asking for password reset"],
+    "Malware": ["ransomware detected on {dept} workstation", "trojan quarantined by endpoint protection",
+                "malicious macro executed from downloaded document", "cryptominer found on build server"],
+    "Unauthorized Access": ["repeated failed logins followed by success from new country",
+                            "privileged account used outside office hours", "vpn access from unrecognised device",
+                            "shared credentials used to access {dept} records"],
+    "Misconfiguration": ["public storage bucket exposing {dept} files", "firewall rule left open after maintenance",
+                         "expired tls certificate on internal service", "default admin password on network switch"],
+    "DDoS": ["traffic spike saturating the public web gateway", "syn flood against vpn concentrator",
+             "api rate limits exceeded by botnet traffic", "dns amplification attack on resolver"],
+}
+TICKET_PHRASES = ["laptop will not boot after update", "printer offline on {dept} floor", "password reset request",
+                  "vpn disconnects every few minutes", "email client crashes on start", "slow network in {dept} office",
+                  "software licence request", "monitor flickering", "cannot access shared drive",
+                  "new starter account setup for {dept}"]
+DEPARTMENTS = ["finance", "hr", "sales", "engineering", "legal", "marketing", "operations", "support"]
+
+INCIDENT_COLUMNS = ["incident_id", "timestamp", "severity", "category", "status", "description", "reported_by"]
+TICKET_COLUMNS = ["ticket_id", "priority", "description", "status", "assigned_to", "created_at", "resolution_time_hours"]
+DATASET_COLUMNS = ["dataset_id", "name", "rows", "columns", "uploaded_by", "upload_date"]
+USER_COLUMNS = ["username", "password_hash", "role"]
+# One real bcrypt hash (of "Benchmark#Pass1", cost 4) shared by every generated user - fixed so the output is reproducible
+PASSWORD_HASH = "$2b$04$.TKfWRObVI7WpVbioIcHYOZAum2iHj.P8jvyspLsGyH.2lV/7npgG"
+
+
+def table_sizes(rows: int) -> dict:
+    '''
+    Number of rows generated per table for a given scale
+    '''
+    return {
+        "users": max(10, rows // 100),
+        "cyber_incidents": rows,
+        "it_tickets": rows,
+        "datasets_metadata": max(5, rows // 100),
+    }
+
+
+def _rng(seed: int, table: str) -> random.Random:
+    # One generator per table, so a table's rows do not depend on which other tables were generated
+    return random.Random(f"{seed}:{table}")
+
+
+def _days(rng: random.Random, k: int) -> list[str]:
+    # sqrt skews towards 1, i.e. towards the most recent days - the volume grows over time
+    return [(LAST_DAY - timedelta(days=int(DAYS * (1 - rng.random() ** 0.5)))).isoformat() for _ in range(k)]
+
+
+def _times(rng: random.Random, k: int) -> list[str]:
+    # Mostly office hours, with a tail through the night
+    hours = rng.choices(range(24), weights=[1, 1, 1, 1, 1, 2, 4, 8, 12, 14, 14, 13, 11, 13, 14, 13, 11, 8, 5, 4, 3, 2, 2, 1], k=k)
+    return [f"{h:02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}" for h in hours]
+
+
+def usernames(count: int, start: int = 0) -> list[str]:
+    return [f"{FIRST_NAMES[i % len(FIRST_NAMES)]}_{LAST_NAMES[i // len(FIRST_NAMES) % len(LAST_NAMES)]}{i}"
+            for i in range(start, count)]
+
+
+def user_rows(count: int, seed: int, password_hash: str):
+    rng = _rng(seed, "users")
+    for start in range(0, count, BATCH_SIZE):
+        k = min(BATCH_SIZE, count - start)
+        roles = rng.choices(ROLES, weights=ROLE_WEIGHTS, k=k)
+        names = usernames(start + k, start)
+        yield [(name, password_hash, role) for name, role in zip(names, roles)]
+
+
+def incident_rows(count: int, seed: int, users: list[str]):
+    rng = _rng(seed, "cyber_incidents")
+    # Zipf-like: a small share of users report most incidents
+    reporter_weights = list(accumulate(1 / (rank + 1) for rank in range(len(users))))
+    for start in range(0, count, BATCH_SIZE):
+        k = min(BATCH_SIZE, count - start)
+        categories = rng.choices(INCIDENT_CATEGORIES, weights=INCIDENT_CATEGORY_WEIGHTS, k=k)
+        severities = rng.choices(SEVERITIES, weights=SEVERITY_WEIGHTS, k=k)
+        statuses = rng.choices(INCIDENT_STATUSES, weights=INCIDENT_STATUS_WEIGHTS, k=k)
+        reporters = rng.choices(users, cum_weights=reporter_weights, k=k)
+        days, times = _days(rng, k), _times(rng, k)
+        yield [
+            (1000 + start + i, f"{days[i]} {times[i]}.000000", severities[i], categories[i], statuses[i],
+             rng.choice(INCIDENT_PHRASES[categories[i]]).format(dept=rng.choice(DEPARTMENTS)), reporters[i])
+            for i in range(k)
+        ]
+
+
+def ticket_rows(count: int, seed: int):
+    rng = _rng(seed, "it_tickets")
+    for start in range(0, count, BATCH_SIZE):
+        k = min(BATCH_SIZE, count - start)
+        priorities = rng.choices(TICKET_PRIORITIES, weights=TICKET_PRIORITY_WEIGHTS, k=k)
+        statuses = rng.choices(TICKET_STATUSES, weights=TICKET_STATUS_WEIGHTS, k=k)
+        staff = rng.choices(SUPPORT_STAFF, weights=SUPPORT_STAFF_WEIGHTS, k=k)
+        days, times = _days(rng, k), _times(rng, k)
+        yield [
+            (2000 + start + i, priorities[i], rng.choice(TICKET_PHRASES).format(dept=rng.choice(DEPARTMENTS)),
+             statuses[i], staff[i], f"{days[i]} {times[i]}",
+             # Resolution time is long-tailed (log-normal, median ~20 hours), only set once a ticket is done
+             max(1, int(rng.lognormvariate(3.0, 0.8))) if statuses[i] in ("Resolved", "Closed") else None)
+            for i in range(k)
+        ]
+
+
+def dataset_rows(count: int, seed: int, users: list[str]):
+    rng = _rng(seed, "datasets_metadata")
+    uploaders = users[:50]
+    for start in range(0, count, BATCH_SIZE):
+        k = min(BATCH_SIZE, count - start)
+        days = _days(rng, k)
+        yield [
+            (1 + start + i, f"{rng.choice(DATASET_TOPICS)}_{start + i}",
+             # Row counts span 100 to ~10M, most datasets are small
+             int(10 ** rng.uniform(2, 7)), rng.randint(3, 80), rng.choice(uploaders), days[i])
+            for i in range(k)
+        ]
+
+
+def _tables(rows: int, seed: int):
+    '''
+    (table, columns, batches of row tuples) for every table, users first
+    '''
+    sizes = table_sizes(rows)
+    users = usernames(sizes["users"])
+    return [
+        ("users", USER_COLUMNS, user_rows(sizes["users"], seed, PASSWORD_HASH)),
+        ("cyber_incidents", INCIDENT_COLUMNS, incident_rows(sizes["cyber_incidents"], seed, users)),
+        ("it_tickets", TICKET_COLUMNS, ticket_rows(sizes["it_tickets"], seed)),
+        ("datasets_metadata", DATASET_COLUMNS, dataset_rows(sizes["datasets_metadata"], seed, users)),
+    ]
+
+
+def generate_database(db_path, rows: int, seed: int = 42) -> dict:
+    '''
+    Create a database at db_path filled with generated rows - returns rows written per table
+    -> Rows go into bare tables first; the migrations then build the indexes, rollups and FTS in one pass each
+    '''
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    if db_path.exists():
+        raise FileExistsError(f"{db_path} already exists")
+
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    create_all_tables(conn)
+    written = {}
+    for table, columns, batches in _tables(rows, seed):
+        started = time.perf_counter()
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+        written[table] = 0
+        with conn:
+            for batch in batches:
+                conn.executemany(sql, batch)
+                written[table] += len(batch)
+        print(f"  {table:<18} {written[table]:>12,} rows  {time.perf_counter() - started:8.1f}s")
+
+    started = time.perf_counter()
+    run_migrations(conn)
+    print(f"  indexes, rollups and full-text index built in {time.perf_counter() - started:.1f}s")
+    conn.close()
+    return written
+
+
+def generate_csv(out_dir, rows: int, seed: int = 42) -> dict:
+    '''
+    Write the generated rows as CSV files (header row, same columns as the tables) - returns table -> path
+    -> users are written as users.txt (username,password_hash,role without a header), the legacy import format
+    '''
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for table, columns, batches in _tables(rows, seed):
+        is_users = table == "users"
+        path = out_dir / ("users.txt" if is_users else f"{table}.csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            if not is_users:
+                writer.writerow(columns)
+            for batch in batches:
+                writer.writerows(batch)
+        paths[table] = path
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate seeded synthetic platform data")
+    parser.add_argument("--scale", choices=SCALES, default="10k", help="cyber_incidents / it_tickets row count")
+    parser.add_argument("--rows", type=int, help="explicit row count, overrides --scale")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="bench_data", help="output folder")
+    parser.add_argument("--csv", action="store_true", help="also write CSV files")
+    parser.add_argument("--no-db", action="store_true", help="do not build the database")
+    args = parser.parse_args()
+
+    rows = args.rows or SCALES[args.scale]
+    out = Path(args.out)
+    print("=" * 60)
+    print(f"Generating {rows:,} rows (seed {args.seed}) into {out}")
+    print("=" * 60)
+    if not args.no_db:
+        generate_database(out / "DATA" / "intelligence_platform.db", rows, args.seed)
+    if args.csv:
+        for table, path in generate_csv(out / "csv", rows, args.seed).items():
+            print(f"  {table:<18} -> {path}")
+
+
+if __name__ == "__main__":
+    main()
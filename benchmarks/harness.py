@@ -0,0 +1,332 @@
+'''
+Benchmark suite at production scale, with machine-readable results
+
+-> Generates a seeded database (and CSV files) with benchmarks.generate_data at the chosen scale
+-> Times every analytical query, every CRUD helper in app/data, CSV ingestion and the page data loaders
+-> The query cache is cleared before every run, so the queries themselves are timed, not cache hits
+-> Writes one JSON file (meta + one entry per benchmark) - pass an older file to --compare to list regressions
+
+Run from the project root e.g.
+    python -m benchmarks.harness --scale 10k --output results/10k.json
+    python -m benchmarks.harness --scale 1m --output results/1m.json --compare results/1m_before.json
+'''
+import argparse
+import json
+import os
+import platform
+import re
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from itertools import count, cycle
+from pathlib import Path
+
+import pandas as pd
+
+from app.advanced_services.database_manager import DatabaseManager
+from app.advanced_services.query_cache import get_query_cache
+from app.data import datasets, incidents, tickets, users
+from app.data.db import DB_PATH, get_pool
+from app.data.schema import create_all_tables
+from app.services import analyticalQueries as aq
+from app.services.loadCSV import load_csv_to_table, stream_csv_to_table
+from app.services.user_service import migrate_users_from_file
+from benchmarks.generate_data import SCALES, PASSWORD_HASH, generate_csv, generate_database
+from models.security_incident import SecurityIncident
+from models.tickets_class import IT_Ticket
+
+# Per-call helpers are run this many times per repeat and reported per call
+CRUD_CALLS = 200
+
+
+class Suite:
+    '''
+    Collects timings - each benchmark is (group, name, function, number of calls per run)
+    '''
+
+    def __init__(self, repeat: int, only: str | None = None, skip: str | None = None):
+        self.repeat = repeat
+        self.only = re.compile(only) if only else None
+        self.skip = re.compile(skip) if skip else None
+        self.results = []
+
+    def _selected(self, name: str) -> bool:
+        if self.only is not None and not self.only.search(name):
+            return False
+        return self.skip is None or not self.skip.search(name)
+
+    def run(self, group: str, name: str, func, number: int = 1, setup=None) -> None:
+        full_name = f"{group}.{name}"
+        if not self._selected(full_name):
+            return
+        timings, rows, error = [], None, None
+        for _ in range(self.repeat):
+            get_query_cache().clear()
+            try:
+                if setup is not None:
+                    setup()
+                started = time.perf_counter()
+                for _ in range(number):
+                    result = func()
+                timings.append((time.perf_counter() - started) / number)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                break
+            rows = _row_count(result)
+
+        entry = {"group": group, "name": name, "number": number, "runs": len(timings), "rows": rows, "error": error}
+        if timings:
+            entry.update(min_s=min(timings), median_s=statistics.median(timings), max_s=max(timings))
+        self.results.append(entry)
+        shown = f"{entry['median_s'] * 1000:12.3f} ms" if timings else f"  FAILED {error}"
+        print(f"  {full_name:<58}{shown}")
+
+
+def _row_count(result):
+    if isinstance(result, tuple) and result and isinstance(result[0], (list, pd.DataFrame)):
+        result = result[0]   # (page, next_after_id)
+    if isinstance(result, (pd.DataFrame, list)):
+        return len(result)
+    return None
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent.parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def analytical_benchmarks(suite: Suite, db: DatabaseManager) -> None:
+    queries = {
+        "get_incidents_by_type_count": lambda: aq.get_incidents_by_type_count(db),
+        "get_high_severity_by_status": lambda: aq.get_high_severity_by_status(db),
+        "get_high_severity_incidents": lambda: aq.get_high_severity_incidents(db),
+        "get_incident_types_with_many_cases": lambda: aq.get_incident_types_with_many_cases(db, min_count=5),
+        "get_datasets_by_uploader": lambda: aq.get_datasets_by_uploader(db),
+        "get_large_datasets": lambda: aq.get_large_datasets(db, min_rows=1_000_000),
+        "get_dataset_upload_trends_monthly": lambda: aq.get_dataset_upload_trends_monthly(db),
+        "get_tickets_by_priority": lambda: aq.get_tickets_by_priority(db),
+        "get_high_priority_tickets": lambda: aq.get_high_priority_tickets(db),
+        "get_high_priority_tickets_by_status": lambda: aq.get_high_priority_tickets_by_status(db),
+        "get_slow_resolution_tickets_by_status": lambda: aq.get_slow_resolution_tickets_by_status(db),
+        "get_avg_resolution_by_staff": lambda: aq.get_avg_resolution_by_staff(db),
+        "get_slow_resolution_tickets_only": lambda: aq.get_slow_resolution_tickets_only(db),
+        "get_incident_trend": lambda: aq.get_incident_trend(db, "category", ("Phishing",), "week"),
+        "get_ticket_trend": lambda: aq.get_ticket_trend(db, interval="day"),
+        "get_dataset_upload_trend": lambda: aq.get_dataset_upload_trend(db),
+    }
+    for name, func in queries.items():
+        suite.run("analytical", name, func)
+
+
+def page_loader_benchmarks(suite: Suite, db: DatabaseManager) -> None:
+    loaders = {
+        "get_incident_dashboard_summary": lambda: aq.get_incident_dashboard_summary(db, min_count=5),
+        "get_ticket_dashboard_summary": lambda: aq.get_ticket_dashboard_summary(db),
+        "get_dataset_dashboard_summary": lambda: aq.get_dataset_dashboard_summary(db),
+        "load_datasets_frame": lambda: aq.load_datasets_frame(db),
+        "incident_picker_page": lambda: SecurityIncident.load_page(
+            db, {"severity": ["High", "Critical"], "status": ["Open"]}, limit=25, as_frame=True),
+        "ticket_picker_page": lambda: IT_Ticket.load_page(
+            db, {"priority": ["High"], "assigned_to": "IT_Support_C"}, limit=25, as_frame=True),
+        "incident_search": lambda: incidents.search_incidents("phishing email finance", limit=26),
+        "ticket_search": lambda: tickets.search_tickets("vpn", limit=26),
+    }
+    for name, func in loaders.items():
+        suite.run("page", name, func)
+
+
+def crud_benchmarks(suite: Suite) -> None:
+    '''
+    Every CRUD helper in app/data, CRUD_CALLS calls per run
+    -> Reads and updates go to rows the benchmark inserted itself, and every inserted row is
+       deleted at the end, so the generated data is left as it was
+    '''
+    user_numbers = count()
+
+    def new_user():
+        name = f"bench_crud_user_{next(user_numbers)}"
+        users.insert_user(name, PASSWORD_HASH)
+        return name
+
+    # (name, insert -> key, read, update, delete, read all)
+    helpers = [
+        ("incident",
+         lambda: incidents.insert_incident("High", "Phishing", "Open", "bench phishing email to finance"),
+         incidents.get_incident_by_id, lambda key: incidents.update_incident_status(key, "Closed"),
+         incidents.delete_incident, incidents.get_all_incidents),
+        ("ticket",
+         lambda: tickets.insert_ticket("High", "bench vpn disconnects", "Open", "IT_Support_A"),
+         tickets.get_ticket_by_id, lambda key: tickets.update_ticket_status(key, "Resolved"),
+         tickets.delete_ticket, tickets.get_all_tickets),
+        ("dataset",
+         lambda: datasets.insert_dataset("Bench_Dataset", 1000, 10, "alex_smith0"),
+         datasets.get_datasets_by_id, lambda key: datasets.update_dataset_name(key, "Bench_Dataset_Renamed"),
+         datasets.delete_dataset, datasets.get_all_datasets),
+        ("user",
+         new_user,
+         users.get_user_by_username, lambda key: users.update_user_password(key, PASSWORD_HASH),
+         users.delete_user, users.get_all_users),
+    ]
+
+    for name, insert, read, update, delete, read_all in helpers:
+        inserted, victims = [], []
+        suite.run("crud", f"insert_{name}", lambda: inserted.append(insert()), CRUD_CALLS)
+        while len(inserted) < CRUD_CALLS:
+            inserted.append(insert())
+
+        keys = cycle(inserted[:CRUD_CALLS])
+        suite.run("crud", f"get_{name}", lambda: read(next(keys)), CRUD_CALLS)
+        suite.run("crud", f"update_{name}", lambda: update(next(keys)), CRUD_CALLS)
+
+        def refill():
+            while len(victims) < CRUD_CALLS:
+                victims.append(insert())
+
+        suite.run("crud", f"delete_{name}", lambda: delete(victims.pop()), CRUD_CALLS, setup=refill)
+        suite.run("crud", f"get_all_{name}s", read_all)
+
+        for key in inserted + victims:
+            delete(key)
+
+
+def ingestion_benchmarks(suite: Suite, csv_paths: dict, workdir: Path) -> None:
+    scratch = workdir / "ingest.db"
+
+    def fresh_connection():
+        if scratch.exists():
+            scratch.unlink()
+        conn = sqlite3.connect(str(scratch))
+        create_all_tables(conn)
+        return conn
+
+    for table in ("cyber_incidents", "it_tickets", "datasets_metadata"):
+        for name, load in (("stream_csv_to_table", stream_csv_to_table), ("load_csv_to_table", load_csv_to_table)):
+            state = {}
+
+            def setup(state=state):
+                if "conn" in state:
+                    state["conn"].close()
+                state["conn"] = fresh_connection()
+
+            suite.run("ingest", f"{name}.{table}",
+                      lambda state=state, load=load, table=table: load(state["conn"], str(csv_paths[table]), table),
+                      setup=setup)
+            if "conn" in state:
+                state["conn"].close()
+
+    state = {}
+
+    def setup_users():
+        if "conn" in state:
+            state["conn"].close()
+        state["conn"] = fresh_connection()
+
+    suite.run("ingest", "migrate_users_from_file",
+              lambda: migrate_users_from_file(state["conn"], csv_paths["users"]), setup=setup_users)
+    if "conn" in state:
+        state["conn"].close()
+
+
+def compare(results: list, baseline_path: str, threshold: float) -> int:
+    '''
+    Print current vs baseline medians - returns the number of regressions (slower by more than threshold)
+    '''
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["group"], r["name"]): r for r in json.load(f)["results"]}
+
+    regressions = 0
+    print("=" * 96)
+    print(f"Compared with {baseline_path} (regression = more than {threshold:.2f}x slower)")
+    print("=" * 96)
+    for result in results:
+        before = baseline.get((result["group"], result["name"]))
+        if before is None or "median_s" not in before or "median_s" not in result:
+            continue
+        ratio = result["median_s"] / before["median_s"] if before["median_s"] else float("inf")
+        flag = "REGRESSION" if ratio > threshold else ("faster" if ratio < 1 / threshold else "")
+        regressions += flag == "REGRESSION"
+        print(f"  {result['group'] + '.' + result['name']:<58}{before['median_s'] * 1000:12.3f} ms"
+              f"{result['median_s'] * 1000:12.3f} ms{ratio:8.2f}x  {flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite on generated data")
+    parser.add_argument("--scale", choices=SCALES, default="10k")
+    parser.add_argument("--rows", type=int, help="explicit row count, overrides --scale")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", help="regex - run only matching benchmarks e.g. 'analytical|page'")
+    parser.add_argument("--skip", help="regex - skip matching benchmarks e.g. 'get_all_|load_csv'")
+    parser.add_argument("--workdir", help="keep the generated data here (default: a temporary folder)")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    rows = args.rows or SCALES[args.scale]
+    output = Path(args.output).resolve()
+    baseline = Path(args.compare).resolve() if args.compare else None
+    suite = Suite(args.repeat, args.only, args.skip)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(args.workdir or tmp).resolve()
+        db_path = workdir / DB_PATH
+
+        print("=" * 72)
+        print(f"Generating {rows:,} rows (seed {args.seed}) in {workdir}")
+        print("=" * 72)
+        if not db_path.exists():
+            generate_database(db_path, rows, args.seed)
+        csv_paths = generate_csv(workdir / "csv", rows, args.seed)
+
+        # The app/data helpers open the relative DB_PATH, so run from the folder that holds the generated database
+        os.chdir(workdir)
+        db = DatabaseManager(str(db_path))
+        db.connect()
+
+        print("=" * 72)
+        print(f"Running benchmarks ({args.repeat} runs each, median shown)")
+        print("=" * 72)
+        started = datetime.now(timezone.utc)
+        analytical_benchmarks(suite, db)
+        page_loader_benchmarks(suite, db)
+        crud_benchmarks(suite)
+        ingestion_benchmarks(suite, csv_paths, workdir)
+
+        db.close()
+        get_pool().close_all()
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "meta": {
+                "scale": args.scale if not args.rows else None,
+                "rows": rows,
+                "seed": args.seed,
+                "repeat": args.repeat,
+                "started_at": started.isoformat(),
+                "git_commit": _git_commit(),
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "pandas": pd.__version__,
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+            },
+            "results": suite.results,
+        }, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if baseline is not None:
+        sys.exit(1 if compare(suite.results, str(baseline), args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+'''
+Headless load test of the Streamlit app - how many concurrent analysts one server process can handle
+
+-> Every simulated analyst is a Streamlit AppTest session running Home.py and the domain pages in this process,
+   so they share the st.cache_resource database, auth manager and hashing pool exactly like browser sessions
+-> Each session logs in, then repeats: view each dashboard, filter incidents, add an incident, update an
+   incident status and run the AI analyser
+-> The Gemini client is replaced by a local stub that streams a canned answer after --ai-latency seconds
+-> Reports throughput, p50/p95/p99 rerun latency per step, SQLite lock waits, pool waits and memory per session
+-> Runs on a generated database (benchmarks.generate_data) in a work folder, never on DATA/ of the project
+
+Run from the project root e.g.
+    python -m benchmarks.load_test --sessions 20 --iterations 5
+    python -m benchmarks.load_test --sessions 50 --scale 1m --workdir bench_data --output load_50.json
+'''
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import psutil
+from streamlit.testing.v1 import AppTest
+
+from app.advanced_services import resources
+from app.advanced_services.page_profiler import percentile
+from app.data.db import DB_PATH
+from benchmarks.generate_data import SCALES, generate_database, table_sizes, usernames
+
+ROOT = Path(__file__).resolve().parent.parent
+HOME = ROOT / "Home.py"
+PAGES = {
+    "cybersecurity": "pages/1_🛡️_Cybersecurity.py",
+    "data_science": "pages/2_📊_Data_Science.py",
+    "it_operations": "pages/3_⚙️_IT_Operations.py",
+}
+# Password of every generated user (see PASSWORD_HASH in benchmarks.generate_data)
+PASSWORD = "Benchmark#Pass1"
+
+
+class StubGeminiClient:
+    '''
+    Stands in for genai.Client - generate_content(_stream) answer after a fixed delay, nothing leaves the machine
+    '''
+
+    def __init__(self, latency: float, chunks: int = 8):
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.models = SimpleNamespace(generate_content=self._generate, generate_content_stream=self._stream)
+        self._latency = latency
+        self._chunks = chunks
+
+    def _count(self) -> None:
+        with self._lock:
+            self.calls += 1
+
+    def _generate(self, model, contents, config=None):
+        self._count()
+        time.sleep(self._latency)
+        return SimpleNamespace(text="Stub analysis. " * self._chunks)
+
+    def _stream(self, model, contents, config=None):
+        self._count()
+        for i in range(self._chunks):
+            time.sleep(self._latency / self._chunks)
+            yield SimpleNamespace(text=f"Stub analysis part {i + 1}. ")
+
+
+def install_stub_ai_client(client: StubGeminiClient) -> None:
+    '''
+    The pages import get_ai_client from resources on every run, so replacing it there reaches all of them
+    '''
+    def get_stub_client():
+        return client
+    get_stub_client.clear = lambda: None
+    resources.get_ai_client = get_stub_client
+
+
+class StepFailed(Exception):
+    pass
+
+
+def _by_label(widgets, label: str):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise StepFailed(f"no widget labelled {label!r}")
+
+
+class AnalystSession:
+    '''
+    One simulated analyst - an AppTest session plus the latency of every rerun it triggered, per step
+    '''
+
+    def __init__(self, username: str, timeout: float):
+        self.username = username
+        self.at = AppTest.from_file(str(HOME), default_timeout=timeout)
+        self.at.secrets["GEMINI_API_KEY"] = "stub"
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.last_error = None
+
+    def _rerun(self, step: str, action) -> None:
+        started = time.perf_counter()
+        action()
+        self.latencies[step].append(time.perf_counter() - started)
+        if len(self.at.exception):
+            raise StepFailed(self.at.exception[0].message)
+
+    def step(self, step: str, func) -> bool:
+        try:
+            func()
+            return True
+        except Exception as e:
+            self.errors[step] += 1
+            self.last_error = f"{step}: {type(e).__name__}: {e}"
+            return False
+
+    def login(self) -> None:
+        at = self.at
+        self._rerun("open", at.run)
+        self._rerun("login", at.button(key="login_button").click().run)
+        at.text_input(key="login_user").input(self.username)
+        at.text_input(key="login_pass").input(PASSWORD)
+        self._rerun("login", at.button(key="login_submit").click().run)
+        if not at.session_state["logged_in"]:
+            raise StepFailed(f"login refused for {self.username}")
+
+    def view(self, page: str) -> None:
+        self._rerun("view", self.at.switch_page(PAGES[page]).run)
+
+    def filter(self) -> None:
+        at = self.at
+        self._rerun("filter", at.selectbox(key="action_choice").select(" Update Status").run)
+        self._rerun("filter", at.multiselect(key="update_incident_severity").select("High").run)
+
+    def update(self) -> None:
+        # Relies on filter() having opened the Update Status form
+        at = self.at
+        _by_label(at.selectbox, "New Status").select("Closed")
+        self._rerun("update", _by_label(at.button, "Update Status").click().run)
+
+    def insert(self) -> None:
+        at = self.at
+        self._rerun("insert", at.selectbox(key="action_choice").select(" Add Incident").run)
+        _by_label(at.selectbox, "Severity").select("High")
+        _by_label(at.selectbox, "Incident Type").select("Phishing")
+        _by_label(at.selectbox, "Status").select("Open")
+        _by_label(at.text_input, "Reported By").input(self.username)
+        _by_label(at.text_input, "Description").input("load test incident")
+        self._rerun("insert", _by_label(at.button, "Submit").click().run)
+
+    def analyse(self) -> None:
+        self._rerun("analyse", _by_label(self.at.button, "Analyse with AI").click().run)
+
+    def scenario(self, iterations: int, start: threading.Barrier) -> None:
+        start.wait()
+        if not self.step("login", self.login):
+            return
+        for _ in range(iterations):
+            for page in ("data_science", "it_operations", "cybersecurity"):
+                self.step("view", lambda: self.view(page))
+            # The remaining steps work on the Cybersecurity page, which view() left open
+            if self.step("filter", self.filter):
+                self.step("update", self.update)
+            self.step("insert", self.insert)
+            self.step("analyse", self.analyse)
+
+
+def _summary(samples: list[float]) -> dict:
+    samples = sorted(samples)
+    return {
+        "reruns": len(samples),
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 1),
+        "max_ms": round(samples[-1] * 1000, 1) if samples else 0.0,
+    }
+
+
+def run_load_test(sessions: int, iterations: int, timeout: float) -> dict:
+    '''
+    Runs the scenario in `sessions` concurrent AppTest sessions against the database in the current folder
+    '''
+    process = psutil.Process()
+    users = usernames(sessions)
+    db = resources.get_database()
+    locks_before = db.lock_stats()
+    rss_before = process.memory_info().rss
+
+    analysts = [AnalystSession(username, timeout) for username in users]
+    start = threading.Barrier(sessions)
+    rss_peak = rss_before
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        futures = [pool.submit(analyst.scenario, iterations, start) for analyst in analysts]
+        while not all(future.done() for future in futures):
+            rss_peak = max(rss_peak, process.memory_info().rss)
+            time.sleep(0.2)
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - started
+    # Sessions are still referenced here, so this is the memory they hold on to
+    rss_after = process.memory_info().rss
+
+    by_step = defaultdict(list)
+    errors = defaultdict(int)
+    for analyst in analysts:
+        for step, samples in analyst.latencies.items():
+            by_step[step].extend(samples)
+        for step, n in analyst.errors.items():
+            errors[step] += n
+    all_samples = [sample for samples in by_step.values() for sample in samples]
+    locks_after = db.lock_stats()
+
+    return {
+        "sessions": sessions,
+        "iterations": iterations,
+        "elapsed_s": round(elapsed, 2),
+        "reruns_per_s": round(len(all_samples) / elapsed, 2),
+        "scenarios_per_s": round(sessions * iterations / elapsed, 3),
+        "latency": {"all": _summary(all_samples), **{step: _summary(samples) for step, samples in by_step.items()}},
+        "errors": dict(errors),
+        "sample_errors": sorted({analyst.last_error for analyst in analysts if analyst.last_error})[:5],
+        "lock_waits": locks_after["lock_waits"] - locks_before["lock_waits"],
+        "lock_wait_time_s": round(locks_after["lock_wait_time_s"] - locks_before["lock_wait_time_s"], 3),
+        "failed_writes": locks_after["failed_writes"] - locks_before["failed_writes"],
+        "pool": db.pool_stats(),
+        "memory": {
+            "rss_before_mb": round(rss_before / 1024 / 1024, 1),
+            "rss_peak_mb": round(rss_peak / 1024 / 1024, 1),
+            "rss_after_mb": round(rss_after / 1024 / 1024, 1),
+            "per_session_mb": round((rss_after - rss_before) / sessions / 1024 / 1024, 2),
+        },
+    }
+
+
+def print_report(report: dict) -> None:
+    print("=" * 72)
+    print(f"{report['sessions']} sessions x {report['iterations']} iterations in {report['elapsed_s']}s")
+    print("=" * 72)
+    print(f"  throughput     : {report['reruns_per_s']} reruns/s, {report['scenarios_per_s']} scenarios/s")
+    print(f"  {'step':<14} {'reruns':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for step, s in report["latency"].items():
+        print(f"  {step:<14} {s['reruns']:>7} {s['p50_ms']:>9} {s['p95_ms']:>9} {s['p99_ms']:>9} {s['max_ms']:>9}")
+    print(f"  lock waits     : {report['lock_waits']} ({report['lock_wait_time_s']}s), failed writes {report['failed_writes']}")
+    print(f"  pool           : {report['pool']}")
+    memory = report["memory"]
+    print(f"  memory         : {memory['rss_before_mb']} -> {memory['rss_after_mb']} MB (peak {memory['rss_peak_mb']} MB), "
+          f"{memory['per_session_mb']} MB per session")
+    if report["errors"]:
+        print(f"  errors         : {report['errors']}")
+        for error in report["sample_errors"]:
+            print(f"    {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive N concurrent headless sessions through the dashboards")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=3, help="scenario repetitions per session after login")
+    parser.add_argument("--scale", choices=SCALES, default="10k")
+    parser.add_argument("--rows", type=int, help="explicit row count, overrides --scale")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--ai-latency", type=float, default=0.5, help="seconds the stub Gemini client takes per answer")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds one rerun may take before it fails")
+    parser.add_argument("--workdir", help="keep the generated database here (default: a temporary folder)")
+    parser.add_argument("--output", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    rows = args.rows or SCALES[args.scale]
+    if table_sizes(rows)["users"] < args.sessions:
+        sys.exit(f"{rows:,} rows only generate {table_sizes(rows)['users']} users - use a larger scale or fewer sessions")
+    output = Path(args.output).resolve() if args.output else None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(args.workdir or tmp).resolve()
+        if not (workdir / DB_PATH).exists():
+            print(f"Generating {rows:,} rows (seed {args.seed}) in {workdir}")
+            generate_database(workdir / DB_PATH, rows, args.seed)
+        # Home.py and the pages open the relative DATA/ path, so run from the folder that holds the generated database
+        os.chdir(workdir)
+
+        ai_client = StubGeminiClient(args.ai_latency)
+        install_stub_ai_client(ai_client)
+        started_at = datetime.now(timezone.utc)
+        try:
+            report = run_load_test(args.sessions, args.iterations, args.timeout)
+        except Exception:
+            traceback.print_exc()
+            sys.exit(1)
+        report["ai_calls"] = ai_client.calls
+        report["rows"] = rows
+        report["started_at"] = started_at.isoformat()
+        resources.get_database().close()
+
+    print_report(report)
+    if output is not None:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {output}")
+
+
+if __name__ == "__main__":
+    main()
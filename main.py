@@ -1,7 +1,7 @@
 from app.data.db import connect_database
-from app.data.schema import create_all_tables
+from app.data.schema import create_all_tables, run_migrations, check_analytical_query_plans, check_rollups, rebuild_rollups
 from app.services.user_service import  register_user,login_user,migrate_users_from_file
-from app.services.loadCSV import load_csv_to_table
+from app.services.loadCSV import stream_csv_to_table
 from app.data.incidents import insert_incident, update_incident_status, delete_incident, get_incident_by_id
 from app.services.analyticalQueries import get_incidents_by_type_count, get_high_severity_by_status
 import pandas as pd
@@ -24,20 +24,36 @@ def main():
     print("\n[2/] Creating database tables...")
     create_all_tables(conn)
 
+    # Step 2b: Apply schema migrations (indexes) and check the analytical query plans
+    print("\n[2b/] Applying schema migrations...")
+    version = run_migrations(conn)
+    print(f"       Schema at version {version}")
+    check_analytical_query_plans(conn)
+    print("       No full table scans in the analytical queries")
+
     # Step 3: Migrate users
     print("\n[3/] Migrating users from users.txt...")
-    user_count = migrate_users_from_file(conn)
-    print(f"       Migrated {user_count} users")
+    user_counts = migrate_users_from_file(conn)
+    print(f"       Migrated {user_counts['migrated']} users "
+          f"({user_counts['skipped']} skipped, {user_counts['errors']} errors)")
 
     # Step 4: Load CSV data
     print("\n[4/] Loading CSV data for cyber incidents...")
-    total_rows_cyber = load_csv_to_table(conn, "DATA/cyber_incidents.csv", "cyber_incidents")
+    total_rows_cyber = stream_csv_to_table(conn, "DATA/cyber_incidents.csv", "cyber_incidents")
     
     print("\n[5/] Loading CSV data for IT tickets...")
-    total_rows_tickets = load_csv_to_table(conn, "DATA/it_tickets.csv", "it_tickets")
+    total_rows_tickets = stream_csv_to_table(conn, "DATA/it_tickets.csv", "it_tickets")
 
     print("\n[6/] Loading CSV data for Datasets Metadata...")
-    total_rows_datasets = load_csv_to_table(conn, "DATA/datasets_metadata.csv", "datasets_metadata")
+    total_rows_datasets = stream_csv_to_table(conn, "DATA/datasets_metadata.csv", "datasets_metadata")
+
+    print("\n[7/] Checking rollup tables against a full recompute...")
+    mismatches = check_rollups(conn)
+    if mismatches:
+        print(f"       Rollups out of date: {', '.join(mismatches)} - rebuilding")
+        rebuild_rollups(conn)
+    else:
+        print("       Rollups consistent")
 
     print("\n" + "="*60)
     print(" DATABASE SETUP COMPLETE!")
@@ -1,5 +1,9 @@
 from datetime import datetime
 
+import pandas as pd
+
+from models.record_utils import rows_to_frame, require_columns, clean_text, coerce_timestamps, coerce_integers, frame_to_records, fetch_by_ids, fetch_where, rows_frame
+
 class Dataset:
 
     '''
@@ -9,6 +13,12 @@ class Dataset:
 
     '''
 
+    # Table columns in constructor order - used by the batch loaders
+    COLUMNS = ["dataset_id", "name", "rows", "columns", "uploaded_by", "upload_date"]
+
+    # No per-object __dict__ - the private names are mangled like the attributes below
+    __slots__ = ("__id", "__name", "__rows", "__columns", "__uploaded_by", "__upload_date")
+
     def __init__(self, dataset_id, name, rows, columns, uploaded_by=None, upload_date=None):
         '''
         Constructor to initialise a Dataset object
@@ -74,6 +84,38 @@ class Dataset:
         )
 
 
+    '''
+    Batch loaders - one round trip instead of one load_by_id per object
+    -> as_frame=True returns a DataFrame built straight from the cursor rows
+
+    '''
+    @classmethod
+    def load_many(cls, db, ids, as_frame=False):
+        '''
+        Loads the datasets with the given IDs (ascending ID order, missing IDs skipped, IDs sent in chunks)
+        '''
+        rows = fetch_by_ids(db, "datasets_metadata", cls.COLUMNS, "dataset_id", ids)
+        return rows_frame(rows, cls.COLUMNS) if as_frame else [cls(*row) for row in rows]
+
+    @classmethod
+    def load_where(cls, db, filters=None, order=None, limit=None, offset=None, as_frame=False):
+        '''
+        Loads the datasets matching filters e.g. {"uploaded_by": "data_scientist", "rows": (">", 1000)}
+        '''
+        rows = fetch_where(db, "datasets_metadata", cls.COLUMNS, filters, order, limit, offset)
+        return rows_frame(rows, cls.COLUMNS) if as_frame else [cls(*row) for row in rows]
+
+    @classmethod
+    def to_frame(cls, datasets):
+        '''
+        DataFrame (one column per table column) from a list of Dataset objects
+        '''
+        return rows_frame((dataset._as_row() for dataset in datasets), cls.COLUMNS)
+
+    def _as_row(self) -> tuple:
+        return (self.__id, self.__name, self.__rows, self.__columns, self.__uploaded_by, self.__upload_date)
+
+
     '''
     Function to update the name of a dataset
 
@@ -130,3 +172,32 @@ class Dataset:
         sql = "DELETE FROM datasets_metadata WHERE dataset_id = ?"
         cur = db.execute_query(sql, (self.__id,))
         return cur.rowcount > 0
+
+
+    '''
+    Insert many datasets in one transaction - returns (inserted, skipped)
+    -> rows is a DataFrame (CSV upload) or an iterable of dicts/tuples with the columns below
+    -> Rows missing name/rows/columns/uploaded_by are skipped (NOT NULL columns)
+
+    '''
+    @classmethod
+    def bulk_insert(cls, db, rows, progress=None):
+        df = rows_to_frame(rows, ["name", "rows", "columns", "uploaded_by", "upload_date"])
+        require_columns(df, ["name", "rows", "columns", "uploaded_by"])
+
+        records = pd.DataFrame({
+            "name": clean_text(df, "name"),
+            "rows": coerce_integers(df, "rows"),
+            "columns": coerce_integers(df, "columns"),
+            "uploaded_by": clean_text(df, "uploaded_by"),
+            "upload_date": coerce_timestamps(df, "upload_date", fmt="%Y-%m-%d"),
+        })
+        valid = records[["name", "rows", "columns", "uploaded_by"]].notna().all(axis=1)
+
+        sql = """
+            INSERT INTO datasets_metadata
+            (name, rows, columns, uploaded_by, upload_date)
+            VALUES (?, ?, ?, ?, ?)
+        """
+        inserted = db.execute_many(sql, frame_to_records(records[valid]), progress=progress)
+        return inserted, int((~valid).sum())
@@ -0,0 +1,207 @@
+from datetime import datetime
+
+import pandas as pd
+
+'''
+    Helpers shared by the model classes for working with many rows at once
+    -> Turning uploaded rows into a DataFrame and validating/coercing whole columns
+    -> Turning a DataFrame back into plain tuples for executemany
+
+'''
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def rows_to_frame(rows, columns) -> pd.DataFrame:
+    '''
+    Accepts a DataFrame, an iterable of dicts or an iterable of tuples in `columns` order
+    '''
+    if isinstance(rows, pd.DataFrame):
+        return rows.copy()
+    rows = list(rows)
+    if rows and isinstance(rows[0], dict):
+        return pd.DataFrame.from_records(rows)
+    return pd.DataFrame.from_records(rows, columns=columns)
+
+
+def require_columns(df: pd.DataFrame, required) -> None:
+    '''
+    Raises ValueError if any required column is missing from the upload
+    '''
+    missing = [c for c in required if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required column(s) : {', '.join(missing)}")
+
+
+def clean_text(df: pd.DataFrame, column: str, default=None) -> pd.Series:
+    '''
+    Column as stripped strings, blanks become missing (or the default)
+    '''
+    if column not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    values = df[column].astype("string").str.strip()
+    values = values.mask(values == "")
+    if default is not None:
+        values = values.fillna(default)
+    return values.astype(object)
+
+
+def coerce_timestamps(df: pd.DataFrame, column: str, fmt: str = TIMESTAMP_FORMAT) -> pd.Series:
+    '''
+    Parse a whole column of dates at once - unparseable or missing values become the current time
+    '''
+    if column in df.columns:
+        parsed = pd.to_datetime(df[column], errors="coerce", format="mixed")
+    else:
+        parsed = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    parsed = parsed.fillna(pd.Timestamp(datetime.now()))
+    return parsed.dt.strftime(fmt)
+
+
+def coerce_integers(df: pd.DataFrame, column: str) -> pd.Series:
+    '''
+    Whole column to nullable integers - anything that is not a number becomes missing
+    '''
+    if column not in df.columns:
+        return pd.Series(pd.NA, index=df.index, dtype="Int64")
+    return pd.to_numeric(df[column], errors="coerce").round().astype("Int64")
+
+
+def frame_to_records(df: pd.DataFrame) -> list[tuple]:
+    '''
+    Plain Python tuples with None for missing values, ready for executemany
+    '''
+    values = df.astype(object).where(df.notna(), None)
+    return list(values.itertuples(index=False, name=None))
+
+
+# SQLite's default limit on ? placeholders in one statement is 999 (older builds) - stay under it
+MAX_SQL_VARIABLES = 900
+
+
+def chunked(values, size: int = MAX_SQL_VARIABLES):
+    '''
+    Yield successive lists of at most `size` values
+    '''
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def build_where(filters, allowed_columns) -> tuple[str, list]:
+    '''
+    Turn {column: value} into a WHERE clause with placeholders
+
+    -> value None        -> column IS NULL
+    -> list/tuple/set    -> column IN (...)
+    -> (op, value) tuple with op in >, >=, <, <=, !=, LIKE -> column op ?
+    -> ("BETWEEN", (low, high))  -> column BETWEEN ? AND ?
+    -> ("RANGE", (low, high))    -> column >= ? AND column < ? (half-open)
+    -> anything else     -> column = ?
+    Only columns in allowed_columns may be filtered on (column names cannot be parameterised)
+    '''
+    clauses, params = [], []
+    for name, value in (filters or {}).items():
+        if name not in allowed_columns:
+            raise ValueError(f"Cannot filter on column '{name}'")
+        if value is None:
+            clauses.append(f"{name} IS NULL")
+        elif isinstance(value, tuple) and len(value) == 2 and value[0] == "BETWEEN":
+            clauses.append(f"{name} BETWEEN ? AND ?")
+            params.extend(value[1])
+        elif isinstance(value, tuple) and len(value) == 2 and value[0] == "RANGE":
+            clauses.append(f"{name} >= ? AND {name} < ?")
+            params.extend(value[1])
+        elif isinstance(value, tuple) and len(value) == 2 and value[0] in (">", ">=", "<", "<=", "!=", "LIKE"):
+            clauses.append(f"{name} {value[0]} ?")
+            params.append(value[1])
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            value = list(value)
+            if len(value) > MAX_SQL_VARIABLES:
+                raise ValueError(f"Too many values for '{name}' (max {MAX_SQL_VARIABLES})")
+            if not value:
+                clauses.append("0")
+            else:
+                clauses.append(f"{name} IN ({', '.join('?' for _ in value)})")
+                params.extend(value)
+        else:
+            clauses.append(f"{name} = ?")
+            params.append(value)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def build_order(order, allowed_columns) -> str:
+    '''
+    Turn "column", "column DESC" or a list of those into an ORDER BY clause
+    '''
+    if not order:
+        return ""
+    parts = []
+    for item in ([order] if isinstance(order, str) else order):
+        pieces = item.split()
+        column = pieces[0]
+        direction = pieces[1].upper() if len(pieces) > 1 else "ASC"
+        if column not in allowed_columns or direction not in ("ASC", "DESC") or len(pieces) > 2:
+            raise ValueError(f"Cannot order by '{item}'")
+        parts.append(f"{column} {direction}")
+    return " ORDER BY " + ", ".join(parts)
+
+
+def fetch_by_ids(db, table: str, columns, id_column: str, ids) -> list[tuple]:
+    '''
+    Rows for many ids, in ascending id order - one query per chunk of ids
+    '''
+    ids = sorted({i for i in ids if i is not None})
+    select = f"SELECT {', '.join(columns)} FROM {table} WHERE {id_column} IN "
+    rows = []
+    for chunk in chunked(ids):
+        placeholders = ", ".join("?" for _ in chunk)
+        rows.extend(db.fetch_all(f"{select}({placeholders}) ORDER BY {id_column}", chunk))
+    return rows
+
+
+def fetch_where(db, table: str, columns, filters=None, order=None, limit=None, offset=None) -> list[tuple]:
+    '''
+    Rows matching the filters in one query, with optional ORDER BY / LIMIT / OFFSET
+    '''
+    where, params = build_where(filters, columns)
+    sql = f"SELECT {', '.join(columns)} FROM {table}{where}{build_order(order, columns)}"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+        if offset:
+            sql += " OFFSET ?"
+            params.append(int(offset))
+    elif offset:
+        sql += " LIMIT -1 OFFSET ?"
+        params.append(int(offset))
+    return db.fetch_all(sql, params)
+
+
+def fetch_page(db, table: str, columns, id_column: str, filters=None, after_id=None, limit: int = 50):
+    '''
+    One page of rows matching the filters, in id order, using keyset pagination
+    -> Rows come from a seek on id > after_id, so late pages cost the same as the first
+    -> SQLite picks the index for the filters - an equality filter on (severity, status) or
+       (priority, status) reads that index already in id order, a date range uses the timestamp index
+    -> Returns (rows, next_after_id) - next_after_id is None on the last page
+    '''
+    where, params = build_where(filters, columns)
+    if after_id is not None:
+        where += f"{' AND' if where else ' WHERE'} {id_column} > ?"
+        params.append(after_id)
+    sql = f"SELECT {', '.join(columns)} FROM {table}{where} ORDER BY {id_column} LIMIT ?"
+    # One extra row tells whether there is another page
+    params.append(int(limit) + 1)
+    rows = db.fetch_all(sql, params)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1][columns.index(id_column)]
+    return rows, None
+
+
+def rows_frame(rows, columns) -> pd.DataFrame:
+    '''
+    DataFrame built straight from cursor rows - no model objects in between
+    '''
+    return pd.DataFrame.from_records(rows, columns=list(columns))
@@ -1,5 +1,9 @@
 from datetime import datetime
 
+import pandas as pd
+
+from models.record_utils import rows_to_frame, require_columns, clean_text, coerce_timestamps, frame_to_records, fetch_by_ids, fetch_where, fetch_page, rows_frame
+
 '''
     Class represents an Incident entity stored in the database
     -> Uses encapsulation to keep data secured using the '__' before attributes
@@ -9,6 +13,12 @@ from datetime import datetime
 
 class SecurityIncident :
 
+    # Table columns in constructor order - used by the batch loaders
+    COLUMNS = ["incident_id", "category", "severity", "status", "description", "reported_by", "timestamp"]
+
+    # No per-object __dict__ - the private names are mangled like the attributes below
+    __slots__ = ("__id", "__incident_type", "__severity", "__status", "__description", "__reported_by", "__timestamp")
+
     def __init__(self, incident_id, incident_type, severity, status, description,reported_by=None, timestamp=None):
 
         '''
@@ -61,7 +71,8 @@ class SecurityIncident :
                 
 
         sql = """
-            SELECT * FROM cyber_incidents
+            SELECT incident_id, category, severity, status, description, reported_by, timestamp
+            FROM cyber_incidents
             WHERE incident_id = ?
 
         """
@@ -79,6 +90,53 @@ class SecurityIncident :
             timestamp=row[6]
         )
     
+    '''
+    Batch loaders - one round trip instead of one load_by_id per object
+    -> as_frame=True returns a DataFrame built straight from the cursor rows
+
+    '''
+    @classmethod
+    def load_many(cls, db, ids, as_frame=False):
+        """
+        Load the incidents with the given IDs (in ascending ID order, missing IDs are skipped).
+        IDs are sent in chunks so SQLite's placeholder limit is never exceeded.
+
+        """
+        rows = fetch_by_ids(db, "cyber_incidents", cls.COLUMNS, "incident_id", ids)
+        return rows_frame(rows, cls.COLUMNS) if as_frame else [cls(*row) for row in rows]
+
+    @classmethod
+    def load_where(cls, db, filters=None, order=None, limit=None, offset=None, as_frame=False):
+        """
+        Load the incidents matching filters e.g. {"severity": "High", "status": ["Open", "In Progress"]}
+        order is a column name with optional ASC/DESC e.g. "timestamp DESC"
+
+        """
+        rows = fetch_where(db, "cyber_incidents", cls.COLUMNS, filters, order, limit, offset)
+        return rows_frame(rows, cls.COLUMNS) if as_frame else [cls(*row) for row in rows]
+
+    @classmethod
+    def load_page(cls, db, filters=None, after_id=None, limit=50, as_frame=False):
+        """
+        One page of incidents matching filters, ordered by incident_id, starting after after_id
+        Returns (incidents, next_after_id) - pass next_after_id back in to get the following page
+
+        """
+        rows, next_after_id = fetch_page(db, "cyber_incidents", cls.COLUMNS, "incident_id", filters, after_id, limit)
+        return (rows_frame(rows, cls.COLUMNS) if as_frame else [cls(*row) for row in rows]), next_after_id
+
+    @classmethod
+    def to_frame(cls, incidents):
+        """
+        DataFrame (one column per table column) from a list of incident objects
+
+        """
+        return rows_frame((incident._as_row() for incident in incidents), cls.COLUMNS)
+
+    def _as_row(self) -> tuple:
+        return (self.__id, self.__incident_type, self.__severity, self.__status,
+                self.__description, self.__reported_by, self.__timestamp)
+
     '''
 
     Method to update the status of an incident
@@ -133,4 +191,34 @@ class SecurityIncident :
         sql = "DELETE FROM cyber_incidents WHERE incident_id = ?"
         cur = db.execute_query(sql, (self.__id,))
 
-        return cur.rowcount > 0
\ No newline at end of file
+        return cur.rowcount > 0
+
+
+    '''
+    Insert many incidents in one transaction - returns (inserted, skipped)
+    -> rows is a DataFrame (CSV upload) or an iterable of dicts/tuples with the columns below
+    -> Rows missing severity/category/status are skipped (NOT NULL columns)
+
+    '''
+    @classmethod
+    def bulk_insert(cls, db, rows, progress=None):
+        df = rows_to_frame(rows, ["timestamp", "severity", "category", "status", "description", "reported_by"])
+        require_columns(df, ["severity", "category", "status"])
+
+        records = pd.DataFrame({
+            "timestamp": coerce_timestamps(df, "timestamp"),
+            "severity": clean_text(df, "severity"),
+            "category": clean_text(df, "category"),
+            "status": clean_text(df, "status"),
+            "description": clean_text(df, "description"),
+            "reported_by": clean_text(df, "reported_by"),
+        })
+        valid = records[["severity", "category", "status"]].notna().all(axis=1)
+
+        sql = """
+            INSERT INTO cyber_incidents
+            (timestamp, severity, category, status, description, reported_by)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """
+        inserted = db.execute_many(sql, frame_to_records(records[valid]), progress=progress)
+        return inserted, int((~valid).sum())
\ No newline at end of file
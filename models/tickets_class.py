@@ -1,5 +1,9 @@
 from datetime import datetime
 
+import pandas as pd
+
+from models.record_utils import rows_to_frame, require_columns, clean_text, coerce_timestamps, coerce_integers, frame_to_records, fetch_by_ids, fetch_where, fetch_page, rows_frame
+
 '''
     Class represents a Ticket entity stored in the database
     -> Uses encapsulation to keep data secured using the '__' before attributes
@@ -10,6 +14,12 @@ from datetime import datetime
 
 class IT_Ticket:
 
+    # Table columns in constructor order - used by the batch loaders
+    COLUMNS = ["ticket_id", "priority", "description", "status", "assigned_to", "resolution_time_hours", "created_at"]
+
+    # No per-object __dict__ - the private names are mangled like the attributes below
+    __slots__ = ("__id", "__priority", "__description", "__status", "__assigned_to", "__resolution_time_hours", "__created_at")
+
     def __init__(self, ticket_id, priority, description, status, assigned_to=None, resolution_time_hours=None, created_at=None):
 
         '''
@@ -83,6 +93,47 @@ class IT_Ticket:
         )
 
 
+    '''
+    Batch loaders - one round trip instead of one load_by_id per object
+    -> as_frame=True returns a DataFrame built straight from the cursor rows
+
+    '''
+    @classmethod
+    def load_many(cls, db, ids, as_frame=False):
+        '''
+        Loads the tickets with the given IDs (ascending ID order, missing IDs skipped, IDs sent in chunks)
+        '''
+        rows = fetch_by_ids(db, "it_tickets", cls.COLUMNS, "ticket_id", ids)
+        return rows_frame(rows, cls.COLUMNS) if as_frame else [cls(*row) for row in rows]
+
+    @classmethod
+    def load_where(cls, db, filters=None, order=None, limit=None, offset=None, as_frame=False):
+        '''
+        Loads the tickets matching filters e.g. {"priority": "High", "assigned_to": ["IT_Support_A"]}
+        '''
+        rows = fetch_where(db, "it_tickets", cls.COLUMNS, filters, order, limit, offset)
+        return rows_frame(rows, cls.COLUMNS) if as_frame else [cls(*row) for row in rows]
+
+    @classmethod
+    def load_page(cls, db, filters=None, after_id=None, limit=50, as_frame=False):
+        '''
+        One page of tickets ordered by ticket_id, starting after after_id -> (tickets, next_after_id)
+        '''
+        rows, next_after_id = fetch_page(db, "it_tickets", cls.COLUMNS, "ticket_id", filters, after_id, limit)
+        return (rows_frame(rows, cls.COLUMNS) if as_frame else [cls(*row) for row in rows]), next_after_id
+
+    @classmethod
+    def to_frame(cls, tickets):
+        '''
+        DataFrame (one column per table column) from a list of ticket objects
+        '''
+        return rows_frame((ticket._as_row() for ticket in tickets), cls.COLUMNS)
+
+    def _as_row(self):
+        return (self.__id, self.__priority, self.__description, self.__status,
+                self.__assigned_to, self.__resolution_time_hours, self.__created_at)
+
+
     # Update the status of a ticket in the database
     def update_status(self, db, status):
         self.__status = status
@@ -120,3 +171,33 @@ class IT_Ticket:
         sql = "DELETE FROM it_tickets WHERE ticket_id = ?"
         cur = db.execute_query(sql, (self.__id,))
         return cur.rowcount > 0
+
+
+    '''
+    Insert many tickets in one transaction - returns (inserted, skipped)
+    -> rows is a DataFrame (CSV upload) or an iterable of dicts/tuples with the columns below
+    -> Rows missing priority/description/status/assigned_to are skipped (NOT NULL columns)
+
+    '''
+    @classmethod
+    def bulk_insert(cls, db, rows, progress=None):
+        df = rows_to_frame(rows, ["priority", "description", "status", "assigned_to", "created_at", "resolution_time_hours"])
+        require_columns(df, ["priority", "description", "status"])
+
+        records = pd.DataFrame({
+            "priority": clean_text(df, "priority"),
+            "description": clean_text(df, "description"),
+            "status": clean_text(df, "status"),
+            "assigned_to": clean_text(df, "assigned_to"),
+            "created_at": coerce_timestamps(df, "created_at"),
+            "resolution_time_hours": coerce_integers(df, "resolution_time_hours"),
+        })
+        valid = records[["priority", "description", "status", "assigned_to"]].notna().all(axis=1)
+
+        sql = """
+            INSERT INTO it_tickets
+            (priority, description, status, assigned_to, created_at, resolution_time_hours)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """
+        inserted = db.execute_many(sql, frame_to_records(records[valid]), progress=progress)
+        return inserted, int((~valid).sum())
@@ -2,25 +2,23 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from datetime import datetime
-from app.services.analyticalQueries import  get_high_severity_by_status, get_incident_types_with_many_cases, get_high_severity_incidents
+from app.services.analyticalQueries import get_incident_dashboard_summary, get_incident_trend
 import time
 
 
-from google import genai
-from google.genai import types
 
 
-# Get the API key
-client_incident= genai.Client(api_key=st.secrets["GEMINI_API_KEY"])
+# Import the shared resources (database and AI client) and SecurityIncident class
 
-
-# Import Database manager and SecurityIncident class
-
-from app.advanced_services.database_manager import DatabaseManager
+from app.advanced_services.resources import get_database, get_ai_client, get_ai_cache
+from app.services.session import restore_session, end_session
+from app.services.profiling import page_profile, render_profile
+from app.services.record_picker import record_picker, incident_filters, search_box
+from app.data.incidents import search_incidents
 from models.security_incident import SecurityIncident
 
-db = DatabaseManager("DATA/intelligence_platform.db")
-db.connect()
+# One DatabaseManager shared by every session - not reconnected on each rerun
+db = get_database()
 
 # set page title
 st.set_page_config(
@@ -28,73 +26,34 @@ st.set_page_config(
     layout="wide",
 )
 
+# Times each section of this run when profiling is on (?profile=1)
+profile = page_profile("Cybersecurity")
+
 st.title("CYBERSECURITY INTELLIGENCE DASHBOARD")
 
+profile.start("Session restore")
 # Show this message if the user is not yet logged in and tries to access this page
-if st.session_state.get("logged_in") != True:
+if restore_session() != True:
     st.error("Please Log in to access the Cybersecurity Page !")
     if st.button("Return to Home Page"):
      st.switch_page("Home.py")
     st.stop()
 
-# Load incidents from database and converts them to SecurityIncident objects
-
-def load_incidents() -> list[SecurityIncident]:
-    rows = db.fetch_all(
-        "SELECT incident_id, category, severity, status, description, reported_by, timestamp "
-        "FROM cyber_incidents"
-    )
-    incidents_list: list[SecurityIncident] = []
-    for row in rows:
-        incident = SecurityIncident(
-            incident_id=row[0],
-            incident_type=row[1],
-            severity=row[2],
-            status=row[3],
-            description=row[4],
-            reported_by=row[5],
-            timestamp=row[6] if row[6] else datetime.now()
-        )
-        incidents_list.append(incident)
-    return incidents_list
-
-# This get all the incident objects
-incidents = load_incidents()
-
-# Incidents are converted from objects to dataframes to be displayed as charts and graphs
-
-df_incidents = pd.DataFrame([{
-    "incident_id": i.get_id(),
-    "category": i.get_incident_type(),
-    "severity": i.get_severity(),
-    "status": i.get_status(),
-    "description": i.get_description(),
-    "reported_by": i.get_reported_by(),
-    "timestamp": i.get_timestamp()
-} for i in incidents])
-
-# Convert the timestamp column to datetime objects
-df_incidents['timestamp'] = pd.to_datetime(df_incidents['timestamp'], errors='coerce')
+profile.start("Data load")
+ # All KPIs and group-bys for this page come from one pass over cyber_incidents
+summary = get_incident_dashboard_summary(db, min_count=5)
 
-
-
-# filter phishing related incidents
-df_phishing = df_incidents[
-    df_incidents['category'].str.contains('Phishing', case=False, na=False)
-]
-
-# Weekly phishing trends
+# Weekly phishing trend read from the pre-aggregated weekly buckets (weeks start on Monday)
+# -> same categories as the phishing KPI below
 phishing_trend = (
-    df_phishing
-    .set_index('timestamp') # Use 'timestamp' for the index
-    .resample('W')['category'] # Resample by Week ('W') and count
-    .count()
+    get_incident_trend(db, "category", summary.phishing_categories, "week")
+    .set_index('bucket')['count']
     .rename('Incidents Count')
 )
 
  # To display metric for the incidents
-current_total_incidents = len(df_incidents)
-total_phishing = len(df_phishing)
+current_total_incidents = summary.total
+total_phishing = summary.phishing
 current_phishing_percentage = (total_phishing / current_total_incidents * 100) if current_total_incidents > 0 else 0
 
  # Initialize previous values in session state if not present
@@ -111,11 +70,11 @@ phishing_percent_delta = current_phishing_percentage - st.session_state.previous
 phishing_percent_delta_str = f"{phishing_percent_delta:.1f}%"
 
 
-# Get high severity incidents + find total
+# Get total of high severity incidents
 
-high_severity= get_high_severity_incidents(db)
-total_high_severity= len(high_severity)
+total_high_severity= summary.high_severity
 
+profile.start("KPI metrics")
 # Display insights
 
 st.subheader("Cyber Incidents Insights")
@@ -133,6 +92,7 @@ with middle:
         value=f"{total_high_severity:,}",
     ) 
 
+profile.start("Phishing trend chart")
 # To display Phishing Incidents from the table in first half of the web page
 st.subheader("Phishing Threats Analysis")
     
@@ -154,8 +114,8 @@ with col2:
 st.session_state.previous_total_incidents = current_total_incidents
 st.session_state.previous_phishing_percentage = current_phishing_percentage
 
-status_counts = df_incidents["status"].value_counts().reset_index()
-status_counts.columns = ["status", "count"]
+profile.start("Status bar chart")
+status_counts = summary.by_status
 
 col1,col2= st.columns([0.6,0.4])
 
@@ -167,6 +127,7 @@ with col1:
    
 
 
+profile.start("Status pie chart")
 with col2:
 
     # Display Cyber Incidents Status Summary In Pie Chart 
@@ -212,9 +173,9 @@ with col2:
 
 
 
-# get the required queries to display the required visuals
-# Pass the Database Manager db connection
-df_many_cases = get_incident_types_with_many_cases(db, min_count=5)
+profile.start("Top categories chart")
+# get the required group-bys from the page summary to display the required visuals
+df_many_cases = summary.categories_with_many_cases
 col1,col2= st.columns([0.9,0.1])
 with col1:
     st.markdown("### Top Incident Categories by Volume")
@@ -242,8 +203,9 @@ with col1:
             st.info(f"No incident types found with more than minimum number of cases.")
 
 
-# get high severity by status query
-df_high_sev_status = get_high_severity_by_status(db)
+profile.start("High severity chart")
+# get high severity by status from the page summary
+df_high_sev_status = summary.high_severity_by_status
 
 # Display Cyber Incidents Bar Chart by Severity
 col1,col2= st.columns([0.6,0.4])
@@ -282,11 +244,14 @@ with col1:
     st.plotly_chart(fig, width= "stretch")
 
 
+profile.start("Search")
+# Full-text search over incident descriptions (FTS5 index, ranked, one page at a time)
+st.subheader("🔍 Search Incidents")
+search_box("incident_search", search_incidents)
 
-    
-# Get all incident ids for the update form
-all_incident_ids = [i.get_id() for i in incidents]
+st.markdown("---")
 
+profile.start("Management forms")
 st.subheader("Cyber Incidents Management")
 col1,col2= st.columns([0.8,0.2])
 with col1:
@@ -329,11 +294,16 @@ with col1:
     elif action_choice == " Update Status":
         # Update status form
         st.markdown("### Update Incident Status")
+        # Pick the incident from a filtered, paginated list (one page of rows at a time)
+        picked = record_picker("update_incident", db, SecurityIncident, incident_filters("update_incident"),
+                               ["category", "severity", "status"], label="Incident ID")
+        incident_id = int(picked["incident_id"]) if picked is not None else None
         with st.form("Update incident status"):
-            incident_id = st.selectbox("Incident ID", all_incident_ids)
             new_status = st.selectbox("New Status", ["Open", "Closed", "In Progress","Resolved"])
             updated = st.form_submit_button("Update Status")
-        if updated:
+        if updated and incident_id is None:
+            st.error("Select an incident to update")
+        elif updated:
             try:
                 # Fetch the incident object from the database
                 incident_fetched = SecurityIncident.load_by_id(db, incident_id)
@@ -352,12 +322,14 @@ with col1:
     elif action_choice == "Delete Incident":
         # Delete Incident option
         st.markdown("### Delete Cyber Incident")
+        picked = record_picker("delete_incident", db, SecurityIncident, incident_filters("delete_incident"),
+                               ["category", "severity", "status"], label="Incident ID to Delete")
+        incident_id = int(picked["incident_id"]) if picked is not None else None
         with st.form("Delete incident"):
-            incident_id= st.selectbox("Incident ID to Delete", all_incident_ids, key="delete_incident_id")
             
             submitted= st.form_submit_button("Delete Incident")
 
-            if submitted:
+            if submitted and incident_id is not None:
                 if st.checkbox("Confirm deletion of incident"):  
                     # Load incident from database              
                     deleted_incident = SecurityIncident.load_by_id(db, incident_id)
@@ -405,21 +377,17 @@ with col1:
 
             if st.button("Upload CSV"):
 
-                # Insert CSV records into the database
-
-                for _, row in csv_df.iterrows():
-                    incident_csv = SecurityIncident(
-                        incident_id=None,                        
-                        incident_type=row["category"],
-                        severity=row["severity"],
-                        status=row["status"],
-                        description=row["description"],
-                        reported_by=row.get("reported_by", None),
-                        timestamp=row.get("timestamp", None)
-                    )
-                    incident_csv.insert(db)
-
-                st.success("CSV data added successfully!")
+                # Insert all CSV records into the database in one transaction
+                progress_bar = st.progress(0.0, text="Uploading incidents...")
+                inserted, skipped = SecurityIncident.bulk_insert(
+                    db,
+                    csv_df,
+                    progress=lambda done, total: progress_bar.progress(done / total, text=f"Uploaded {done:,} of {total:,} incidents"),
+                )
+
+                if skipped:
+                    st.warning(f"⚠️ {skipped:,} rows skipped (missing severity, category or status)")
+                st.success(f"CSV data added successfully! ({inserted:,} incidents)")
                 time.sleep(2)
                 st.rerun()
           except Exception as e :
@@ -428,27 +396,17 @@ with col1:
             
 st.markdown("---")
 
+profile.start("AI analyser")
 col1,col2= st.columns([0.8,0.2])
 with col1:
     # AI Analyser for CyberIncidents
     st.subheader("🔎 AI Incidents Analyser")
 
-    if not df_incidents.empty :
-        incident_options = [
-            f"{row['incident_id']}: {row['category']} - {row['severity']}"
-            for index, row in df_incidents.iterrows()
-        ]
-
-        # Let the user pick an incident from the readable options list
-        selected_id = st.selectbox(
-            "Select Incident to analyse",
-            range(len(df_incidents)),
-            format_func=lambda id : incident_options[id]
-        )
-        
-
-        incident= df_incidents.iloc[selected_id]
+    # Let the user pick an incident from a filtered, paginated list - only one page of labels is built
+    incident = record_picker("analyse_incident", db, SecurityIncident, incident_filters("analyse_incident"),
+                             ["category", "severity"], label="Select Incident to analyse")
 
+    if incident is not None:
         # Display incident details
 
         st.subheader("ℹ️ Incident Details")
@@ -458,7 +416,7 @@ with col1:
         st.write(f"**Status:** {incident['status']}")
 
 
-    if st.button("Analyse with AI"):
+    if st.button("Analyse with AI") and incident is not None:
         with st.spinner("AI analysing incident..."):
             # Create the analysis prompt
             analysis_prompt= f""" Analyse this cybersecurity incident :
@@ -472,12 +430,13 @@ with col1:
                                 2. Threat intelligence lookup
                                 3. Security best practices
                                 4. Remediation recommendations """
-            # Call the Gemini API
-            response = client_incident.models.generate_content_stream(
+            # Replayed from the shared response cache if this prompt was analysed before -
+            # identical requests already in progress share one Gemini call
+            response = get_ai_cache().stream(
+                get_ai_client,
                 model="gemini-2.5-flash",
-                config=types.GenerateContentConfig(
-                    system_instruction="You are a cybersecurity expert.Analyse incidents, threats and vulnerabilities. Provide technical guidance using MITRE, ATT&CK,CVE references."),
-                contents={"role" : "user", "parts" : [{"text": analysis_prompt}]},
+                system_instruction="You are a cybersecurity expert.Analyse incidents, threats and vulnerabilities. Provide technical guidance using MITRE, ATT&CK,CVE references.",
+                prompt=analysis_prompt,
             )
 
 
@@ -486,16 +445,21 @@ with col1:
             st.subheader("🚀 AI Analysis")
             container= st.empty()
             full_reply= ""
-            for chunk in response:
-                full_reply+= chunk.text
+            for text in response:
+                full_reply+= text
                 container.markdown(full_reply)
+            if response.cached:
+                st.caption("⚡ Cached analysis")
+
+profile.stop()
 
 # Logout option in the sidebar
 if st.session_state.get("logged_in", False):
     
     if st.sidebar.button("Logout", key="logout_btn"):
-        st.session_state.logged_in = False
-        st.session_state.username = ""
-        st.session_state.show_login = False
-        st.session_state.show_register = False
-        st.rerun()
\ No newline at end of file
+        # Revokes the session token as well
+        end_session()
+        st.rerun()
+
+# Render profile in the sidebar (only when profiling is on - ?profile=1)
+render_profile(profile)
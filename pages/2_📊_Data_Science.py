@@ -1,18 +1,15 @@
 import streamlit as st
-from app.services.analyticalQueries import get_large_datasets, get_datasets_by_uploader, get_dataset_upload_trends_monthly
+from app.services.analyticalQueries import get_large_datasets, get_dataset_dashboard_summary, load_datasets_frame
 import plotly.express as px
 import pandas as pd
 from datetime import datetime
 import time
 
-from google import genai
-from google.genai import types
 
-# Get API key
-client_dataset= genai.Client(api_key=st.secrets["GEMINI_API_KEY"])
 
-
-from app.advanced_services.database_manager import DatabaseManager
+from app.advanced_services.resources import get_database, get_ai_client, get_ai_cache
+from app.services.session import restore_session, end_session
+from app.services.profiling import page_profile, render_profile
 from models.dataset_class import Dataset
 
 
@@ -22,10 +19,14 @@ st.set_page_config(
     layout="wide",
 )
 
+# Times each section of this run when profiling is on (?profile=1)
+profile = page_profile("Data Science")
+
 st.title("DATA SCIENCE ANALYTICS DASHBOARD")
 
+profile.start("Session restore")
 # Show this message if the user is not yet logged in and tries to access this page
-if st.session_state.get("logged_in") != True:
+if restore_session() != True:
     st.error("Please Log in to access the DataScience Page !")
 
     if st.button("Return to Home Page"):
@@ -33,48 +34,23 @@ if st.session_state.get("logged_in") != True:
     st.stop()
 
 
-db = DatabaseManager("DATA/intelligence_platform.db")
-db.connect()
-
-# Load datasets from database and converts them to Dataset objects
-
-def load_datasets() -> list[Dataset]:
-    rows = db.fetch_all(
-        "SELECT dataset_id, name, rows, columns, uploaded_by, upload_date FROM datasets_metadata"
-    )
-    datasets_list = []
-    for row in rows:
-        dataset = Dataset(
-            dataset_id=row[0],
-            name=row[1],
-            rows=row[2],
-            columns=row[3],
-            uploaded_by=row[4],
-            upload_date=row[5] if row[5] else datetime.now()
-        )
-        datasets_list.append(dataset)
-    return datasets_list
+db = get_database()
 
-# get all datasets
-datasets = load_datasets()
+profile.start("Data load")
+# get all datasets from the database as a dataframe in one query
+df_datasets = load_datasets_frame(db)
 
-# Datasets are converted from objects to dataframes to be displayed as charts and graphs
-df_datasets = pd.DataFrame([{
-    "dataset_id": d.get_id(),
-    "name": d.get_name(),
-    "rows": d.get_rows(),
-    "columns": d.get_columns(),
-    "uploaded_by": d.get_uploaded_by(),
-    "upload_date": d.get_upload_date()
-} for d in datasets])
 
+# All KPIs and group-bys for this page come from one pass over datasets_metadata
+summary = get_dataset_dashboard_summary(db, min_rows=1000)
 
-total_datasets= len(df_datasets)
+total_datasets= summary.total
 
 # get all large datasets
 df_large_datasets = get_large_datasets(db, min_rows=1000)
-large_datasets= len(df_large_datasets)
+large_datasets= summary.large_datasets
 
+profile.start("KPI metrics")
 # Insights for datasets
 st.subheader("Datasets Insights")
 left,middle,right = st.columns([1,1,1])
@@ -92,6 +68,7 @@ with middle:
 
 
 
+profile.start("Resource consumption chart")
 col1,col2= st.columns([0.9,0.1])
 with col1:
     st.markdown("### Datasets Resource Consumption Analysis")
@@ -117,9 +94,10 @@ with col1:
 
     st.plotly_chart(fig, width="stretch")
 
-# get all the required queries and db connection is passed to each of them
-df_datasets_by_uploader= get_datasets_by_uploader(db)
-df_dataset_upload_trends= get_dataset_upload_trends_monthly(db)
+profile.start("Uploader and trend charts")
+# get the required group-bys from the page summary
+df_datasets_by_uploader= summary.by_uploader
+df_dataset_upload_trends= summary.upload_trends_monthly
 col1,col2= st.columns([0.5,0.5])
 with col1:
     st.markdown("### Datasets Uploads by Users")
@@ -151,6 +129,7 @@ with col2:
 
 
 
+profile.start("Management forms")
 # Get all datsets ids as list for the update form
 all_datasets_ids= df_datasets['dataset_id'].tolist()
 
@@ -245,7 +224,7 @@ with col1:
             st.dataframe(csv_df)
             
             # Required columns for successful import
-            required_columns= {"dataset_id","name,rows","columns","uploaded_by","upload_date"}
+            required_columns= {"dataset_id","name","rows","columns","uploaded_by","upload_date"}
             csv_columns= set(csv_df.columns)
             
             # Identify missing and extra columns
@@ -264,25 +243,24 @@ with col1:
 
             if st.button("Upload CSV"):
 
-                # Insert CSV records into the database
-                for _, row in csv_df.iterrows():
-                        dataset = Dataset(
-                            dataset_id=None,
-                            name=row["name"],
-                            rows=row["rows"],
-                            columns=row["columns"],
-                            uploaded_by=row["uploaded_by"],
-                            upload_date=row.get("upload_date", datetime.now())
-                        )
-                        dataset.insert_dataset(db)
-                        
-                st.success("CSV data added successfully!")
+                # Insert all CSV records into the database in one transaction
+                progress_bar = st.progress(0.0, text="Uploading datasets...")
+                inserted, skipped = Dataset.bulk_insert(
+                    db,
+                    csv_df,
+                    progress=lambda done, total: progress_bar.progress(done / total, text=f"Uploaded {done:,} of {total:,} datasets"),
+                )
+
+                if skipped:
+                    st.warning(f"⚠️ {skipped:,} rows skipped (missing name, rows, columns or uploader)")
+                st.success(f"CSV data added successfully! ({inserted:,} datasets)")
                 time.sleep(2)
                 st.rerun()
           except Exception as e :
               st.error("Error reading the CSV file !")
 
 
+profile.start("AI analyser")
 st.markdown("---")
 col1,col2= st.columns([0.8,0.2])
 with col1:
@@ -328,12 +306,13 @@ with col1:
                                 2. Visualisation recommendations
                                 3. Statistical method guidance
                                 4. ML model suggestions """
-            # Call the Gemini API
-            response = client_dataset.models.generate_content_stream(
+            # Replayed from the shared response cache if this prompt was analysed before -
+            # identical requests already in progress share one Gemini call
+            response = get_ai_cache().stream(
+                get_ai_client,
                 model="gemini-2.5-flash",
-                config=types.GenerateContentConfig(
-                    system_instruction="You are a data science expert."),
-                contents={"role" : "user", "parts" : [{"text": analysis_prompt}]},
+                system_instruction="You are a data science expert.",
+                prompt=analysis_prompt,
             )
 
 
@@ -342,15 +321,20 @@ with col1:
             st.subheader("🚀 AI Analysis")
             container= st.empty()
             full_reply= ""
-            for chunk in response:
-                full_reply+= chunk.text
+            for text in response:
+                full_reply+= text
                 container.markdown(full_reply)
+            if response.cached:
+                st.caption("⚡ Cached analysis")
+
+profile.stop()
 
 # logout option in sidebar
 if st.session_state.get("logged_in", False):
     if st.sidebar.button("Logout", key="logout_btn"):
-        st.session_state.logged_in = False
-        st.session_state.username = ""
-        st.session_state.show_login = False
-        st.session_state.show_register = False
-        st.rerun()
\ No newline at end of file
+        # Revokes the session token as well
+        end_session()
+        st.rerun()
+
+# Render profile in the sidebar (only when profiling is on - ?profile=1)
+render_profile(profile)
@@ -2,17 +2,16 @@ import streamlit as st
 import plotly.express as px
 import pandas as pd 
 from datetime import datetime
-from app.services.analyticalQueries import get_avg_resolution_by_staff, get_high_priority_tickets_by_status, get_slow_resolution_tickets_by_status, get_tickets_by_priority, get_high_priority_tickets, get_slow_resolution_tickets_only
+from app.services.analyticalQueries import get_ticket_dashboard_summary
 import time
 
-from google import genai
-from google.genai import types
 
 
-# Get API key
-client_ticket= genai.Client(api_key=st.secrets["GEMINI_API_KEY"])
-
-from app.advanced_services.database_manager import DatabaseManager
+from app.advanced_services.resources import get_database, get_ai_client, get_ai_cache
+from app.services.session import restore_session, end_session
+from app.services.profiling import page_profile, render_profile
+from app.services.record_picker import record_picker, ticket_filters, search_box
+from app.data.tickets import search_tickets
 from models.tickets_class import IT_Ticket
 
 st.set_page_config(
@@ -21,74 +20,42 @@ st.set_page_config(
 )
 
 
+# Times each section of this run when profiling is on (?profile=1)
+profile = page_profile("IT Operations")
+
 st.title("IT OPERATIONS DASHBOARD")
 
 
+profile.start("Session restore")
 # Show this message if the user is not yet logged in and tries to access this page
-if st.session_state.get("logged_in") != True:
+if restore_session() != True:
     st.error("Please Log in to access the IT Operations Page !")
     if st.button("Return to Home Page"):
      st.switch_page("Home.py")
     st.stop()
 
-db = DatabaseManager("DATA/intelligence_platform.db")
-db.connect()
+db = get_database()
 
-# Load tickets from database and converts them to IT_Ticket objects
-
-def load_tickets() -> list[IT_Ticket]:
-    rows = db.fetch_all(
-        "SELECT ticket_id, priority, description, status, assigned_to, resolution_time_hours, created_at FROM it_tickets"
-    )
-    tickets_list = []
-    for row in rows:
-        ticket = IT_Ticket(
-            ticket_id=row[0],
-            priority=row[1],
-            description=row[2],
-            status=row[3],
-            assigned_to=row[4],
-            resolution_time_hours=row[5],
-            created_at=row[6] if row[6] else datetime.now()
-        )
-        tickets_list.append(ticket)
-    return tickets_list
-
-# get all tickets
-tickets = load_tickets()
-
-df_ticket = pd.DataFrame([{
-    "ticket_id": t.get_id(),
-    "priority": t.get_priority(),
-    "description": t.get_description(),
-    "status": t.get_status(),
-    "assigned_to": t.get_assigned_to(),
-    "resolution_time_hours": t.get_resolution_time_hours(),
-    "created_at": t.get_created_at()
-} for t in tickets])
 
 
+profile.start("Data load")
+# All KPIs and group-bys for this page come from one pass over it_tickets
+summary = get_ticket_dashboard_summary(db, min_resolution_time=24)
 
 # Find total tickets
-total_tickets= len(df_ticket)
-
-high_priority= get_high_priority_tickets(db)
+total_tickets= summary.total
 
 # calculate % of high priority tickets of total tickets
-total_high_priority= len(high_priority)
+total_high_priority= summary.high_priority
 high_priority_percentage = (total_high_priority / total_tickets * 100) if total_tickets > 0 else 0
 
-##
-df_slow_resolution = get_slow_resolution_tickets_by_status(db, min_resolution_time=24)
-##
-
-# Find slow resolution tickets only
+df_slow_resolution = summary.slow_resolution_by_status
 
-slow_tickets= get_slow_resolution_tickets_only(db, min_resolution_time=24)
 # get slow resolution tickets total
-total_slow_tickets= len(slow_tickets)
+total_slow_tickets= summary.slow_tickets
 
 
+profile.start("KPI metrics")
 st.subheader("IT Operations Insights")
 col1,col2,col3= st.columns([1,1,1])
 with col1:
@@ -112,12 +79,13 @@ with col3:
 
     
       
+profile.start("Resolution by staff chart")
 # display graphs for different queries
 col1,col2= st.columns([0.8,0.2])
 with col1:
 
     st.subheader("Service Desk Performance: Average Resolution Time by Staff Members")
-    df_resolution_times = get_avg_resolution_by_staff(db)
+    df_resolution_times = summary.avg_resolution_by_staff
     # bar chart display using plotly
     fig = px.bar(
         df_resolution_times,
@@ -135,10 +103,11 @@ with col1:
 
     st.plotly_chart(fig, width = "stretch")
 
+profile.start("High priority chart")
 col1,col2= st.columns([0.8,0.2])
 with col1:
     st.subheader("High Priority Tickets by Status")
-    df_high_priority = get_high_priority_tickets_by_status(db)
+    df_high_priority = summary.high_priority_by_status
 
     fig2 = px.bar(
         df_high_priority,
@@ -159,8 +128,9 @@ with col1:
     st.plotly_chart(fig2, width = "stretch")
 
 
-# get required queries and pass db connection to them 
-df_priority_level = get_tickets_by_priority(db)
+profile.start("Priority pie chart")
+# get priority distribution from the page summary
+df_priority_level = summary.by_priority
 col1,col2= st.columns([0.5,0.5])
 with col2:
     st.markdown("### Tickets Distribution by Priority Level")
@@ -182,6 +152,7 @@ with col2:
     )
     st.plotly_chart(fig, width = "stretch")
 
+profile.start("Slow resolution chart")
 with col1:
     st.markdown("### Tickets with Slow Resolution Times by Status")
 
@@ -201,12 +172,14 @@ with col1:
     )
     st.plotly_chart(fig, width = "stretch")
 
+profile.start("Search")
+# Full-text search over ticket descriptions (FTS5 index, ranked, one page at a time)
+st.subheader("🔍 Search Tickets")
+search_box("ticket_search", search_tickets)
 
+st.markdown("---")
 
-# Get all incident ids as list for the update form
-
-ticket_all__ids= df_ticket['ticket_id'].tolist()
-
+profile.start("Management forms")
 st.subheader("IT Tickets Management")
 col1,col2= st.columns([0.8,0.2])
 with col1:
@@ -247,11 +220,16 @@ with col1:
 
     elif action_choice == " Update Ticket Status":
         st.markdown("### Update Ticket Status")
+        # Pick the ticket from a filtered, paginated list (one page of rows at a time)
+        picked = record_picker("update_ticket", db, IT_Ticket, ticket_filters("update_ticket"),
+                               ["priority", "status", "assigned_to"], label="Ticket ID")
+        ticket_id = int(picked["ticket_id"]) if picked is not None else None
         with st.form("Update Ticket status"):
-            ticket_id = st.selectbox("Ticket ID", ticket_all__ids)
             new_status = st.selectbox("New Status", ["Open", "Closed", "In Progress","Resolved"])
             updated = st.form_submit_button("Update Status")
-        if updated:
+        if updated and ticket_id is None:
+            st.error("Select a ticket to update")
+        elif updated:
             try:
                 # Fetch the it ticket object from the database
                 ticket = IT_Ticket.load_by_id(db, ticket_id)
@@ -267,12 +245,14 @@ with col1:
 
     elif action_choice == "Delete Ticket":
         st.markdown("### Delete Ticket")
+        picked = record_picker("delete_ticket", db, IT_Ticket, ticket_filters("delete_ticket"),
+                               ["priority", "status", "assigned_to"], label="Ticket ID to Delete")
+        ticket_id = int(picked["ticket_id"]) if picked is not None else None
         with st.form("Delete Ticket"):
-            ticket_id= st.selectbox("Ticket ID to Delete", ticket_all__ids, key="delete_ticket_id")
             
             submitted= st.form_submit_button("Delete")
 
-            if submitted:
+            if submitted and ticket_id is not None:
                 if st.checkbox("Confirm deletion of ticket"):  
                     # Load it ticket from database               
                     ticket = IT_Ticket.load_by_id(db, ticket_id)
@@ -315,19 +295,17 @@ with col1:
             st.success("CSV file validated")
 
             if st.button("Upload CSV"):
-                # Insert CSV records into the database
-                for _, row in csv_df.iterrows():
-                        ticket = IT_Ticket(
-                            ticket_id=None,
-                            priority=row["priority"],
-                            description=row["description"],
-                            status=row["status"],
-                            assigned_to=row.get("assigned_to"),
-                            resolution_time_hours=row.get("resolution_time_hours"),
-                            created_at=row.get("created_at", datetime.now())
-                        )
-                        ticket.insert_ticket(db)
-                st.success("CSV data added successfully!")
+                # Insert all CSV records into the database in one transaction
+                progress_bar = st.progress(0.0, text="Uploading tickets...")
+                inserted, skipped = IT_Ticket.bulk_insert(
+                    db,
+                    csv_df,
+                    progress=lambda done, total: progress_bar.progress(done / total, text=f"Uploaded {done:,} of {total:,} tickets"),
+                )
+
+                if skipped:
+                    st.warning(f"⚠️ {skipped:,} rows skipped (missing priority, description, status or assignee)")
+                st.success(f"CSV data added successfully! ({inserted:,} tickets)")
                 time.sleep(2)
                 st.rerun()
           except Exception as e :
@@ -336,27 +314,17 @@ with col1:
 
 st.markdown("---")            
 
+profile.start("AI analyser")
 col1,col2= st.columns([0.8,0.2])
 with col1:
     # AI Analyser for the Big Data
     st.subheader("🔎 AI Tickets Analyser")
 
-    if not df_ticket.empty :
-        ticket_options = [
-            f"{row['ticket_id']}: {row['priority']}- {row['status']}- {row['assigned_to']}"
-            for index, row in df_ticket.iterrows()
-        ]
-
-        # Let the user pick a ticket from the readable options list
-        selected_id = st.selectbox(
-            "Select Dataset to analyse",
-            range(len(df_ticket)),
-            format_func=lambda i : ticket_options[i]
-        )
-        
-
-        ticket= df_ticket.iloc[selected_id]
+    # Let the user pick a ticket from a filtered, paginated list - only one page of labels is built
+    ticket = record_picker("analyse_ticket", db, IT_Ticket, ticket_filters("analyse_ticket"),
+                           ["priority", "status", "assigned_to"], label="Select Ticket to analyse")
 
+    if ticket is not None:
         # Display incident details
 
         st.subheader("ℹ️ Ticket Details")
@@ -368,7 +336,7 @@ with col1:
         st.write(f"**Resolution time :** {ticket['resolution_time_hours']}")
 
 
-    if st.button("Analyse with AI"):
+    if st.button("Analyse with AI") and ticket is not None:
         with st.spinner("AI analysing dataset..."):
             # Create the analysis prompt
             analysis_prompt= f""" Analyse this dataset :
@@ -382,12 +350,13 @@ with col1:
                                 2. Troubleshooting guidance
                                 3. System Optimisation tips
                                 4. Infrastructure best practice """
-            # Call the Gemini API
-            response = client_ticket.models.generate_content_stream(
+            # Replayed from the shared response cache if this prompt was analysed before -
+            # identical requests already in progress share one Gemini call
+            response = get_ai_cache().stream(
+                get_ai_client,
                 model="gemini-2.5-flash",
-                config=types.GenerateContentConfig(
-                    system_instruction="You are an IT operations expert."),
-                contents={"role" : "user", "parts" : [{"text": analysis_prompt}]},
+                system_instruction="You are an IT operations expert.",
+                prompt=analysis_prompt,
             )
 
 
@@ -396,17 +365,22 @@ with col1:
             st.subheader("🚀 AI Analysis")
             container= st.empty()
             full_reply= ""
-            for chunk in response:
-                full_reply+= chunk.text
+            for text in response:
+                full_reply+= text
                 container.markdown(full_reply)
+            if response.cached:
+                st.caption("⚡ Cached analysis")
+
 
 
+profile.stop()
 
 if st.session_state.get("logged_in", False):
 
     if st.sidebar.button("Logout", key="logout_btn"):
-        st.session_state.logged_in = False
-        st.session_state.username = ""
-        st.session_state.show_login = False
-        st.session_state.show_register = False
-        st.rerun()
\ No newline at end of file
+        # Revokes the session token as well
+        end_session()
+        st.rerun()
+
+# Render profile in the sidebar (only when profiling is on - ?profile=1)
+render_profile(profile)
@@ -0,0 +1,153 @@
+import os
+
+import streamlit as st
+import pandas as pd
+
+from app.advanced_services.resources import get_database, get_auth_manager, get_ai_cache
+from app.advanced_services.query_cache import get_query_cache
+from app.advanced_services.hashing_pool import get_hash_pool
+from app.advanced_services.page_profiler import get_page_profiler
+from app.advanced_services.query_stats import (
+    SLOW_LOG_DIR, get_query_hook, get_query_recorder, enable_query_stats, disable_query_stats,
+)
+from app.services.session import restore_session, end_session
+
+'''
+    Admin page - database query instrumentation
+    -> Switch statement recording on/off, set the slow-query threshold and log file
+    -> Top statements by total time, the latency histogram of one statement and the slow-query log with plans
+    -> Rolling render times of the profiled dashboard pages, per section
+    -> Pool, query and AI cache, hashing and login limiter counters on one screen
+'''
+
+db = get_database()
+
+st.set_page_config(
+    page_title="Admin",
+    layout="wide",
+)
+
+st.title("ADMIN - QUERY PERFORMANCE")
+
+if restore_session() != True:
+    st.error("Please Log in to access the Admin Page !")
+    if st.button("Return to Home Page"):
+        st.switch_page("Home.py")
+    st.stop()
+
+if st.session_state.get("role") != "admin":
+    st.error("This page is only available to admin users.")
+    st.stop()
+
+recorder = get_query_recorder()
+recording = recorder is not None and get_query_hook() is recorder
+
+# Recording settings
+with st.form("query_stats_settings"):
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        enabled = st.toggle("Record queries", value=recording)
+    with col2:
+        slow_ms = st.number_input("Slow query threshold (ms)", min_value=0.0, step=10.0,
+                                  value=float(recorder.slow_ms) if recorder else 100.0)
+    with col3:
+        log_name = st.text_input(f"Slow query log file in {SLOW_LOG_DIR} (optional)",
+                                 value=os.path.basename(recorder.log_path or "") if recorder else "")
+    if st.form_submit_button("Apply"):
+        try:
+            if enabled:
+                enable_query_stats(slow_ms, log_name.strip() or None)
+            else:
+                disable_query_stats()
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            st.rerun()
+
+if recorder is None:
+    st.info("Query recording has not been switched on in this process yet.")
+else:
+    overview = recorder.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Statements", overview["statements"])
+    col2.metric("Calls", f"{overview['calls']:,}")
+    col3.metric("Total time (ms)", f"{overview['total_ms']:,.1f}")
+    col4.metric("Slow queries logged", overview["slow_logged"])
+    st.caption(f"Recording for {overview['recording_s']:,.0f}s" + ("" if recording else " - paused"))
+
+    if st.button("Reset statistics"):
+        recorder.reset()
+        st.rerun()
+
+    # Top statements
+    st.subheader("Top statements")
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        order_by = st.selectbox("Order by", ["total_ms", "calls", "avg_ms", "max_ms", "rows"])
+    with col2:
+        top_n = st.slider("Statements shown", 5, 100, 20)
+    top = recorder.top(top_n, by=order_by)
+    if top:
+        top_frame = pd.DataFrame(top)
+        top_frame["call_sites"] = top_frame["call_sites"].map(lambda sites: "\n".join(f"{n} x {site}" for site, n in sites.items()))
+        st.dataframe(top_frame, width="stretch", hide_index=True)
+
+        # Latency histogram of one statement
+        st.subheader("Latency histogram")
+        statement = st.selectbox("Statement", [row["sql"] for row in top])
+        histogram = pd.Series(recorder.histogram(statement), name="calls")
+        st.bar_chart(histogram)
+    else:
+        st.info("No statements recorded yet.")
+
+    # Slow-query log
+    st.subheader("Slow query log")
+    slow = recorder.slow_queries()
+    if slow:
+        for entry in slow[:50]:
+            with st.expander(f"{entry['ms']:,.1f} ms - {entry['sql'][:100]}"):
+                st.code(entry["sql"], language="sql")
+                st.write(f"At {entry['at']} from {entry['call_site']} - {entry['rows']} rows, params {entry['params']}")
+                if entry["plan"]:
+                    st.code("\n".join(entry["plan"]), language="text")
+    else:
+        st.info(f"No statements slower than {recorder.slow_ms:g} ms.")
+
+# Page render profiles (collected from sessions with ?profile=1 or PAGE_PROFILE=1)
+st.subheader("Page render times")
+page_rows = get_page_profiler().percentiles()
+if page_rows:
+    st.dataframe(pd.DataFrame(page_rows), width="stretch", hide_index=True)
+    if st.button("Reset page timings"):
+        get_page_profiler().reset()
+        st.rerun()
+else:
+    st.info("No profiled page runs yet - open a dashboard with ?profile=1 in the URL.")
+
+# Other counters
+st.subheader("Resources")
+auth = get_auth_manager()
+col1, col2 = st.columns(2)
+with col1:
+    st.write("Connection pool")
+    st.json(db.pool_stats())
+    st.write("Lock contention")
+    st.json(db.lock_stats())
+    st.write("Analytical query cache")
+    st.json(get_query_cache().stats())
+    st.write("AI response cache")
+    st.json(get_ai_cache().stats())
+with col2:
+    st.write("Password hashing pool")
+    st.json(get_hash_pool().stats())
+    st.write("Login rate limiter")
+    st.json(auth.limiter.stats())
+    st.write("Session tokens")
+    st.json(auth.sessions.stats())
+
+if st.session_state.get("logged_in", False):
+
+    if st.sidebar.button("Logout", key="logout_btn"):
+        # Revokes the session token as well
+        end_session()
+        st.rerun()
@@ -1,14 +1,14 @@
 import streamlit as st
-from google import genai
 from google.genai import types
 
-# Get the API key 
-client= genai.Client(api_key=st.secrets["GEMINI_API_KEY"])
+# Shared Gemini client, created once per process
+from app.advanced_services.resources import get_ai_client
+from app.services.session import restore_session
 
 st.subheader("🤖  AI Chatbot")
 
 # Show this message if the user is not yet logged in and tries to access this page
-if st.session_state.get("logged_in") != True:
+if restore_session() != True:
     st.error("Please Log in to access the AI Chatbot ! ")
 
     if st.button("Return to Home Page"):
@@ -71,7 +71,7 @@ if prompt:
     """
 
     # Send to Gemini
-    response = client.models.generate_content_stream(
+    response = get_ai_client().models.generate_content_stream(
         model="gemini-2.5-flash",
         config=types.GenerateContentConfig(
             system_instruction= ai_prompt),
@@ -0,0 +1,70 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.advanced_services.auth_manager import AuthManager, PasswordHasher
+from app.advanced_services.login_limiter import LoginRateLimiter
+from app.advanced_services.session_tokens import SessionTokenStore
+
+SHARED_IP = "203.0.113.5"
+PASSWORD = "Secret#123"
+
+
+class _UsersTable:
+    '''
+    Stands in for DatabaseManager - every user exists with the role 'user'
+    '''
+    def fetch_one(self, sql, params=()):
+        return ("$2b$12$hash", "user")
+
+
+@pytest.fixture
+def auth(monkeypatch):
+    monkeypatch.setattr(PasswordHasher, "check_password", staticmethod(lambda plain, hashed: plain == PASSWORD))
+    return AuthManager(_UsersTable(), sessions=SessionTokenStore(), limiter=LoginRateLimiter())
+
+
+def test_other_user_behind_same_ip_can_log_in_after_lockout(auth):
+    for _ in range(5):
+        ok, _ = auth.login_user("alice", "wrong", client=SHARED_IP)
+        assert not ok
+    ok, msg = auth.login_user("alice", PASSWORD, client=SHARED_IP)
+    assert not ok and "Too many failed attempts" in msg
+
+    ok, _ = auth.login_user("bob", PASSWORD, client=SHARED_IP)
+    assert ok
+
+
+def test_lockout_does_not_follow_the_user_to_another_client(auth):
+    for _ in range(5):
+        auth.login_user("alice", "wrong", client=SHARED_IP)
+    ok, _ = auth.login_user("alice", PASSWORD, client="198.51.100.7")
+    assert ok
+
+
+def test_unknown_client_cannot_lock_a_user_out(auth):
+    for _ in range(20):
+        auth.login_user("alice", "wrong")
+    ok, _ = auth.login_user("alice", PASSWORD)
+    assert ok
+
+
+def test_username_only_bucket_delays_but_never_refuses():
+    limiter = LoginRateLimiter(bucket_capacity=2, refill_per_second=100.0, max_delay=0.02)
+    started = time.perf_counter()
+    results = [limiter.check("alice")[0] for _ in range(10)]
+    assert all(results)
+    assert limiter.stats()["delayed"] > 0
+    assert time.perf_counter() - started < 1.0
+
+
+def test_client_flood_is_delayed_then_refused():
+    limiter = LoginRateLimiter(bucket_capacity=2, refill_per_second=10.0, max_delay=0.25)
+    # Concurrent attempts - sequential ones would each wait for their token and never be refused
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        results = list(pool.map(lambda i: limiter.check(f"user{i}", SHARED_IP)[0], range(10)))
+    assert results.count(True) >= 2
+    assert not all(results)
+    stats = limiter.stats()
+    assert stats["delayed"] > 0 and stats["rejected_rate"] > 0
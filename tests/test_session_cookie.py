@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.advanced_services.auth_manager import AuthManager, PasswordHasher
+from app.advanced_services.login_limiter import LoginRateLimiter
+from app.advanced_services.session_tokens import SessionTokenStore
+from app.services import session, session_cookie
+
+CLIENT = "203.0.113.5"
+
+
+class _SessionState(dict):
+    # st.session_state allows both item and attribute access
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+
+class _UsersTable:
+    '''
+    Stands in for DatabaseManager - one user row, counting how often it is read
+    '''
+    def __init__(self):
+        self.queries = 0
+
+    def fetch_one(self, sql, params=()):
+        self.queries += 1
+        return ("$2b$12$hash", "analyst")
+
+
+@pytest.fixture
+def auth(monkeypatch):
+    auth = AuthManager(_UsersTable(), sessions=SessionTokenStore(), limiter=LoginRateLimiter())
+    auth.password_checks = 0
+
+    def check_password(plain, hashed):
+        auth.password_checks += 1
+        return True
+
+    monkeypatch.setattr(PasswordHasher, "check_password", staticmethod(check_password))
+    monkeypatch.setattr(session, "get_auth_manager", lambda: auth)
+    return auth
+
+
+def new_browser_session(monkeypatch, cookies, ip_address=CLIENT):
+    '''
+    A fresh Streamlit session (refresh, new tab, reconnect) that sent these cookies with its handshake
+    '''
+    fake_st = SimpleNamespace(session_state=_SessionState(),
+                              context=SimpleNamespace(cookies=cookies, ip_address=ip_address))
+    monkeypatch.setattr(session, "st", fake_st)
+    monkeypatch.setattr(session_cookie, "st", fake_st)
+    cleared = []
+    monkeypatch.setattr(session, "clear_session_cookie", lambda: cleared.append(True))
+    return fake_st.session_state, cleared
+
+
+def test_cookie_restores_session_without_password_check(auth, monkeypatch):
+    ok, _, token = auth.login("alice", "Secret#123", client=CLIENT)
+    assert ok
+    checks, queries = auth.password_checks, auth.db.queries
+
+    state, _ = new_browser_session(monkeypatch, {session_cookie.COOKIE_NAME: token})
+    assert session.restore_session() is True
+    assert (state.username, state.role, state.session_token) == ("alice", "analyst", token)
+    # No users query and no bcrypt verify for the returning user
+    assert (auth.password_checks, auth.db.queries) == (checks, queries)
+
+
+def test_cookie_from_another_client_is_refused(auth, monkeypatch):
+    _, _, token = auth.login("alice", "Secret#123", client=CLIENT)
+
+    state, cleared = new_browser_session(monkeypatch, {session_cookie.COOKIE_NAME: token}, "198.51.100.7")
+    assert session.restore_session() is False
+    assert not state.logged_in
+    assert cleared
+
+
+def test_cookie_of_logged_out_session_is_refused(auth, monkeypatch):
+    _, _, token = auth.login("alice", "Secret#123", client=CLIENT)
+    auth.logout(token)
+
+    state, _ = new_browser_session(monkeypatch, {session_cookie.COOKIE_NAME: token})
+    assert session.restore_session() is False
+    assert not state.logged_in
+    # Refused once, not looked up again on every rerun
+    assert state.refused_cookie == token